@@ -0,0 +1,224 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from atrium.poller import CHALLENGED, StatusPoller
+
+
+AggregationResult = namedtuple(
+    "AggregationResult",
+    ["userGuid", "memGuid", "member", "error"]
+)
+
+Progress = namedtuple("Progress", [
+    "started",
+    "finished",
+    "completed",
+    "failed",
+    "challenged",
+    "in_flight",
+    "elapsed",
+    "throughput"
+])
+
+
+class AggregationOrchestrator(object):
+    """
+    Aggregate many members, keeping `concurrency` of them in progress.
+
+    Members are started on a pool of `workers` threads and watched with a
+    StatusPoller. When one is CHALLENGED its challenges are handed to
+    `challenge_handler(userGuid, memGuid, challenges)` on a pool of
+    `challenge_workers` threads of its own, so a slow handler never holds
+    up starting the others. The handler returns the answers to
+    resume with (a list of {"guid": ..., "value": ...}), or None to leave
+    the member challenged. After `max_challenges` rounds it is left
+    challenged too.
+
+    `progress`, if given, is called with a Progress after every member
+    that finishes.
+    """
+
+    def __init__(self, api, concurrency=50, challenge_handler=None,
+                 workers=8, poll_workers=8, challenge_workers=8,
+                 max_challenges=3, timeout=None, progress=None,
+                 clock=time.time, **pollerOptions):
+        self.api = api
+        self.concurrency = concurrency
+        self.challenge_handler = challenge_handler
+        self.workers = workers
+        self.poll_workers = poll_workers
+        self.challenge_workers = challenge_workers
+        self.max_challenges = max_challenges
+        self.timeout = timeout
+        self.on_progress = progress
+        self.clock = clock
+        self.pollerOptions = pollerOptions
+
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(
+            ("started", "finished", "completed", "failed", "challenged"),
+            0
+        )
+        self._began = None
+
+    def progress(self):
+        with self._lock:
+            counts = dict(self._counts)
+
+        elapsed = self.clock() - self._began if self._began else 0
+        return Progress(
+            in_flight=counts["started"] - counts["finished"],
+            elapsed=elapsed,
+            throughput=counts["finished"] / elapsed if elapsed > 0 else 0,
+            **counts
+        )
+
+    def run(self, members):
+        """
+        Aggregate every (userGuid, memGuid) pair, yielding an
+        AggregationResult for each as soon as it finishes. Members are
+        pulled from the iterable as slots free up.
+        """
+        members = iter(members)
+        results = queue.Queue()
+        self._began = self.clock()
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        challenges = ThreadPoolExecutor(max_workers=self.challenge_workers)
+        poller = StatusPoller(
+            self.api,
+            workers=self.poll_workers,
+            max_outstanding=self.concurrency,
+            timeout=self.timeout,
+            clock=self.clock,
+            **self.pollerOptions
+        )
+        aggregation = _Aggregation(self, executor, challenges, poller,
+                                   results)
+
+        def start():
+            for userGuid, memGuid in members:
+                self._count("started")
+                executor.submit(aggregation.start, userGuid, memGuid)
+                return True
+            return False
+
+        inFlight = 0
+        try:
+            for _ in range(self.concurrency):
+                if not start():
+                    break
+                inFlight += 1
+
+            while inFlight:
+                result = results.get()
+                inFlight -= 1
+                if start():
+                    inFlight += 1
+
+                self._finished(result)
+                yield result
+
+        finally:
+            poller.close()
+            challenges.shutdown(wait=True)
+            executor.shutdown(wait=True)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _finished(self, result):
+        status = getattr(result.member, "status", None)
+
+        with self._lock:
+            self._counts["finished"] += 1
+            if status == "COMPLETED":
+                self._counts["completed"] += 1
+            elif status != CHALLENGED:
+                self._counts["failed"] += 1
+
+        if self.on_progress is not None:
+            self.on_progress(self.progress())
+
+
+class _Aggregation(object):
+    """
+    The steps of a single run, each executed on the worker pool, the
+    challenge pool or from a poller callback.
+    """
+
+    def __init__(self, orchestrator, executor, challenges, poller, results):
+        self.orchestrator = orchestrator
+        self.api = orchestrator.api
+        self.executor = executor
+        self.challenges = challenges
+        self.poller = poller
+        self.results = results
+
+    def finish(self, userGuid, memGuid, member=None, error=None):
+        self.results.put(AggregationResult(userGuid, memGuid, member, error))
+
+    def start(self, userGuid, memGuid):
+        try:
+            self.api.startMemberAgg(userGuid, memGuid)
+        except Exception as e:
+            return self.finish(userGuid, memGuid, error=e)
+
+        self.watch(userGuid, memGuid, 0)
+
+    def watch(self, userGuid, memGuid, rounds):
+        def done(future):
+            if future.cancelled():
+                return self.finish(userGuid, memGuid, error=RuntimeError(
+                    "Aggregation of {} was cancelled".format(memGuid)
+                ))
+
+            error = future.exception()
+            if error is not None:
+                return self.finish(userGuid, memGuid, error=error)
+
+            member = future.result()
+            if (member.get("status") == CHALLENGED and
+                    self.orchestrator.challenge_handler is not None and
+                    rounds < self.orchestrator.max_challenges):
+                return self.challenges.submit(
+                    self.challenged, userGuid, memGuid, member, rounds
+                )
+
+            self.finish(userGuid, memGuid, member=member)
+
+        try:
+            self.poller.watch(userGuid, memGuid, callback=done)
+        except Exception as e:
+            self.finish(userGuid, memGuid, error=e)
+
+    def challenged(self, userGuid, memGuid, member, rounds):
+        self.orchestrator._count("challenged")
+
+        try:
+            challenges = self.api.getMemberChallenges(userGuid, memGuid)
+            answers = self.orchestrator.challenge_handler(
+                userGuid,
+                memGuid,
+                challenges
+            )
+            if answers is None:
+                return self.finish(userGuid, memGuid, member=member)
+
+            self.api.resumeMemberAgg(
+                userGuid,
+                memGuid,
+                payload={"challenges": answers}
+            )
+        except Exception as e:
+            return self.finish(userGuid, memGuid, error=e)
+
+        self.watch(userGuid, memGuid, rounds + 1)
@@ -1,11 +1,37 @@
-from future.standard_library import install_aliases
-install_aliases()
-
-from urllib.parse import urlencode
-
-from atrium.utils import cleanData
-from atrium.requester import request
+import threading
+from contextlib import contextmanager
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from atrium.bulk import (
+    LIST_PAGE_SIZE,
+    PAGE_COST,
+    fanOut,
+    matching,
+    preferList,
+    readEach,
+    resolveOperation,
+    unique
+)
+from atrium.cache import MISSING
+from atrium.coalesce import SingleFlight
+from atrium.utils import (
+    RecordView,
+    cleanData,
+    dateRange,
+    responseSize,
+    storage
+)
+from atrium.models.records import RECORD_TYPES
+from atrium.pagination import paginate, prefetch
+from atrium.requester import createSession, poolStats, request
+from atrium.retry import parseRetryAfter
+from atrium.timeouts import Deadline, capTimeout
 from atrium.errors import (
+    AtriumError,
     BadRequestError,
     ConfigError,
     ConflictError,
@@ -14,16 +40,35 @@ from atrium.errors import (
     NotAcceptable,
     NotFoundError,
     ServerError,
+    TooManyRequestsError,
     UnauthorizedError,
     UnprocessableEntityError
 )
 
+# How raw() and Api(raw=...) hand back response bodies
+RAW_MODES = ("bytes", "memoryview", "chunks")
+
+# Scopes that follow an operation into the worker threads it starts
+CARRIED_SCOPES = ("timeout", "deadline", "raw")
+
+
+def mergeScope(name, carried, live):
+    """
+    The scope a carried call runs in: the earlier of two deadlines, and
+    otherwise whatever the current thread has set over what was carried.
+    """
+    if name == "deadline" and carried is not None:
+        return carried.earliest(live)
+    return carried if live is None else live
+
 
 class Api(object):
     """
       A python interface into the MX Atrium API
     """
 
+    _coalescerClass = SingleFlight
+
     def __init__(self, **kwargs):
 
         self.key = kwargs.get("key")
@@ -37,6 +82,194 @@ class Api(object):
 
         self.root = kwargs.get("root", "https://atrium.mx.com/")
 
+        self.session = self._buildSession(kwargs)
+
+        # connections kept per host, streamed prefetching stays within it
+        self.pool_maxsize = kwargs.get("pool_maxsize", 10)
+
+        # Optional atrium.retry.RetryPolicy, requests fail fast without one
+        self.retry = kwargs.get("retry")
+
+        # seconds, a single slow response must never hang a worker
+        self.connect_timeout = kwargs.get("connect_timeout", 10)
+        self.read_timeout = kwargs.get("read_timeout", 60)
+
+        # "storage" wraps records in Storage dicts, "records" in the compact
+        # __slots__ classes from atrium.models.records and "lazy" in
+        # RecordView views over the parsed dicts, made only on access
+        self.wrap = kwargs.get("wrap", "storage")
+        if self.wrap not in ("storage", "records", "lazy"):
+            raise ConfigError("Unknown wrap {!r}".format(self.wrap))
+
+        # Optional atrium.cache.ResponseCache for rarely changing GETs
+        self.cache = kwargs.get("cache")
+
+        # coalesce=True shares one in-flight request between concurrent
+        # identical GETs, an existing coalescer can be passed to share it
+        coalesce = kwargs.get("coalesce")
+        if coalesce is True:
+            coalesce = self._coalescerClass()
+        self.coalesce = coalesce or None
+
+        # Optional atrium.metrics.Metrics, nothing is measured without one
+        self.metrics = kwargs.get("metrics")
+
+        # One of RAW_MODES to return every response body unparsed, see raw()
+        self.raw_mode = kwargs.get("raw")
+        if self.raw_mode is not None and self.raw_mode not in RAW_MODES:
+            raise ConfigError("Unknown raw mode {!r}".format(self.raw_mode))
+
+        # per-call overrides set by the timeout() and deadline() scopes
+        self._local = threading.local()
+
+    def _buildSession(self, kwargs):
+        # Every Api instance keeps its own keep-alive connection pool unless
+        # a session is injected, so repeated calls skip the TCP/TLS handshake.
+        # A session may also be an atrium.requester.Transport.
+        session = kwargs.get("session")
+        if session is None and kwargs.get("http2"):
+            from atrium.http2 import Http2Transport
+
+            session = Http2Transport(
+                max_connections=kwargs.get("pool_maxsize", 10),
+                keep_alive=kwargs.get("keep_alive", True)
+            )
+        elif session is None:
+            session = createSession(
+                pool_connections=kwargs.get("pool_connections", 10),
+                pool_maxsize=kwargs.get("pool_maxsize", 10),
+                pool_block=kwargs.get("pool_block", False),
+                keep_alive=kwargs.get("keep_alive", True)
+            )
+        return session
+
+    def poolStats(self):
+        return poolStats(self.session)
+
+    def close(self):
+        self.session.close()
+
+    def _getScope(self, name):
+        return getattr(self._local, name, None)
+
+    def _setScope(self, name, value):
+        setattr(self._local, name, value)
+
+    @contextmanager
+    def _scoped(self, name, value):
+        previous = self._getScope(name)
+        self._setScope(name, value)
+        try:
+            yield value
+        finally:
+            self._setScope(name, previous)
+
+    def timeout(self, connect=None, read=None):
+        """
+        Override the connect and/or read timeout for calls made inside the
+        with block.
+        """
+        current = self._currentTimeout()
+        return self._scoped("timeout", (
+            current[0] if connect is None else connect,
+            current[1] if read is None else read
+        ))
+
+    def _currentTimeout(self):
+        return (
+            self._getScope("timeout") or
+            (self.connect_timeout, self.read_timeout)
+        )
+
+    def deadline(self, seconds):
+        """
+        Bound the total time of every request and retry made inside the with
+        block. Once it passes, RequestTimeoutError is raised.
+        """
+        deadline = Deadline(seconds).earliest(self._getScope("deadline"))
+        return self._scoped("deadline", deadline)
+
+    def raw(self, mode="bytes"):
+        """
+        Return the unparsed response body of calls made inside the with
+        block: "bytes", a "memoryview" over them or, read off the socket,
+        an iterator of "chunks". Error statuses still raise.
+        """
+        if mode not in RAW_MODES:
+            raise ConfigError("Unknown raw mode {!r}".format(mode))
+        return self._scoped("raw", mode)
+
+    def _rawMode(self):
+        # False, set while paginating, turns off an Api wide raw mode
+        mode = self._getScope("raw")
+        return self.raw_mode if mode is None else mode
+
+    def _carrying(self, fn):
+        # Scopes are thread-local, so an operation fanning out to worker
+        # threads captures them when it starts and re-enters them in every
+        # call it submits. Calls on the thread that started it merge with
+        # its scopes as they are then, and pass the result on to the workers.
+        origin = threading.current_thread()
+        carried = dict((name, self._getScope(name)) for name in CARRIED_SCOPES)
+
+        def carrying(*args, **kwargs):
+            previous = dict((name, self._getScope(name)) for name in carried)
+            scopes = dict(
+                (name, mergeScope(name, carried[name], previous[name]))
+                for name in carried
+            )
+            if threading.current_thread() is origin:
+                carried.update(scopes)
+
+            for name, value in scopes.items():
+                self._setScope(name, value)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                for name, value in previous.items():
+                    self._setScope(name, value)
+
+        return carrying
+
+    def _parsed(self, fetch):
+        # Pages have to be parsed to find the next one
+        def fetchParsed(params):
+            with self._scoped("raw", False):
+                return fetch(params)
+
+        return fetchParsed
+
+    def _withDeadline(self, fetch, seconds):
+        # Pages may be fetched from worker threads, so each fetch re-enters
+        # the deadline scope itself rather than relying on the caller's
+        if seconds is None:
+            return fetch
+
+        deadline = Deadline(seconds)
+
+        def fetchWithin(params):
+            current = deadline.earliest(self._getScope("deadline"))
+            with self._scoped("deadline", current):
+                return fetch(params)
+
+        return fetchWithin
+
+    def _streaming(self, fetch, key):
+        # Like deadlines, the scope is entered by the fetch itself so that
+        # prefetching worker threads stream their pages too
+        def fetchStreamed(params):
+            with self._scoped("stream", key):
+                return fetch(params)
+
+        return fetchStreamed
+
+    def _wrapperFor(self, key):
+        if self.wrap == "records":
+            return RECORD_TYPES.get(key, storage)
+        if self.wrap == "lazy":
+            return RecordView
+        return storage
+
     def _buildHeaders(self, method):
         headers = {
             "MX-API-KEY": self.key,
@@ -50,12 +283,246 @@ class Api(object):
         return headers
 
     def _makeRequest(self, endpoint, method, payload={}):
+        stream = self._getScope("stream") if method == "GET" else None
+        if stream:
+            return self._streamRequest(endpoint, stream)
+
+        raw = self._rawMode()
+        if raw:
+            return self._rawRequest(endpoint, method, payload, raw)
+
+        cached = self._fromCache(endpoint, method)
+        if cached is not MISSING:
+            return cached
+
+        if self.coalesce is not None and method == "GET":
+            return self.coalesce.do(
+                self._coalesceKey(endpoint, method),
+                lambda: self._fetch(endpoint, method, payload),
+                self._getScope("deadline")
+            )
+        return self._fetch(endpoint, method, payload)
+
+    def _fetch(self, endpoint, method, payload):
+        deadline = self._getScope("deadline")
+        timeout = self._currentTimeout()
+        conditional = self._conditionalHeaders(endpoint, method)
+
+        def send():
+            return self._sendRequest(
+                endpoint,
+                method,
+                payload,
+                capTimeout(timeout, deadline),
+                conditional
+            )
+
+        if self.retry is None:
+            r = send()
+        else:
+            r = self.retry.call(method, send, deadline=deadline)
+
+        if r.status_code == 304:
+            cached = self.cache.revalidated(
+                self._cacheKey(endpoint),
+                self.cache.ttlFor(endpoint)
+            )
+            if cached is not MISSING:
+                return cached
+
+            # evicted while we were asking, fetch it for real
+            conditional = None
+            r = send()
+
+        result = self._decode(endpoint, method, r)
+        self._toCache(endpoint, method, result, r)
+
+        return result
+
+    def _streamRequest(self, endpoint, key):
+        from atrium.streaming import StreamedPage
+
+        # Streamed pages bypass the cache: there is no parsed body to keep
+        deadline = self._getScope("deadline")
+        timeout = self._currentTimeout()
+
+        def send():
+            return self._sendRequest(
+                endpoint,
+                "GET",
+                timeout=capTimeout(timeout, deadline),
+                stream=True
+            )
+
+        if self.retry is None:
+            r = send()
+        else:
+            r = self.retry.call("GET", send, deadline=deadline)
+
+        return StreamedPage(r, key)
+
+    def _rawRequest(self, endpoint, method, payload, mode):
+        # Raw bodies bypass the cache and coalescing, both hold parsed data
+        deadline = self._getScope("deadline")
+        timeout = self._currentTimeout()
+        stream = mode == "chunks"
+
+        def send():
+            return self._sendRequest(
+                endpoint,
+                method,
+                payload,
+                capTimeout(timeout, deadline),
+                stream=stream
+            )
+
+        if self.retry is None:
+            r = send()
+        else:
+            r = self.retry.call(method, send, deadline=deadline)
+
+        if method != "GET":
+            self._toCache(endpoint, method, None, r)
+
+        return self._rawBody(r, mode)
+
+    def _rawBody(self, response, mode):
+        if mode == "chunks":
+            from atrium.streaming import iterChunks
+            return iterChunks(response)
+        if mode == "memoryview":
+            return memoryview(response.content)
+        return response.content
+
+    def _coalesceKey(self, endpoint, method):
+        # Coalescers may be shared between Api instances, which must never
+        # be handed each other's responses
+        return (method, self.root + endpoint, self.client_id)
+
+    def _cacheKey(self, endpoint):
+        # Like coalescing keys, but a string so that cache.invalidate() can
+        # drop everything under a prefix
+        return "{} {}{}".format(self.client_id, self.root, endpoint)
+
+    def _fromCache(self, endpoint, method):
+        if self.cache is None or method != "GET":
+            return MISSING
+        if self.cache.ttlFor(endpoint) is None:
+            return MISSING
+        return self.cache.get(self._cacheKey(endpoint))
+
+    def _conditionalHeaders(self, endpoint, method):
+        if self.cache is None or method != "GET":
+            return None
+        if self.cache.ttlFor(endpoint) is None:
+            return None
+        return self.cache.conditionalHeaders(self._cacheKey(endpoint)) or None
+
+    def _toCache(self, endpoint, method, result, response):
+        if self.cache is None:
+            return
+
+        if method == "GET":
+            ttl = self.cache.ttlFor(endpoint)
+            if ttl is not None:
+                content = getattr(response, "content", None)
+                headers = getattr(response, "headers", None) or {}
+                self.cache.set(
+                    self._cacheKey(endpoint),
+                    result,
+                    size=len(content) if content is not None else 0,
+                    ttl=ttl,
+                    etag=headers.get("ETag"),
+                    last_modified=headers.get("Last-Modified")
+                )
+        else:
+            # A write makes anything cached for that resource stale
+            resource = "/".join(endpoint.split("/")[:2])
+            self.cache.invalidate(self._cacheKey(resource))
+
+    def _sendRequest(self, endpoint, method, payload={}, timeout=None,
+                     extraHeaders=None, stream=False):
         full_url = self.root + endpoint
         headers = self._buildHeaders(method)
+        if extraHeaders:
+            headers.update(extraHeaders)
 
-        r = request(full_url, method, headers=headers, payload=payload)
+        started = self.metrics.clock() if self.metrics is not None else None
 
-        status = r.status_code
+        try:
+            r = request(
+                full_url,
+                method,
+                headers=headers,
+                payload=payload,
+                options=self._requestOptions(timeout, stream)
+            )
+        except Exception as e:
+            self._measure(started, endpoint, method, payload, error=e)
+            raise
+
+        try:
+            self._checkResponse(r, endpoint, method, payload, started, stream)
+        except AtriumError:
+            # An unread streamed body would keep its connection out of the pool
+            if stream:
+                r.close()
+            raise
+        return r
+
+    def _checkResponse(self, response, endpoint, method, payload,
+                       started=None, stream=False):
+        try:
+            self._checkStatus(response.status_code, endpoint, method, payload)
+        except AtriumError as e:
+            e.retry_after = self._retryAfter(response)
+            self._measure(started, endpoint, method, payload, response, e,
+                          stream)
+            raise
+
+        self._measure(started, endpoint, method, payload, response,
+                      stream=stream)
+
+    def _measure(self, started, endpoint, method, payload, response=None,
+                 error=None, stream=False):
+        if started is None:
+            return
+
+        sent = 0
+        if method in ("POST", "PUT"):
+            import json
+            sent = len(json.dumps(payload))
+
+        self.metrics.request(
+            method,
+            endpoint,
+            self.metrics.clock() - started,
+            status=getattr(response, "status_code", None),
+            error=error,
+            bytes_in=responseSize(response, stream),
+            bytes_out=sent
+        )
+
+    def _decode(self, endpoint, method, response):
+        if self.metrics is None:
+            return self._parseResponse(response)
+
+        started = self.metrics.clock()
+        result = self._parseResponse(response)
+        self.metrics.decoded(method, endpoint, self.metrics.clock() - started)
+        return result
+
+    def _requestOptions(self, timeout, stream):
+        options = {"session": self.session, "timeout": timeout}
+        if stream:
+            options["stream"] = True
+        return options
+
+    def _retryAfter(self, response):
+        headers = getattr(response, "headers", None) or {}
+        return parseRetryAfter(headers.get("Retry-After"))
+
+    def _checkStatus(self, status, endpoint, method, payload):
         if status == 400:
             raise BadRequestError(payload)
         elif status == 401:
@@ -71,13 +538,13 @@ class Api(object):
             raise ConflictError()
         elif status == 422:
             raise UnprocessableEntityError()
+        elif status == 429:
+            raise TooManyRequestsError()
         elif status == 500:
             raise ServerError()
         elif status == 503:
             raise MaintenanceError()
 
-        return self._parseResponse(r)
-
     def _parseResponse(self, response):
         try:
             return response.json()
@@ -92,6 +559,87 @@ class Api(object):
             return url + "?{}".format(urlencode(params))
         return url
 
+    def _paginate(self, fetch, key, queryParams, workers=1, window=None,
+                  deadline=None, stream=False, wrap=None):
+        fetch = self._parsed(fetch)
+        if stream:
+            fetch = self._streaming(fetch, key)
+        fetch = self._withDeadline(fetch, deadline)
+        fetch = self._carrying(fetch)
+
+        wrap = wrap or self._wrapperFor(key)
+
+        if workers > 1 and stream:
+            # Every streamed page holds its connection until it is consumed,
+            # and the page being read sits alongside the `window` fetched ahead
+            window = min(window or workers * 2, max(self.pool_maxsize - 1, 1))
+
+        if workers > 1:
+            return prefetch(fetch, key, queryParams, workers, window, wrap)
+        return paginate(fetch, key, queryParams, wrap)
+
+    def forEachUser(self, guids, operation, concurrency=8):
+        """
+        Run operation for every user GUID with at most `concurrency` users
+        in flight, yielding BulkResult(guid, result, error) as each one
+        finishes. Keep pool_maxsize at least as large as concurrency.
+        """
+        return fanOut(
+            self,
+            guids,
+            self._carrying(resolveOperation(operation)),
+            concurrency
+        )
+
+    def _readMany(self, key, guids, fetch, read, concurrency):
+        # With enough GUIDs, the first list page is fetched: the GUIDs on it
+        # are taken from it, and it tells whether walking the rest of the
+        # list beats reading the others one by one. GUIDs the list did not have
+        # (e.g. transactions outside its default date range) are still read
+        # one by one, so each gets its record or its error.
+        wanted = unique(guids)
+        found = {}
+
+        if len(wanted) > PAGE_COST and not self._rawMode():
+            params = {"page": 1, "records_per_page": LIST_PAGE_SIZE}
+            try:
+                first = fetch(params)
+            except AtriumError:
+                first = {}
+
+            if first:
+                self._scanList(key, set(wanted), found, first, fetch,
+                               dict(params, page=2), concurrency)
+
+        found.update(readEach(
+            self._carrying(read),
+            [guid for guid in wanted if guid not in found],
+            concurrency
+        ))
+        return dict((guid, found[guid]) for guid in wanted)
+
+    def _scanList(self, key, wanted, found, first, fetch, params, workers):
+        wrap = self._wrapperFor(key)
+        if matching(first.get(key) or [], wanted, found, wrap):
+            return
+
+        # The first page was fetched either way, the rest only when walking
+        # them is cheaper than reading the GUIDs still missing
+        pages = (first.get("pagination") or {}).get("total_pages") or 1
+        if pages < params["page"]:
+            return
+        remaining = {"total_pages": pages - params["page"] + 1}
+        if not preferList(len(wanted) - len(found), remaining):
+            return
+
+        # Records are only wrapped once they match
+        rest = self._paginate(fetch, key, params, workers,
+                              wrap=lambda record: record)
+        try:
+            matching(rest, wanted, found, wrap)
+        finally:
+            rest.close()
+
     # --------------------------------------------------
     # USER
     # --------------------------------------------------
@@ -128,6 +676,36 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
+    def iterTransactions(self, userGuid, queryParams={}, workers=1,
+                         window=None, deadline=None, stream=False):
+        return self._paginate(
+            lambda params: self.getTransactions(userGuid, queryParams=params),
+            'transactions',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            stream
+        )
+
+    def getTransactionsColumnar(self, userGuid, queryParams={}, workers=1,
+                                window=None, deadline=None):
+        """
+        Every transaction for a user as atrium.columnar.TransactionColumns.
+        Requires numpy.
+        """
+        from atrium.columnar import transactionColumns
+
+        return transactionColumns(self._paginate(
+            lambda params: self.getTransactions(userGuid, queryParams=params),
+            'transactions',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            wrap=lambda record: record
+        ))
+
     # @cleanData('transactions')
     def getTransactionsByAccount(self, userGuid, acctGuid, queryParams={}):
         url = "users/{}/accounts/{}/transactions".format(userGuid, acctGuid)
@@ -135,8 +713,45 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
-    def getTransactionsByDate(self, userGuid, dateStart, dateEnd):
-        pass
+    def iterTransactionsByAccount(self, userGuid, acctGuid, queryParams={},
+                                  workers=1, window=None, deadline=None,
+                                  stream=False):
+        return self._paginate(
+            lambda params: self.getTransactionsByAccount(
+                userGuid,
+                acctGuid,
+                queryParams=params
+            ),
+            'transactions',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            stream
+        )
+
+    def getTransactionsByDate(self, userGuid, dateStart, dateEnd=None,
+                              queryParams={}):
+        url = "users/{}/transactions".format(userGuid)
+        url = self._buildQueryParams(
+            url,
+            dateRange(dateStart, dateEnd, queryParams)
+        )
+
+        return self._makeRequest(url, "GET")
+
+    def iterTransactionsByDate(self, userGuid, dateStart, dateEnd=None,
+                               queryParams={}, workers=1, window=None,
+                               deadline=None, stream=False):
+        return self._paginate(
+            lambda params: self.getTransactions(userGuid, queryParams=params),
+            'transactions',
+            dateRange(dateStart, dateEnd, queryParams),
+            workers,
+            window,
+            deadline,
+            stream
+        )
 
     @cleanData('transaction')
     def readTransaction(self, userGuid, transGuid):
@@ -144,6 +759,20 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
+    def readTransactions(self, userGuid, transGuids, concurrency=8):
+        """
+        Read many transactions of a user, returning {guid: BulkResult}.
+        Either walks the transactions list or reads them concurrently,
+        whichever takes fewer requests.
+        """
+        return self._readMany(
+            'transactions',
+            transGuids,
+            lambda params: self.getTransactions(userGuid, queryParams=params),
+            lambda guid: self.readTransaction(userGuid, guid),
+            concurrency
+        )
+
     # --------------------------------------------------
     # ACCOUNTS
     # --------------------------------------------------
@@ -154,12 +783,36 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
+    def iterAccounts(self, userGuid, queryParams={}, workers=1,
+                     window=None, deadline=None, stream=False):
+        return self._paginate(
+            lambda params: self.getAccounts(userGuid, queryParams=params),
+            'accounts',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            stream
+        )
+
     @cleanData('account')
     def readAccount(self, userGuid, acctGuid):
         url = "users/{}/accounts/{}".format(userGuid, acctGuid)
 
         return self._makeRequest(url, "GET")
 
+    def readAccounts(self, userGuid, acctGuids, concurrency=8):
+        """
+        Read many accounts of a user, returning {guid: BulkResult}.
+        """
+        return self._readMany(
+            'accounts',
+            acctGuids,
+            lambda params: self.getAccounts(userGuid, queryParams=params),
+            lambda guid: self.readAccount(userGuid, guid),
+            concurrency
+        )
+
     # --------------------------------------------------
     # INSTITUTIONS
     # --------------------------------------------------
@@ -170,6 +823,18 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
+    def iterInstitutions(self, queryParams={}, workers=1,
+                         window=None, deadline=None, stream=False):
+        return self._paginate(
+            lambda params: self.getInstitutions(queryParams=params),
+            'institutions',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            stream
+        )
+
     @cleanData('institution')
     def readInstitution(self, instCode):
         url = "institutions/{}".format(instCode)
@@ -191,6 +856,18 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
+    def iterMembers(self, userGuid, queryParams={}, workers=1,
+                    window=None, deadline=None, stream=False):
+        return self._paginate(
+            lambda params: self.getMembers(userGuid, queryParams=params),
+            'members',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            stream
+        )
+
     @cleanData('member')
     def createMember(self, userGuid, payload={}):
         url = "users/{}/members".format(userGuid)
@@ -203,6 +880,18 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
+    def readMembers(self, userGuid, memGuids, concurrency=8):
+        """
+        Read many members of a user, returning {guid: BulkResult}.
+        """
+        return self._readMany(
+            'members',
+            memGuids,
+            lambda params: self.getMembers(userGuid, queryParams=params),
+            lambda guid: self.readMember(userGuid, guid),
+            concurrency
+        )
+
     @cleanData('member')
     def updateMember(self, userGuid, memGuid, payload={}):
         url = "users/{}/members/{}".format(userGuid, memGuid)
@@ -248,8 +937,32 @@ class Api(object):
 
         return self._makeRequest(url, "GET")
 
+    def iterHoldings(self, userGuid, queryParams={}, workers=1,
+                     window=None, deadline=None, stream=False):
+        return self._paginate(
+            lambda params: self.getHoldings(userGuid, queryParams=params),
+            'holdings',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            stream
+        )
+
     @cleanData('holding')
     def readHolding(self, userGuid, holdGuid):
         url = "users/{}/holdings/{}".format(userGuid, holdGuid)
 
         return self._makeRequest(url, "GET")
+
+    def readHoldings(self, userGuid, holdGuids, concurrency=8):
+        """
+        Read many holdings of a user, returning {guid: BulkResult}.
+        """
+        return self._readMany(
+            'holdings',
+            holdGuids,
+            lambda params: self.getHoldings(userGuid, queryParams=params),
+            lambda guid: self.readHolding(userGuid, guid),
+            concurrency
+        )
@@ -0,0 +1,484 @@
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+
+from atrium.api import Api
+from atrium.async_requester import createSession, request
+from atrium.bulk import (
+    LIST_PAGE_SIZE,
+    PAGE_COST,
+    BulkResult,
+    matching,
+    preferList,
+    resolveOperation,
+    unique
+)
+from atrium.errors import AtriumError, RequestTimeoutError
+from atrium.cache import MISSING
+from atrium.models.async_user import AsyncUser
+from atrium.pagination import nextPage
+from atrium.timeouts import Deadline, capTimeout
+from atrium.utils import storage, unpack
+
+
+class AsyncSingleFlight(object):
+    """
+    The asyncio counterpart of atrium.coalesce.SingleFlight. Callers share
+    one task per key; cancelling one caller, or its deadline running out,
+    does not cancel the others.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def inFlight(self):
+        return len(self._calls)
+
+    async def do(self, key, fn, deadline=None):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+
+            def forget(done):
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            task.add_done_callback(forget)
+
+        if deadline is None:
+            return await asyncio.shield(task)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(task),
+                deadline.remaining()
+            )
+        except asyncio.TimeoutError:
+            raise RequestTimeoutError(
+                "Deadline exceeded waiting for a coalesced request"
+            )
+
+
+async def unpackLater(pending, key, wrap=None):
+    return unpack(await pending, key, wrap)
+
+
+async def paginate(fetch, key, queryParams={}, wrap=storage):
+    """
+    The async generator counterpart of atrium.pagination.paginate.
+    """
+    page = int(queryParams.get("page", 1))
+
+    while page is not None:
+        params = dict(queryParams, page=page)
+        data = await fetch(params)
+
+        records = data.get(key) or []
+        pagination = data.get("pagination") or {}
+        data = None
+
+        for record in records:
+            yield wrap(record)
+
+        page = nextPage(page, pagination, len(records))
+        records = None
+
+
+async def prefetch(fetch, key, queryParams={}, workers=4, window=None,
+                   wrap=storage):
+    """
+    The async generator counterpart of atrium.pagination.prefetch.
+    """
+    window = max(window or workers * 2, 1)
+    first = int(queryParams.get("page", 1))
+    semaphore = asyncio.Semaphore(workers)
+
+    async def fetchPage(page):
+        async with semaphore:
+            return await fetch(dict(queryParams, page=page))
+
+    data = await fetchPage(first)
+    records = data.get(key) or []
+    pagination = data.get("pagination") or {}
+    data = None
+
+    for record in records:
+        yield wrap(record)
+
+    if nextPage(first, pagination, len(records)) is None:
+        return
+    records = None
+
+    pages = iter(range(first + 1, pagination["total_pages"] + 1))
+    pending = deque()
+
+    def submit():
+        for page in pages:
+            pending.append(asyncio.ensure_future(fetchPage(page)))
+            return
+
+    try:
+        for _ in range(window):
+            submit()
+
+        while pending:
+            data = await pending.popleft()
+            submit()
+
+            records = data.get(key) or []
+            data = None
+
+            for record in records:
+                yield wrap(record)
+            records = None
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def fanOut(api, guids, operation, concurrency=8, userClass=AsyncUser):
+    """
+    The async generator counterpart of atrium.bulk.fanOut. Operations are a
+    coroutine function taking an AsyncUser or the name of an AsyncUser method.
+    """
+    run = resolveOperation(operation)
+    guids = iter(guids)
+    pending = set()
+
+    async def call(guid):
+        try:
+            return BulkResult(guid, await run(userClass(api, guid)), None)
+        except Exception as e:
+            return BulkResult(guid, None, e)
+
+    def submit():
+        for guid in guids:
+            pending.add(asyncio.ensure_future(call(guid)))
+            return
+
+    try:
+        for _ in range(concurrency):
+            submit()
+
+        while pending:
+            done, _ = await asyncio.wait(
+                pending,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                pending.discard(task)
+                submit()
+                yield task.result()
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def readEach(read, guids, concurrency=8):
+    """
+    The coroutine counterpart of atrium.bulk.readEach, with at most
+    `concurrency` reads in flight.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(guid):
+        async with semaphore:
+            try:
+                return BulkResult(guid, await read(guid), None)
+            except Exception as e:
+                return BulkResult(guid, None, e)
+
+    results = await asyncio.gather(*[call(guid) for guid in guids])
+    return dict(zip(guids, results))
+
+
+class AsyncApi(Api):
+    """
+      An asyncio interface into the MX Atrium API
+
+      Every endpoint method of Api is available and returns a coroutine.
+      At most max_concurrency requests are in flight at once.
+    """
+
+    _coalescerClass = AsyncSingleFlight
+
+    def _buildSession(self, kwargs):
+        self.max_concurrency = kwargs.get("max_concurrency", 100)
+        self.in_flight = 0
+        self._semaphore = None
+        self._sessionOptions = {
+            "pool_maxsize": kwargs.get("pool_maxsize", self.max_concurrency),
+            "pool_per_host": kwargs.get("pool_per_host", 0),
+            "keep_alive": kwargs.get("keep_alive", True)
+        }
+
+        # timeout() and deadline() scopes follow the task, not the thread
+        self._scopes = ContextVar("atrium_scopes", default={})
+
+        # aiohttp sessions have to be created inside the event loop
+        return kwargs.get("session")
+
+    def _getScope(self, name):
+        return self._scopes.get().get(name)
+
+    def _setScope(self, name, value):
+        scopes = dict(self._scopes.get())
+        scopes[name] = value
+        self._scopes.set(scopes)
+
+    def _withDeadline(self, fetch, seconds):
+        if seconds is None:
+            return fetch
+
+        deadline = Deadline(seconds)
+
+        async def fetchWithin(params):
+            current = deadline.earliest(self._getScope("deadline"))
+            with self._scoped("deadline", current):
+                return await fetch(params)
+
+        return fetchWithin
+
+    async def _getSession(self):
+        if self.session is None:
+            self.session = createSession(**self._sessionOptions)
+        return self.session
+
+    def _getSemaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def poolStats(self):
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency
+        }
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _paginate(self, fetch, key, queryParams, workers=1, window=None,
+                  deadline=None, stream=False, wrap=None):
+        # aiohttp responses are read whole, so stream is accepted for
+        # signature compatibility and pages are decoded as usual
+        fetch = self._parsed(fetch)
+        fetch = self._withDeadline(fetch, deadline)
+
+        wrap = wrap or self._wrapperFor(key)
+
+        if workers > 1:
+            return prefetch(fetch, key, queryParams, workers, window, wrap)
+        return paginate(fetch, key, queryParams, wrap)
+
+    async def getTransactionsColumnar(self, userGuid, queryParams={},
+                                      workers=1, window=None, deadline=None):
+        from atrium.columnar import transactionColumns
+
+        records = self._paginate(
+            lambda params: self.getTransactions(userGuid, queryParams=params),
+            'transactions',
+            queryParams,
+            workers,
+            window,
+            deadline,
+            wrap=lambda record: record
+        )
+        return transactionColumns([record async for record in records])
+
+    def forEachUser(self, guids, operation, concurrency=100):
+        return fanOut(self, guids, operation, concurrency)
+
+    async def _readMany(self, key, guids, fetch, read, concurrency):
+        wanted = unique(guids)
+        found = {}
+
+        if len(wanted) > PAGE_COST and not self._rawMode():
+            params = {"page": 1, "records_per_page": LIST_PAGE_SIZE}
+            try:
+                first = await fetch(params)
+            except AtriumError:
+                first = {}
+
+            if first:
+                await self._scanList(key, set(wanted), found, first, fetch,
+                                     dict(params, page=2), concurrency)
+
+        found.update(await readEach(
+            read,
+            [guid for guid in wanted if guid not in found],
+            concurrency
+        ))
+        return dict((guid, found[guid]) for guid in wanted)
+
+    async def _scanList(self, key, wanted, found, first, fetch, params,
+                        workers):
+        wrap = self._wrapperFor(key)
+        if matching(first.get(key) or [], wanted, found, wrap):
+            return
+
+        # The first page was fetched either way, the rest only when walking
+        # them is cheaper than reading the GUIDs still missing
+        pages = (first.get("pagination") or {}).get("total_pages") or 1
+        if pages < params["page"]:
+            return
+        remaining = {"total_pages": pages - params["page"] + 1}
+        if not preferList(len(wanted) - len(found), remaining):
+            return
+
+        rest = self._paginate(fetch, key, params, workers,
+                              wrap=lambda record: record)
+        try:
+            async for record in rest:
+                if matching([record], wanted, found, wrap):
+                    break
+        finally:
+            await rest.aclose()
+
+    def _parsed(self, fetch):
+        async def fetchParsed(params):
+            with self._scoped("raw", False):
+                return await fetch(params)
+
+        return fetchParsed
+
+    async def _makeRequest(self, endpoint, method, payload={}):
+        raw = self._rawMode()
+        if raw:
+            return await self._rawRequest(endpoint, method, payload, raw)
+
+        cached = self._fromCache(endpoint, method)
+        if cached is not MISSING:
+            return cached
+
+        if self.coalesce is not None and method == "GET":
+            return await self.coalesce.do(
+                self._coalesceKey(endpoint, method),
+                lambda: self._fetch(endpoint, method, payload),
+                self._getScope("deadline")
+            )
+        return await self._fetch(endpoint, method, payload)
+
+    async def _fetch(self, endpoint, method, payload):
+        deadline = self._getScope("deadline")
+        timeout = self._currentTimeout()
+        conditional = self._conditionalHeaders(endpoint, method)
+
+        def send():
+            return self._sendRequest(
+                endpoint,
+                method,
+                payload,
+                capTimeout(timeout, deadline),
+                conditional
+            )
+
+        if self.retry is None:
+            r = await send()
+        else:
+            r = await self._retrying(method, send, deadline)
+
+        if r.status_code == 304:
+            cached = self.cache.revalidated(
+                self._cacheKey(endpoint),
+                self.cache.ttlFor(endpoint)
+            )
+            if cached is not MISSING:
+                return cached
+
+            conditional = None
+            r = await send()
+
+        result = self._decode(endpoint, method, r)
+        self._toCache(endpoint, method, result, r)
+
+        return result
+
+    async def _rawRequest(self, endpoint, method, payload, mode):
+        deadline = self._getScope("deadline")
+        timeout = self._currentTimeout()
+
+        def send():
+            return self._sendRequest(
+                endpoint,
+                method,
+                payload,
+                capTimeout(timeout, deadline)
+            )
+
+        if self.retry is None:
+            r = await send()
+        else:
+            r = await self._retrying(method, send, deadline)
+
+        if method != "GET":
+            self._toCache(endpoint, method, None, r)
+
+        return self._rawBody(r, mode)
+
+    def _rawBody(self, response, mode):
+        # aiohttp bodies are read whole, so "chunks" is a single chunk
+        if mode == "chunks":
+            return iter([response.content])
+        return super()._rawBody(response, mode)
+
+    async def _retrying(self, method, send, deadline):
+        attempt = 0
+        while True:
+            attempt += 1
+
+            if deadline is not None:
+                deadline.remaining()
+
+            try:
+                r = await send()
+            except Exception as e:
+                if not self.retry.shouldRetry(method, e, attempt):
+                    raise
+                delay = self.retry.backoffWithin(attempt, e, deadline)
+                await asyncio.sleep(delay)
+                continue
+
+            self.retry.budget.recordSuccess()
+            return r
+
+    async def _sendRequest(self, endpoint, method, payload={}, timeout=None,
+                           extraHeaders=None):
+        full_url = self.root + endpoint
+        headers = self._buildHeaders(method)
+        if extraHeaders:
+            headers.update(extraHeaders)
+        session = await self._getSession()
+
+        started = None
+        async with self._getSemaphore():
+            self.in_flight += 1
+            if self.metrics is not None:
+                started = self.metrics.clock()
+            try:
+                r = await request(
+                    full_url,
+                    method,
+                    headers=headers,
+                    payload=payload,
+                    options={"session": session, "timeout": timeout}
+                )
+            except Exception as e:
+                self._measure(started, endpoint, method, payload, error=e)
+                raise
+            finally:
+                self.in_flight -= 1
+
+        self._checkResponse(r, endpoint, method, payload, started)
+        return r
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from atrium.errors import ConfigError, NetworkError, RequestTimeoutError
+
+
+class Response(object):
+    """
+    A fully read aiohttp response exposing the parts of the requests
+    Response interface that Api relies on.
+    """
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode("utf-8"))
+
+
+def createSession(pool_maxsize=100, pool_per_host=0, keep_alive=True):
+    """
+    Build an aiohttp ClientSession. Must be called from inside a running
+    event loop.
+    """
+    if aiohttp is None:
+        raise ConfigError("AsyncApi requires aiohttp (pip install pytrium[async])")
+
+    connector = aiohttp.TCPConnector(
+        limit=pool_maxsize,
+        limit_per_host=pool_per_host,
+        force_close=not keep_alive
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def request(url, method, headers={}, payload={}, options={}):
+    session = options["session"]
+
+    kwargs = {"headers": headers}
+    if method in ["POST", "PUT"]:
+        kwargs["data"] = json.dumps(payload)
+
+    if options.get("timeout") is not None:
+        connect, read = options["timeout"]
+        kwargs["timeout"] = aiohttp.ClientTimeout(
+            sock_connect=connect,
+            sock_read=read
+        )
+
+    try:
+        async with session.request(method, url, **kwargs) as r:
+            content = await r.read()
+            return Response(r.status, r.headers, content)
+
+    except asyncio.TimeoutError as e:
+        raise RequestTimeoutError(repr(e))
+
+    except aiohttp.ClientError as e:
+        raise NetworkError(repr(e))
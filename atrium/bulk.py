@@ -0,0 +1,119 @@
+from collections import namedtuple
+
+from atrium.models.user import User
+
+
+BulkResult = namedtuple("BulkResult", ["guid", "result", "error"])
+
+# Largest page Atrium serves, list scans ask for it to keep requests few
+LIST_PAGE_SIZE = 1000
+
+# A full list page is slower than a single read, so walking the list only
+# pays off once each page replaces at least this many reads
+PAGE_COST = 4
+
+
+def unique(guids):
+    """
+    The GUIDs without duplicates, in the order first seen.
+    """
+    seen = set()
+    return [g for g in guids if not (g in seen or seen.add(g))]
+
+
+def preferList(wanted, pagination):
+    """
+    Whether walking a list endpoint with this pagination is cheaper than
+    reading `wanted` records one at a time.
+    """
+    pages = pagination.get("total_pages") or 1
+    return pages * PAGE_COST <= wanted
+
+
+def matching(records, wanted, found, wrap):
+    """
+    Add the records whose GUID is in `wanted` to `found`, wrapped, and
+    return True once every wanted GUID was found.
+    """
+    for record in records:
+        guid = record.get("guid")
+        if guid in wanted and guid not in found:
+            found[guid] = BulkResult(guid, wrap(record), None)
+            if len(found) == len(wanted):
+                return True
+    return False
+
+
+def readEach(read, guids, concurrency=8):
+    """
+    Call read(guid) for every GUID on up to `concurrency` threads, returning
+    {guid: BulkResult}. An exception is kept in its GUID's BulkResult.
+    """
+    if not guids:
+        return {}
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def call(guid):
+        try:
+            return BulkResult(guid, read(guid), None)
+        except Exception as e:
+            return BulkResult(guid, None, e)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(guids))) as pool:
+        return dict(zip(guids, pool.map(call, guids)))
+
+
+def resolveOperation(operation):
+    """
+    Operations are either a callable taking a User or the name of a User
+    method that takes no arguments, such as "getAccounts".
+    """
+    if callable(operation):
+        return operation
+    return lambda user: getattr(user, operation)()
+
+
+def fanOut(api, guids, operation, concurrency=8, userClass=User):
+    """
+    Run `operation` for every user GUID on a pool of `concurrency` threads,
+    yielding a BulkResult for each user as soon as it finishes.
+
+    GUIDs are pulled from the iterable as slots free up, so arbitrarily
+    long streams of users never queue up in memory. An exception raised for
+    one user is returned in its BulkResult instead of stopping the batch.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    run = resolveOperation(operation)
+    guids = iter(guids)
+    pending = set()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def call(guid):
+        try:
+            return BulkResult(guid, run(userClass(api, guid)), None)
+        except Exception as e:
+            return BulkResult(guid, None, e)
+
+    def submit():
+        for guid in guids:
+            pending.add(executor.submit(call, guid))
+            return
+
+    try:
+        for _ in range(concurrency):
+            submit()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                pending.discard(future)
+                submit()
+                yield future.result()
+
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import OrderedDict
+
+from atrium.utils import endpointTemplate
+
+
+# Reference data that rarely changes. User-scoped endpoints are never cached
+# unless they are listed explicitly.
+DEFAULT_ENDPOINTS = {
+    "institutions": 3600,
+    "institutions/{}": 3600,
+    "institutions/{}/credentials": 3600
+}
+
+MISSING = object()
+
+
+def isUnder(endpoint, prefix):
+    if not endpoint.startswith(prefix):
+        return False
+    rest = endpoint[len(prefix):]
+    return not rest or rest[0] in "/?"
+
+
+class CacheEntry(object):
+    __slots__ = ("value", "size", "expires", "etag", "last_modified")
+
+    def __init__(self, value, size, expires, etag=None, last_modified=None):
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache(object):
+    """
+    A thread-safe TTL and LRU cache of parsed GET responses, keyed by
+    endpoint including its query string.
+
+    `endpoints` maps endpoint templates such as "institutions/{}" to a TTL in
+    seconds; a list of templates uses `ttl` for all of them. The least
+    recently used entries are evicted once there are more than `max_entries`
+    of them or their response bodies add up to more than `max_bytes`.
+
+    Entries stored with an ETag or Last-Modified validator are kept after
+    they expire, and revalidated with a conditional GET instead of being
+    downloaded again. A TTL of 0 revalidates on every call.
+
+    Cached results are shared between callers and should be treated as
+    read-only.
+    """
+
+    def __init__(self, endpoints=None, ttl=300, max_entries=1024,
+                 max_bytes=16 * 1024 * 1024, clock=time.time):
+        if endpoints is None:
+            endpoints = DEFAULT_ENDPOINTS
+        if not isinstance(endpoints, dict):
+            endpoints = dict((template, ttl) for template in endpoints)
+
+        self.endpoints = endpoints
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.bytes = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttlFor(self, endpoint):
+        """
+        The TTL for an endpoint, or None when it should not be cached.
+        """
+        return self.endpoints.get(endpointTemplate(endpoint))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry.expires <= self.clock():
+                self.misses += 1
+                return MISSING
+
+            # re-insert to mark it as the most recently used
+            self._entries[key] = self._entries.pop(key)
+            self.hits += 1
+            return entry.value
+
+    def conditionalHeaders(self, key):
+        """
+        Headers for revalidating an expired entry, empty when there is
+        nothing to revalidate.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            headers = {}
+
+            if entry is not None:
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    headers["If-Modified-Since"] = entry.last_modified
+
+            return headers
+
+    def revalidated(self, key, ttl=None):
+        """
+        Mark an entry as still current after a 304 and return its value.
+        """
+        if ttl is None:
+            ttl = self.ttlFor(key)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return MISSING
+
+            entry.expires = self.clock() + ttl
+            self._entries[key] = entry
+            self.revalidations += 1
+            return entry.value
+
+    def set(self, key, value, size=0, ttl=None, etag=None,
+            last_modified=None):
+        if ttl is None:
+            ttl = self.ttlFor(key)
+
+        with self._lock:
+            self._discard(key)
+
+            # A single body bigger than the whole cache is not worth keeping
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = CacheEntry(
+                value,
+                size,
+                self.clock() + ttl,
+                etag,
+                last_modified
+            )
+            self.bytes += size
+
+            while (len(self._entries) > self.max_entries or
+                   self.bytes > self.max_bytes):
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, prefix=None):
+        """
+        Drop every entry, or only those for `prefix` and anything below it,
+        e.g. "institutions/mxbank" also drops
+        "institutions/mxbank/credentials".
+        """
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                self.bytes = 0
+                return
+
+            for key in list(self._entries):
+                if isUnder(key, prefix):
+                    self._discard(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
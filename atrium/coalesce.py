@@ -0,0 +1,62 @@
+import threading
+
+from atrium.errors import RequestTimeoutError
+
+
+class _Call(object):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Collapse concurrent calls for the same key into one.
+
+    The first caller for a key runs the call. Callers arriving with that
+    key while it is running wait for it and get the same result, or have
+    the same exception raised. Once it finishes, the next call runs again.
+
+    A waiting caller given an atrium.timeouts.Deadline waits no longer than
+    it has left, then raises RequestTimeoutError; the call keeps running
+    for the others.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def inFlight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, fn, deadline=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            timeout = deadline.remaining() if deadline is not None else None
+            if not call.done.wait(timeout):
+                raise RequestTimeoutError(
+                    "Deadline exceeded waiting for a coalesced request"
+                )
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
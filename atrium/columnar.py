@@ -0,0 +1,132 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from atrium.errors import ConfigError
+
+
+class Categorical(object):
+    """
+    Dictionary-encoded column: `codes[i]` indexes into `labels`.
+    """
+
+    def __init__(self, codes, labels):
+        self.codes = codes
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.codes)
+
+    def code(self, label):
+        try:
+            return self.labels.index(label)
+        except ValueError:
+            return -1
+
+    def values(self):
+        return numpy.array(self.labels, dtype=object)[self.codes]
+
+
+class TransactionColumns(object):
+    """
+    Transactions laid out as NumPy arrays, one per field, so totals, rollups
+    and filters run vectorized instead of row by row.
+
+        guid          object array
+        amount        float64
+        amount_cents  int64
+        date          datetime64[D], NaT where missing
+        category      Categorical
+        type          Categorical
+        account_guid  Categorical
+    """
+
+    def __init__(self, guid, amount, date, category, type, account_guid):
+        self.guid = guid
+        self.amount = amount
+        self.amount_cents = numpy.rint(amount * 100).astype(numpy.int64)
+        self.date = date
+        self.category = category
+        self.type = type
+        self.account_guid = account_guid
+
+    def __len__(self):
+        return len(self.guid)
+
+    def filter(self, mask):
+        """
+        A new TransactionColumns with only the rows where mask is true,
+        e.g. `columns.filter(columns.date >= numpy.datetime64("2016-09-01"))`.
+        """
+        return TransactionColumns(
+            self.guid[mask],
+            self.amount[mask],
+            self.date[mask],
+            Categorical(self.category.codes[mask], self.category.labels),
+            Categorical(self.type.codes[mask], self.type.labels),
+            Categorical(self.account_guid.codes[mask], self.account_guid.labels)
+        )
+
+    def totalsBy(self, column):
+        """
+        Sum of amount per label of a categorical column.
+        """
+        column = getattr(self, column)
+        sums = numpy.bincount(
+            column.codes,
+            weights=self.amount,
+            minlength=len(column.labels)
+        )
+        return dict(zip(column.labels, sums.tolist()))
+
+    def monthlyTotals(self):
+        """
+        (months, totals) where months is a sorted datetime64[M] array.
+        """
+        known = ~numpy.isnat(self.date)
+        months = self.date[known].astype("datetime64[M]")
+        unique, inverse = numpy.unique(months, return_inverse=True)
+        return unique, numpy.bincount(inverse, weights=self.amount[known])
+
+
+def transactionColumns(records):
+    """
+    Build TransactionColumns from an iterable of transaction dicts, Storage
+    or Record objects, in a single pass.
+    """
+    if numpy is None:
+        raise ConfigError("Columnar results require numpy (pip install pytrium[numpy])")
+
+    guids = []
+    amounts = []
+    dates = []
+    columns = {"category": ({}, []), "type": ({}, []), "account_guid": ({}, [])}
+    encoders = [(field, codes, out) for field, (codes, out) in columns.items()]
+
+    for record in records:
+        get = record.get
+        guids.append(get("guid"))
+        amounts.append(get("amount") or 0.0)
+        dates.append(get("date"))
+
+        for field, codes, out in encoders:
+            value = get(field)
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            out.append(code)
+
+    def categorical(field):
+        codes, out = columns[field]
+        labels = sorted(codes, key=codes.get)
+        return Categorical(numpy.array(out, dtype=numpy.int32), labels)
+
+    return TransactionColumns(
+        numpy.array(guids, dtype=object),
+        numpy.array(amounts, dtype=numpy.float64),
+        numpy.array(dates, dtype="datetime64[D]"),
+        categorical("category"),
+        categorical("type"),
+        categorical("account_guid")
+    )
@@ -1,5 +1,6 @@
 class AtriumError(Exception):
-    pass
+    # Seconds the server asked us to wait before retrying, if it said so
+    retry_after = None
 
 
 class BadRequestError(AtriumError):
@@ -45,6 +46,10 @@ class ServerError(AtriumError):
     pass
 
 
+class TooManyRequestsError(AtriumError):
+    pass
+
+
 class UnauthorizedError(AtriumError):
     pass
 
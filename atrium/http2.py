@@ -0,0 +1,203 @@
+import asyncio
+import threading
+from collections import Counter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from atrium.errors import ConfigError, NetworkError, RequestTimeoutError
+from atrium.requester import Transport
+
+# what _next returns once an async iterator is exhausted
+END = object()
+
+
+async def _next(iterator):
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return END
+
+
+class Response(object):
+    """
+    An httpx response exposing the parts of the requests Response interface
+    that Api relies on. Reads go through `run`, on the transport's loop.
+    """
+
+    def __init__(self, response, run):
+        self._response = response
+        self._run = run
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+
+    @property
+    def content(self):
+        try:
+            return self._response.content
+        except httpx.ResponseNotRead:
+            return self._run(self._response.aread())
+
+    def json(self):
+        self.content
+        return self._response.json()
+
+    def iter_content(self, chunk_size=None):
+        chunks = self._response.aiter_bytes(chunk_size)
+        while True:
+            chunk = self._run(_next(chunks))
+            if chunk is END:
+                return
+            yield chunk
+
+    def close(self):
+        self._run(self._response.aclose())
+
+
+class Http2Transport(Transport):
+    """
+    Send requests over HTTP/2 with httpx, so concurrent calls share a few
+    connections as multiplexed streams instead of holding one each.
+
+    httpx's HTTP/2 connections must not be driven from several threads at
+    once, so an AsyncClient runs on an event loop thread of its own and
+    every calling thread hands its request over to that loop.
+
+    max_connections caps the connections kept across all hosts. Against
+    https hosts, HTTP/2 is negotiated and HTTP/1.1 still works as a
+    fallback. prior_knowledge speaks HTTP/2 straight away, which plain
+    http:// servers (such as local test servers) need. An injected client
+    must be an httpx.AsyncClient.
+    """
+
+    def __init__(self, max_connections=10, keep_alive=True,
+                 prior_knowledge=False, client=None):
+        if client is None:
+            client = self._buildClient(max_connections, keep_alive,
+                                       prior_knowledge)
+
+        self.client = client
+        self.max_connections = max_connections
+        self._requests = Counter()
+        self._lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="pytrium-http2"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _buildClient(self, max_connections, keep_alive, prior_knowledge):
+        if httpx is None:
+            raise ConfigError(
+                "Http2Transport requires httpx (pip install pytrium[http2])"
+            )
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections if keep_alive else 0
+        )
+        try:
+            return httpx.AsyncClient(
+                http1=not prior_knowledge,
+                http2=True,
+                limits=limits
+            )
+        except ImportError:
+            raise ConfigError(
+                "Http2Transport requires h2 (pip install pytrium[http2])"
+            )
+
+    def _run(self, coroutine):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result()
+        except httpx.TimeoutException as e:
+            raise RequestTimeoutError(repr(e))
+        except httpx.TransportError as e:
+            raise NetworkError(repr(e))
+
+    def send(self, url, method, headers, data=None, timeout=None,
+             stream=False):
+        request = self.client.build_request(
+            method,
+            url,
+            headers=headers,
+            content=data,
+            timeout=self._timeout(timeout)
+        )
+
+        response = self._run(self.client.send(request, stream=stream))
+
+        with self._lock:
+            self._requests[self._origin(request.url)] += 1
+
+        return Response(response, self._run)
+
+    def _timeout(self, timeout):
+        if timeout is None:
+            return httpx.Timeout(None)
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+
+    def _origin(self, url):
+        port = url.port or {"http": 80, "https": 443}.get(url.scheme)
+        return "{}://{}:{}".format(url.scheme, url.host, port)
+
+    def poolStats(self):
+        """
+        Like atrium.requester.poolStats, plus how many of the connections
+        speak HTTP/2.
+        """
+        with self._lock:
+            requests = dict(self._requests)
+
+        hosts = {}
+        for origin, count in requests.items():
+            hosts[origin] = {
+                "connections": 0,
+                "requests": count,
+                "idle": 0,
+                "http2": 0,
+                "maxsize": self.max_connections
+            }
+
+        for connection in self._run(self._connections()):
+            origin = str(getattr(connection, "_origin", "unknown"))
+            stats = hosts.setdefault(origin, {
+                "connections": 0,
+                "requests": 0,
+                "idle": 0,
+                "http2": 0,
+                "maxsize": self.max_connections
+            })
+            stats["connections"] += 1
+            stats["idle"] += 1 if connection.is_idle() else 0
+            stats["http2"] += 1 if "HTTP/2" in connection.info() else 0
+
+        totals = {"connections": 0, "requests": 0, "idle": 0, "http2": 0}
+        for stats in hosts.values():
+            for field in totals:
+                totals[field] += stats[field]
+
+        totals["hosts"] = hosts
+        return totals
+
+    async def _connections(self):
+        # httpx does not expose its pool, so this looks into httpcore's.
+        # Copied on the loop, where the pool is changed.
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
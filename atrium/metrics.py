@@ -0,0 +1,247 @@
+import bisect
+import logging
+import threading
+from timeit import default_timer
+
+from atrium.utils import endpointTemplate
+
+
+# Upper bounds in seconds, the last bucket catches everything slower
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+
+
+class Histogram(object):
+    """
+    Counts observations into fixed buckets, so percentiles cost the same
+    memory however many requests were made.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Estimate the q-th quantile (0 to 1), interpolating linearly inside
+        the bucket it falls in.
+        """
+        if not self.count:
+            return None
+
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                lower = self.bounds[index - 1] if index else 0.0
+                if index < len(self.bounds):
+                    upper = self.bounds[index]
+                else:
+                    upper = self.max
+                estimate = lower + (upper - lower) * (target - seen) / count
+                return min(estimate, self.max)
+            seen += count
+
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": list(zip(self.bounds + (float("inf"),), self.counts))
+        }
+
+
+class EndpointMetrics(object):
+
+    __slots__ = (
+        "requests", "statuses", "errors", "latency", "decode",
+        "bytes_in", "bytes_out"
+    )
+
+    def __init__(self, buckets):
+        self.requests = 0
+        self.statuses = {}
+        self.errors = {}
+        self.latency = Histogram(buckets)
+        self.decode = Histogram(buckets)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "latency": self.latency.summary(),
+            "decode": self.decode.summary(),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out
+        }
+
+
+class Metrics(object):
+    """
+    Request metrics grouped by method and endpoint template, such as
+    "GET users/{}/transactions".
+
+    Pass one to Api(metrics=...). Read it with snapshot(), or push the
+    snapshot to every exporter, a callable taking the snapshot, with
+    export().
+    """
+
+    def __init__(self, exporters=(), buckets=LATENCY_BUCKETS,
+                 clock=default_timer):
+        self.exporters = list(exporters)
+        self.buckets = buckets
+        self.clock = clock
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _metricsFor(self, method, endpoint):
+        key = "{} {}".format(method, endpointTemplate(endpoint))
+        metrics = self._endpoints.get(key)
+        if metrics is None:
+            metrics = self._endpoints[key] = EndpointMetrics(self.buckets)
+        return metrics
+
+    def request(self, method, endpoint, latency, status=None, error=None,
+                bytes_in=0, bytes_out=0):
+        """
+        Record one HTTP request, with its status if a response came back
+        and the exception it raised, if any.
+        """
+        with self._lock:
+            metrics = self._metricsFor(method, endpoint)
+            metrics.requests += 1
+            metrics.latency.observe(latency)
+            metrics.bytes_in += bytes_in
+            metrics.bytes_out += bytes_out
+
+            if status is not None:
+                metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            if error is not None:
+                name = type(error).__name__
+                metrics.errors[name] = metrics.errors.get(name, 0) + 1
+
+    def decoded(self, method, endpoint, seconds):
+        with self._lock:
+            self._metricsFor(method, endpoint).decode.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(
+                (key, metrics.summary())
+                for key, metrics in self._endpoints.items()
+            )
+
+    def export(self):
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            exporter(snapshot)
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+
+class LoggingExporter(object):
+    """
+    Log one line per endpoint with its request count and latencies.
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("atrium.metrics")
+        self.level = level
+
+    def __call__(self, snapshot):
+        for key in sorted(snapshot):
+            metrics = snapshot[key]
+            latency = metrics["latency"]
+            self.logger.log(
+                self.level,
+                "%s requests=%d errors=%d p50=%.3fs p95=%.3fs p99=%.3fs "
+                "in=%dB out=%dB",
+                key,
+                metrics["requests"],
+                sum(metrics["errors"].values()),
+                latency["p50"] or 0,
+                latency["p95"] or 0,
+                latency["p99"] or 0,
+                metrics["bytes_in"],
+                metrics["bytes_out"]
+            )
+
+
+def prometheusText(snapshot, prefix="atrium"):
+    """
+    Render a snapshot in the Prometheus text exposition format.
+    """
+    lines = []
+
+    def labels(key, **extra):
+        method, template = key.split(" ", 1)
+        pairs = [("method", method), ("endpoint", template)]
+        pairs += sorted(extra.items())
+        return "{" + ",".join(
+            '{}="{}"'.format(name, value) for name, value in pairs
+        ) + "}"
+
+    for key in sorted(snapshot):
+        metrics = snapshot[key]
+        lines.append("{}_requests_total{} {}".format(
+            prefix, labels(key), metrics["requests"]
+        ))
+
+        for status, count in sorted(metrics["statuses"].items()):
+            lines.append("{}_responses_total{} {}".format(
+                prefix, labels(key, status=status), count
+            ))
+        for error, count in sorted(metrics["errors"].items()):
+            lines.append("{}_errors_total{} {}".format(
+                prefix, labels(key, error=error), count
+            ))
+
+        lines.append("{}_bytes_in_total{} {}".format(
+            prefix, labels(key), metrics["bytes_in"]
+        ))
+        lines.append("{}_bytes_out_total{} {}".format(
+            prefix, labels(key), metrics["bytes_out"]
+        ))
+
+        for name in ("latency", "decode"):
+            histogram = metrics[name]
+            cumulative = 0
+            for bound, count in histogram["buckets"]:
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append("{}_{}_seconds_bucket{} {}".format(
+                    prefix, name, labels(key, le=le), cumulative
+                ))
+            lines.append("{}_{}_seconds_count{} {}".format(
+                prefix, name, labels(key), histogram["count"]
+            ))
+            lines.append("{}_{}_seconds_sum{} {}".format(
+                prefix, name, labels(key), histogram["sum"]
+            ))
+
+    return "\n".join(lines) + "\n"
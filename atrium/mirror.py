@@ -0,0 +1,290 @@
+import json
+import sqlite3
+import threading
+from datetime import date
+
+from atrium.sync import SQLiteWatermarkStore, TransactionSync
+from atrium.utils import isoDate, storage
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    guid TEXT PRIMARY KEY,
+    identifier TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    guid TEXT PRIMARY KEY,
+    user_guid TEXT NOT NULL,
+    institution_code TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    guid TEXT PRIMARY KEY,
+    user_guid TEXT NOT NULL,
+    member_guid TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    guid TEXT PRIMARY KEY,
+    user_guid TEXT NOT NULL,
+    account_guid TEXT,
+    date TEXT,
+    category TEXT,
+    amount REAL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    guid TEXT PRIMARY KEY,
+    user_guid TEXT NOT NULL,
+    account_guid TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS members_user ON members (user_guid);
+CREATE INDEX IF NOT EXISTS accounts_user ON accounts (user_guid);
+CREATE INDEX IF NOT EXISTS transactions_user_date
+    ON transactions (user_guid, date);
+CREATE INDEX IF NOT EXISTS transactions_account_date
+    ON transactions (account_guid, date);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS transactions_category
+    ON transactions (category, date);
+CREATE INDEX IF NOT EXISTS holdings_user ON holdings (user_guid);
+CREATE INDEX IF NOT EXISTS holdings_account ON holdings (account_guid);
+"""
+
+COLUMNS = {
+    "users": ("guid", "identifier"),
+    "members": ("guid", "user_guid", "institution_code"),
+    "accounts": ("guid", "user_guid", "member_guid"),
+    "transactions": (
+        "guid", "user_guid", "account_guid", "date", "category", "amount"
+    ),
+    "holdings": ("guid", "user_guid", "account_guid")
+}
+
+
+def toDict(record):
+    convert = getattr(record, "toDict", None)
+    return convert() if convert else dict(record)
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Mirror(object):
+    """
+    A local SQLite copy of users and their members, accounts, transactions
+    and holdings, for read paths that can live with data as fresh as the
+    last refresh.
+
+    Transactions are refreshed incrementally by an
+    atrium.sync.TransactionSync, from a per-user watermark minus `overlap`
+    days for late-posted items. Its watermarks are kept in the same SQLite
+    file unless another `store` is given. Everything else is small and
+    replaced whole. Rows are written `batch_size` per transaction while the
+    pages are still being fetched.
+    """
+
+    def __init__(self, api, path=":memory:", overlap=7, batch_size=500,
+                 workers=1, store=None, today=date.today):
+        self.api = api
+        self.batch_size = batch_size
+        self.workers = workers
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+        self._ownStore = store is None
+        self.sync = TransactionSync(
+            api,
+            store=SQLiteWatermarkStore(path) if store is None else store,
+            overlap=overlap,
+            workers=workers,
+            skip_seen=False,
+            today=today
+        )
+
+    def close(self):
+        if self._ownStore:
+            self.sync.store.close()
+        self._db.close()
+
+    # --------------------------------
+    # REFRESH
+    # --------------------------------
+    def refreshUser(self, userGuid):
+        """
+        Refresh everything mirrored for a user.
+        """
+        self._replace("users", "guid", userGuid, [self.api.readUser(userGuid)])
+        self.refreshMembers(userGuid)
+        self.refreshAccounts(userGuid)
+        self.refreshHoldings(userGuid)
+        return self.refreshTransactions(userGuid)
+
+    def refreshMembers(self, userGuid):
+        members = self.api.iterMembers(userGuid, workers=self.workers)
+        return self._replace("members", "user_guid", userGuid, members)
+
+    def refreshAccounts(self, userGuid):
+        accounts = self.api.iterAccounts(userGuid, workers=self.workers)
+        return self._replace("accounts", "user_guid", userGuid, accounts)
+
+    def refreshHoldings(self, userGuid):
+        holdings = self.api.iterHoldings(userGuid, workers=self.workers)
+        return self._replace("holdings", "user_guid", userGuid, holdings)
+
+    def refreshTransactions(self, userGuid):
+        """
+        Fetch the transactions posted since the last refresh of this user
+        and upsert them. Returns the number of rows written.
+        """
+        # The watermark moves once the sync has been read to the end
+        transactions = self.sync.sync(userGuid)
+
+        written = 0
+        for batch in batches(self._rows("transactions", userGuid, transactions),
+                             self.batch_size):
+            with self._lock, self._db:
+                self._db.executemany(self._insert("transactions"), batch)
+            written += len(batch)
+
+        return written
+
+    def _replace(self, table, column, userGuid, records):
+        # Fetch first so a failed refresh leaves the old rows in place
+        rows = list(self._rows(table, userGuid, records))
+
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM {} WHERE {} = ?".format(table, column),
+                (userGuid,)
+            )
+            for batch in batches(rows, self.batch_size):
+                self._db.executemany(self._insert(table), batch)
+
+        return len(rows)
+
+    def _rows(self, table, userGuid, records):
+        columns = COLUMNS[table]
+
+        for record in records:
+            data = toDict(record)
+            row = [
+                userGuid if column == "user_guid" else data.get(column)
+                for column in columns
+            ]
+            row.append(json.dumps(data))
+            yield row
+
+    def _insert(self, table):
+        return "INSERT OR REPLACE INTO {} VALUES ({})".format(
+            table,
+            ", ".join("?" * (len(COLUMNS[table]) + 1))
+        )
+
+    # --------------------------------
+    # QUERIES
+    # --------------------------------
+    def readUser(self, userGuid):
+        users = self._select("users", "user", {"guid": userGuid})
+        return users[0] if users else None
+
+    def members(self, userGuid):
+        return self._select("members", "members", {"user_guid": userGuid})
+
+    def accounts(self, userGuid=None, memberGuid=None):
+        return self._select("accounts", "accounts", {
+            "user_guid": userGuid,
+            "member_guid": memberGuid
+        })
+
+    def holdings(self, userGuid=None, accountGuid=None):
+        return self._select("holdings", "holdings", {
+            "user_guid": userGuid,
+            "account_guid": accountGuid
+        })
+
+    def transactions(self, userGuid=None, accountGuid=None, dateStart=None,
+                     dateEnd=None, category=None, limit=None):
+        """
+        Mirrored transactions matching every filter given, newest first.
+        Dates are inclusive.
+        """
+        where, params = self._where({
+            "user_guid": userGuid,
+            "account_guid": accountGuid,
+            "category": category
+        }, dateStart, dateEnd)
+
+        sql = "SELECT data FROM transactions{} ORDER BY date DESC, guid".format(where)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return self._wrapped("transactions", sql, params)
+
+    def totalsByCategory(self, userGuid=None, accountGuid=None,
+                         dateStart=None, dateEnd=None):
+        """
+        {category: (count, sum of amount)} over the matching transactions.
+        """
+        where, params = self._where({
+            "user_guid": userGuid,
+            "account_guid": accountGuid
+        }, dateStart, dateEnd)
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT category, COUNT(*), SUM(amount) FROM transactions{}"
+                " GROUP BY category".format(where),
+                params
+            ).fetchall()
+
+        return dict((category, (count, total)) for category, count, total in rows)
+
+    def _where(self, filters, dateStart=None, dateEnd=None):
+        clauses = []
+        params = []
+
+        for column in sorted(filters):
+            if filters[column] is not None:
+                clauses.append("{} = ?".format(column))
+                params.append(filters[column])
+
+        if dateStart is not None:
+            clauses.append("date >= ?")
+            params.append(isoDate(dateStart))
+        if dateEnd is not None:
+            clauses.append("date <= ?")
+            params.append(isoDate(dateEnd))
+
+        if not clauses:
+            return "", params
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _select(self, table, key, filters):
+        where, params = self._where(filters)
+        sql = "SELECT data FROM {}{} ORDER BY guid".format(table, where)
+        return self._wrapped(key, sql, params)
+
+    def _wrapped(self, key, sql, params):
+        wrapperFor = getattr(self.api, "_wrapperFor", None)
+        wrap = wrapperFor(key) if wrapperFor else storage
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+
+        return [wrap(json.loads(row[0])) for row in rows]
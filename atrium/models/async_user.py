@@ -0,0 +1,139 @@
+class AsyncUser(object):
+    """
+    The asyncio counterpart of User, to be used with an AsyncApi.
+    """
+
+    def __init__(self, api, guid):
+        self.api = api
+        self.guid = guid
+
+    async def getUser(self):
+        return await self.api.readUser(self.guid)
+
+    # --------------------------------
+    # ACCOUNTS
+    # --------------------------------
+    async def getAccounts(self, queryParams={}):
+        return await self.api.getAccounts(self.guid, queryParams=queryParams)
+
+    def iterAccounts(self, queryParams={}, workers=1, window=None):
+        return self.api.iterAccounts(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
+    async def readAccount(self, acctGuid):
+        return await self.api.readAccount(self.guid, acctGuid)
+
+    async def readAccounts(self, acctGuids, concurrency=8):
+        return await self.api.readAccounts(self.guid, acctGuids, concurrency)
+
+    # --------------------------------
+    # MEMBERS
+    # --------------------------------
+    async def getMembers(self, queryParams={}):
+        return await self.api.getMembers(self.guid, queryParams=queryParams)
+
+    def iterMembers(self, queryParams={}, workers=1, window=None):
+        return self.api.iterMembers(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
+    async def readMember(self, memGuid):
+        return await self.api.readMember(self.guid, memGuid)
+
+    async def readMembers(self, memGuids, concurrency=8):
+        return await self.api.readMembers(self.guid, memGuids, concurrency)
+
+    async def createMember(self, payload):
+        return await self.api.createMember(self.guid, payload=payload)
+
+    async def getMemberStatus(self, memGuid):
+        return await self.api.getMemberStatus(self.guid, memGuid)
+
+    async def getMemberChallenges(self, memGuid):
+        return await self.api.getMemberChallenges(self.guid, memGuid)
+
+    async def aggregateMember(self, memGuid):
+        return await self.api.startMemberAgg(self.guid, memGuid)
+
+    async def resumeAggregation(self, memGuid, payload):
+        return await self.api.resumeMemberAgg(
+            self.guid,
+            memGuid,
+            payload=payload
+        )
+
+    # --------------------------------
+    # TRANSACTIONS
+    # --------------------------------
+    async def getTransactions(self, queryParams={}):
+        return await self.api.getTransactions(
+            self.guid,
+            queryParams=queryParams
+        )
+
+    def iterTransactions(self, queryParams={}, workers=1, window=None):
+        return self.api.iterTransactions(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
+    async def getTransactionsByDate(self, dateStart, dateEnd=None,
+                                    queryParams={}):
+        return await self.api.getTransactionsByDate(
+            self.guid,
+            dateStart,
+            dateEnd,
+            queryParams=queryParams
+        )
+
+    async def getTransactionsByAccount(self, acctGuid, queryParams={}):
+        return await self.api.getTransactionsByAccount(
+            self.guid,
+            acctGuid,
+            queryParams=queryParams
+        )
+
+    def iterTransactionsByAccount(self, acctGuid, queryParams={}, workers=1,
+                                  window=None):
+        return self.api.iterTransactionsByAccount(
+            self.guid,
+            acctGuid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
+    async def readTransaction(self, transGuid):
+        return await self.api.readTransaction(self.guid, transGuid)
+
+    async def readTransactions(self, transGuids, concurrency=8):
+        return await self.api.readTransactions(self.guid, transGuids, concurrency)
+
+    # --------------------------------
+    # HOLDINGS
+    # --------------------------------
+    async def getHoldings(self, queryParams={}):
+        return await self.api.getHoldings(self.guid, queryParams=queryParams)
+
+    def iterHoldings(self, queryParams={}, workers=1, window=None):
+        return self.api.iterHoldings(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
+    async def readHolding(self, holdGuid):
+        return await self.api.readHolding(self.guid, holdGuid)
+
+    async def readHoldings(self, holdGuids, concurrency=8):
+        return await self.api.readHoldings(self.guid, holdGuids, concurrency)
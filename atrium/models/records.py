@@ -0,0 +1,216 @@
+class Record(object):
+    """
+    A compact alternative to Storage for records that are held in bulk.
+
+    Known fields live in __slots__ instead of a per-instance dict, and read
+    as None when the API left them out. Fields the API adds later are kept
+    in a small overflow dict so nothing is lost.
+
+        >>> t = Transaction({"guid": "TRN-1", "amount": 61.11})
+        >>> t.amount
+        61.11
+        >>> t['guid']
+        'TRN-1'
+        >>> t.toDict()['amount']
+        61.11
+    """
+    __slots__ = ("_extra",)
+    fields = ()
+
+    def __init__(self, data=None):
+        data = data or {}
+        self._assign(data.get)
+
+        extra = None
+        if not self._fieldSet.issuperset(data):
+            extra = dict(
+                (key, value) for key, value in data.items()
+                if key not in self._fieldSet
+            )
+
+        object.__setattr__(self, "_extra", extra)
+
+    def _assign(self, get):
+        # replaced by a generated, unrolled version on every subclass
+        for field in self.fields:
+            object.__setattr__(self, field, get(field))
+
+    def __getattr__(self, key):
+        # only reached for names that are not slots
+        extra = object.__getattribute__(self, "_extra")
+        if extra is not None and key in extra:
+            return extra[key]
+        raise AttributeError(key)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def toDict(self):
+        data = dict((field, getattr(self, field)) for field in self.fields)
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.toDict()
+        return self.toDict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.toDict()
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __repr__(self):
+        return "<{} {!r}>".format(type(self).__name__, self.toDict())
+
+
+def record(name, fields):
+    """
+    Build a Record subclass with one slot per field.
+    """
+    fields = tuple(fields)
+
+    # Unrolled assignments are several times faster than a setattr loop,
+    # which matters when wrapping millions of records
+    source = "def _assign(self, get):\n" + "".join(
+        "    self.{0} = get({0!r})\n".format(field) for field in fields
+    )
+    namespace = {}
+    exec(source, namespace)
+
+    return type(name, (Record,), {
+        "__slots__": fields,
+        "fields": fields,
+        "_fieldSet": frozenset(fields),
+        "_assign": namespace["_assign"]
+    })
+
+
+Account = record("Account", [
+    "guid",
+    "apr",
+    "apy",
+    "available_balance",
+    "available_credit",
+    "balance",
+    "created_at",
+    "credit_limit",
+    "day_payment_is_due",
+    "institution_code",
+    "interest_rate",
+    "is_closed",
+    "last_payment",
+    "last_payment_at",
+    "matures_on",
+    "member_guid",
+    "minimum_balance",
+    "minimum_payment",
+    "name",
+    "original_balance",
+    "payment_due_at",
+    "payoff_balance",
+    "started_on",
+    "subtype",
+    "total_account_value",
+    "type",
+    "updated_at",
+    "user_guid"
+])
+
+Holding = record("Holding", [
+    "guid",
+    "account_guid",
+    "cost_basis",
+    "created_at",
+    "currency_code",
+    "cusip",
+    "daily_change",
+    "description",
+    "holding_type",
+    "market_value",
+    "member_guid",
+    "purchase_price",
+    "shares",
+    "symbol",
+    "updated_at",
+    "user_guid"
+])
+
+Institution = record("Institution", [
+    "code",
+    "medium_logo_url",
+    "name",
+    "small_logo_url",
+    "url"
+])
+
+Member = record("Member", [
+    "guid",
+    "aggregated_at",
+    "identifier",
+    "institution_code",
+    "metadata",
+    "name",
+    "status",
+    "successfully_aggregated_at",
+    "user_guid"
+])
+
+Transaction = record("Transaction", [
+    "guid",
+    "account_guid",
+    "amount",
+    "category",
+    "check_number",
+    "created_at",
+    "date",
+    "description",
+    "is_bill_pay",
+    "is_direct_deposit",
+    "is_expense",
+    "is_fee",
+    "is_income",
+    "is_overdraft_fee",
+    "is_payroll_advance",
+    "latitude",
+    "longitude",
+    "member_guid",
+    "memo",
+    "merchant_category_code",
+    "original_description",
+    "posted_at",
+    "status",
+    "top_level_category",
+    "transacted_at",
+    "type",
+    "updated_at",
+    "user_guid"
+])
+
+
+# Response keys cleanData and the iterators unpack, singular and plural
+RECORD_TYPES = {
+    "account": Account,
+    "accounts": Account,
+    "holding": Holding,
+    "holdings": Holding,
+    "institution": Institution,
+    "institutions": Institution,
+    "member": Member,
+    "members": Member,
+    "transaction": Transaction,
+    "transactions": Transaction
+}
@@ -1,20 +1,162 @@
+from atrium.utils import isRaw
+
+
+RELATIONSHIPS = ("accounts", "members", "holdings", "transactions")
+
+# Mutations and the relationships they make stale
+INVALIDATES = {
+    "createMember": ("members",),
+    "aggregateMember": RELATIONSHIPS,
+    "resumeAggregation": RELATIONSHIPS
+}
+
+
 class User(object):
+    """
+    A user and, loaded on first access and kept until refreshed, their
+    accounts, members, holdings and transactions.
+
+    Records are identity mapped by GUID: as long as a relationship is not
+    invalidated, readAccount and friends return the record already loaded
+    instead of fetching it again, and the same GUID is always the same
+    object. Meant to live for one request or job, not to be shared between
+    threads.
+    """
 
     def __init__(self, api, guid):
         self.api = api
         self.guid = guid
 
+        # relationship -> {guid: record} and the full list, once loaded
+        self._identity = dict((name, {}) for name in RELATIONSHIPS)
+        self._loaded = {}
+
     def getUser(self):
         return self.api.readUser(self.guid)
 
+    # --------------------------------
+    # RELATIONSHIPS
+    # --------------------------------
+    @property
+    def accounts(self):
+        return self._relationship("accounts", self.iterAccounts)
+
+    @property
+    def members(self):
+        return self._relationship("members", self.iterMembers)
+
+    @property
+    def holdings(self):
+        return self._relationship("holdings", self.iterHoldings)
+
+    @property
+    def transactions(self):
+        return self._relationship("transactions", self.iterTransactions)
+
+    def refresh(self, *names):
+        """
+        Reload the named relationships now, or every loaded one.
+        """
+        names = names or tuple(self._loaded)
+        self.invalidate(*names)
+        for name in names:
+            getattr(self, name)
+
+    def invalidate(self, *names):
+        """
+        Forget the named relationships, or all of them, so that they are
+        fetched again on next access.
+        """
+        for name in names or RELATIONSHIPS:
+            if name not in self._identity:
+                raise ValueError("Unknown relationship {!r}".format(name))
+            self._identity[name] = {}
+            self._loaded.pop(name, None)
+
+    def _relationship(self, name, load):
+        records = self._loaded.get(name)
+        if records is None:
+            records = [self._remember(name, record) for record in load()]
+            self._loaded[name] = records
+        return records
+
+    def _remember(self, name, record, guid=None):
+        # Raw bodies, see Api.raw(), are not records
+        if isRaw(record):
+            return record
+        if guid is None:
+            guid = getattr(record, "guid", None)
+        if guid is None:
+            return record
+        return self._identity[name].setdefault(guid, record)
+
+    def _read(self, name, guid, read):
+        # Raw callers asked for the body as sent, not the record
+        if self.api._rawMode():
+            return read()
+
+        record = self._identity[name].get(guid)
+        if record is None:
+            record = self._remember(name, read(), guid)
+        return record
+
+    def _readMany(self, name, guids, read):
+        # atrium.bulk imports this module
+        from atrium.bulk import BulkResult
+
+        if self.api._rawMode():
+            return read(guids)
+
+        # Only the GUIDs not loaded yet are read, and what comes back joins
+        # the identity map
+        known = self._identity[name]
+        results = dict(
+            (guid, BulkResult(guid, known[guid], None))
+            for guid in guids if guid in known
+        )
+
+        missing = [guid for guid in guids if guid not in results]
+        if missing:
+            for guid, result in read(missing).items():
+                if result.error is None:
+                    result = result._replace(
+                        result=self._remember(name, result.result, guid)
+                    )
+                results[guid] = result
+
+        return dict((guid, results[guid]) for guid in guids)
+
+    def _invalidating(self, operation, result):
+        self.invalidate(*INVALIDATES[operation])
+        return result
+
     # --------------------------------
     # ACCOUNTS
     # --------------------------------
     def getAccounts(self, queryParams={}):
         return self.api.getAccounts(self.guid, queryParams=queryParams)
 
+    def iterAccounts(self, queryParams={}, workers=1, window=None):
+        return self.api.iterAccounts(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
     def readAccount(self, acctGuid):
-        return self.api.readAccount(self.guid, acctGuid)
+        return self._read(
+            "accounts",
+            acctGuid,
+            lambda: self.api.readAccount(self.guid, acctGuid)
+        )
+
+    def readAccounts(self, acctGuids, concurrency=8):
+        return self._readMany(
+            "accounts",
+            acctGuids,
+            lambda guids: self.api.readAccounts(self.guid, guids, concurrency)
+        )
 
     # --------------------------------
     # MEMBERS
@@ -22,11 +164,33 @@ class User(object):
     def getMembers(self, queryParams={}):
         return self.api.getMembers(self.guid, queryParams=queryParams)
 
+    def iterMembers(self, queryParams={}, workers=1, window=None):
+        return self.api.iterMembers(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
     def readMember(self, memGuid):
-        return self.api.readMember(self.guid, memGuid)
+        return self._read(
+            "members",
+            memGuid,
+            lambda: self.api.readMember(self.guid, memGuid)
+        )
+
+    def readMembers(self, memGuids, concurrency=8):
+        return self._readMany(
+            "members",
+            memGuids,
+            lambda guids: self.api.readMembers(self.guid, guids, concurrency)
+        )
 
     def createMember(self, payload):
-        return self.api.createMember(self.guid, payload=payload)
+        return self._invalidating(
+            "createMember",
+            self.api.createMember(self.guid, payload=payload)
+        )
 
     def getMemberStatus(self, memGuid):
         return self.api.getMemberStatus(self.guid, memGuid)
@@ -35,10 +199,16 @@ class User(object):
         return self.api.getMemberChallenges(self.guid, memGuid)
 
     def aggregateMember(self, memGuid):
-        return self.api.startMemberAgg(self.guid, memGuid)
+        return self._invalidating(
+            "aggregateMember",
+            self.api.startMemberAgg(self.guid, memGuid)
+        )
 
     def resumeAggregation(self, memGuid, payload):
-        return self.api.resumeMemberAgg(self.guid, memGuid, payload=payload)
+        return self._invalidating(
+            "resumeAggregation",
+            self.api.resumeMemberAgg(self.guid, memGuid, payload=payload)
+        )
 
     # --------------------------------
     # TRANSACTIONS
@@ -46,6 +216,22 @@ class User(object):
     def getTransactions(self, queryParams={}):
         return self.api.getTransactions(self.guid, queryParams=queryParams)
 
+    def iterTransactions(self, queryParams={}, workers=1, window=None):
+        return self.api.iterTransactions(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
+    def getTransactionsByDate(self, dateStart, dateEnd=None, queryParams={}):
+        return self.api.getTransactionsByDate(
+            self.guid,
+            dateStart,
+            dateEnd,
+            queryParams=queryParams
+        )
+
     def getTransactionsByAccount(self, acctGuid, queryParams={}):
         return self.api.getTransactionsByAccount(
             self.guid,
@@ -53,8 +239,29 @@ class User(object):
             queryParams=queryParams
         )
 
+    def iterTransactionsByAccount(self, acctGuid, queryParams={}, workers=1,
+                                  window=None):
+        return self.api.iterTransactionsByAccount(
+            self.guid,
+            acctGuid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
     def readTransaction(self, transGuid):
-        return self.api.readTransaction(self.guid, transGuid)
+        return self._read(
+            "transactions",
+            transGuid,
+            lambda: self.api.readTransaction(self.guid, transGuid)
+        )
+
+    def readTransactions(self, transGuids, concurrency=8):
+        return self._readMany(
+            "transactions",
+            transGuids,
+            lambda guids: self.api.readTransactions(self.guid, guids, concurrency)
+        )
 
     # --------------------------------
     # HOLDINGS
@@ -62,6 +269,25 @@ class User(object):
     def getHoldings(self, queryParams={}):
         return self.api.getHoldings(self.guid, queryParams=queryParams)
 
+    def iterHoldings(self, queryParams={}, workers=1, window=None):
+        return self.api.iterHoldings(
+            self.guid,
+            queryParams=queryParams,
+            workers=workers,
+            window=window
+        )
+
     def readHolding(self, holdGuid):
-        return self.api.readHolding(self.guid, holdGuid)
+        return self._read(
+            "holdings",
+            holdGuid,
+            lambda: self.api.readHolding(self.guid, holdGuid)
+        )
+
+    def readHoldings(self, holdGuids, concurrency=8):
+        return self._readMany(
+            "holdings",
+            holdGuids,
+            lambda guids: self.api.readHoldings(self.guid, guids, concurrency)
+        )
 
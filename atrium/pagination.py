@@ -0,0 +1,113 @@
+from collections import deque
+
+from atrium.utils import storage
+
+
+def nextPage(page, pagination, count):
+    """
+    Return the page to fetch after `page`, or None once the pagination
+    metadata (or an empty page) says there is nothing left.
+    """
+    total = pagination.get("total_pages")
+    if not count or total is None or page >= total:
+        return None
+    return page + 1
+
+
+def closePage(data):
+    """
+    Release the response behind a page that will not be read, such as a
+    StreamedPage. Parsed pages have nothing to release.
+    """
+    close = getattr(data, "close", None)
+    if close is not None:
+        close()
+
+
+def paginate(fetch, key, queryParams={}, wrap=storage):
+    """
+    Lazily walk every page of a list endpoint, yielding one record at a time.
+
+    `fetch` is called with the query params of a single page and returns the
+    raw response. The next page is only requested once the current one has
+    been consumed, and only one page is held in memory at a time.
+    """
+    page = int(queryParams.get("page", 1))
+
+    while page is not None:
+        params = dict(queryParams, page=page)
+        data = fetch(params)
+
+        # Read pagination only after the records: a streamed page may not
+        # have parsed it yet
+        count = 0
+        for record in data.get(key) or []:
+            count += 1
+            yield wrap(record)
+
+        pagination = data.get("pagination") or {}
+        data = None
+
+        page = nextPage(page, pagination, count)
+
+
+def prefetch(fetch, key, queryParams={}, workers=4, window=None,
+             wrap=storage):
+    """
+    Like paginate, but once the first page reports `total_pages` the rest
+    are fetched concurrently by up to `workers` threads.
+
+    Records are still yielded in page order. At most `window` pages
+    (default twice the workers) are fetched ahead of the one being
+    consumed, which caps memory while keeping the network busy.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    window = max(window or workers * 2, 1)
+    first = int(queryParams.get("page", 1))
+
+    data = fetch(dict(queryParams, page=first))
+
+    count = 0
+    for record in data.get(key) or []:
+        count += 1
+        yield wrap(record)
+
+    pagination = data.get("pagination") or {}
+    data = None
+
+    if nextPage(first, pagination, count) is None:
+        return
+
+    pages = iter(range(first + 1, pagination["total_pages"] + 1))
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def submit():
+        for page in pages:
+            pending.append(executor.submit(fetch, dict(queryParams, page=page)))
+            return
+
+    try:
+        for _ in range(window):
+            submit()
+
+        while pending:
+            data = pending.popleft().result()
+            submit()
+
+            for record in data.get(key) or []:
+                yield wrap(record)
+            data = None
+
+    finally:
+        # Abandoned or failed iteration should not keep fetching pages
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+        # and the pages it did fetch, when streamed, still hold connections
+        closePage(data)
+        for future in pending:
+            if not future.cancelled() and future.exception() is None:
+                closePage(future.result())
@@ -0,0 +1,227 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from atrium.errors import RequestTimeoutError
+from atrium.retry import RETRYABLE_ERRORS
+from atrium.timeouts import Deadline
+
+
+CHALLENGED = "CHALLENGED"
+
+TERMINAL_STATUSES = frozenset([
+    "CLOSED",
+    "COMPLETED",
+    "DEGRADED",
+    "DENIED",
+    "DISABLED",
+    "DISCONTINUED",
+    "EXPIRED",
+    "FAILED",
+    "HALTED",
+    "IMPEDED",
+    "IMPORTED",
+    "LOCKED",
+    "PREVENTED",
+    "REJECTED"
+])
+
+# Seconds until the first check after a member enters a status. Early
+# statuses resolve quickly, DELAYED means the institution asked us to wait.
+POLL_INTERVALS = {
+    "INITIATED": 1,
+    "REQUESTED": 1,
+    "RESUMED": 1,
+    "RECEIVED": 2,
+    "TRANSFERRED": 2,
+    "PROCESSED": 1,
+    "DELAYED": 30
+}
+
+
+class _Watch(object):
+    __slots__ = (
+        "userGuid", "memGuid", "future", "status", "interval", "deadline"
+    )
+
+    def __init__(self, userGuid, memGuid, future, deadline):
+        self.userGuid = userGuid
+        self.memGuid = memGuid
+        self.future = future
+        self.status = None
+        self.interval = 0
+        self.deadline = deadline
+
+
+class StatusPoller(object):
+    """
+    Watch the aggregation status of many members at once.
+
+    Every due check is issued from one pool of `workers` threads, driven by
+    a single scheduler thread. A member is checked again after the interval
+    for its status (POLL_INTERVALS), growing by `growth` while the status
+    stays the same, up to `max_interval`.
+
+    `watch` returns a Future resolved with the member's status once it
+    reaches a terminal status or CHALLENGED. At most `max_outstanding`
+    members are watched at a time; further calls to `watch` block until
+    one finishes.
+    """
+
+    def __init__(self, api, workers=8, max_outstanding=1000, intervals=None,
+                 default_interval=2, growth=1.5, max_interval=60,
+                 timeout=None, clock=time.time):
+        self.api = api
+        self.intervals = dict(POLL_INTERVALS, **(intervals or {}))
+        self.default_interval = default_interval
+        self.growth = growth
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.clock = clock
+
+        self._slots = threading.BoundedSemaphore(max_outstanding)
+        self._outstanding = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def outstanding(self):
+        return self._outstanding
+
+    def watch(self, userGuid, memGuid, callback=None):
+        """
+        Start polling a member. `callback`, if given, is called with the
+        Future once it is done.
+        """
+        self._slots.acquire()
+
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+
+        deadline = None
+        if self.timeout is not None:
+            deadline = Deadline(self.timeout, self.clock)
+
+        with self._condition:
+            if self._closed:
+                self._slots.release()
+                raise RuntimeError("StatusPoller is closed")
+            self._outstanding += 1
+
+        self._schedule(_Watch(userGuid, memGuid, future, deadline), 0)
+        return future
+
+    def close(self, wait=True):
+        """
+        Stop polling, cancelling the Futures of members still being watched.
+        """
+        with self._condition:
+            self._closed = True
+            watches = [entry[2] for entry in self._heap]
+            self._heap = []
+            self._condition.notify()
+
+        for watch in watches:
+            watch.future.cancel()
+            self._release()
+
+        self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _schedule(self, watch, delay):
+        with self._condition:
+            if self._closed:
+                watch.future.cancel()
+                self._release()
+                return
+
+            heapq.heappush(
+                self._heap,
+                (self.clock() + delay, next(self._sequence), watch)
+            )
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+
+                    wait = self._heap[0][0] - self.clock()
+                    if wait <= 0:
+                        break
+                    self._condition.wait(wait)
+
+                if self._closed:
+                    return
+
+                watch = heapq.heappop(self._heap)[2]
+
+            self._executor.submit(self._poll, watch)
+
+    def _poll(self, watch):
+        if watch.future.cancelled():
+            self._release()
+            return
+
+        if watch.deadline is not None and watch.deadline.expires <= self.clock():
+            return self._finish(watch, error=RequestTimeoutError(
+                "Member {} is still {}".format(watch.memGuid, watch.status)
+            ))
+
+        try:
+            member = self.api.getMemberStatus(watch.userGuid, watch.memGuid)
+
+        except RETRYABLE_ERRORS as e:
+            delay = self._nextInterval(watch, watch.status)
+            return self._schedule(watch, max(delay, e.retry_after or 0))
+
+        except Exception as e:
+            return self._finish(watch, error=e)
+
+        status = member.get("status")
+        if status in TERMINAL_STATUSES or status == CHALLENGED:
+            return self._finish(watch, result=member)
+
+        self._schedule(watch, self._nextInterval(watch, status))
+
+    def _nextInterval(self, watch, status):
+        if status == watch.status and watch.interval:
+            watch.interval = min(watch.interval * self.growth, self.max_interval)
+        else:
+            watch.interval = self.intervals.get(status, self.default_interval)
+        watch.status = status
+        return watch.interval
+
+    def _finish(self, watch, result=None, error=None):
+        self._release()
+
+        if watch.future.cancelled():
+            return
+        if error is not None:
+            watch.future.set_exception(error)
+        else:
+            watch.future.set_result(result)
+
+    def _release(self):
+        with self._condition:
+            self._outstanding -= 1
+        self._slots.release()
@@ -1,18 +1,136 @@
-import json
-import requests
-
 from atrium.errors import NetworkError, RequestTimeoutError
 
+# requests and json are imported on first use, so that importing atrium
+# stays cheap for short-lived processes that may never make a request
+
+
+class Transport(object):
+    """
+    What request() hands calls to when given one as its session, instead
+    of a requests Session.
+
+    send() returns a response with status_code, headers, content, json(),
+    iter_content(size) and close(), like a requests Response, and raises
+    NetworkError or RequestTimeoutError when the call fails. `data` is the
+    encoded body or None, `timeout` a (connect, read) tuple or None.
+    """
+
+    def send(self, url, method, headers, data=None, timeout=None,
+             stream=False):
+        raise NotImplementedError
+
+    def poolStats(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def createSession(pool_connections=10, pool_maxsize=10, pool_block=False,
+                  keep_alive=True):
+    """
+    Build a requests Session backed by a persistent urllib3 connection pool.
+
+    pool_connections is the number of per-host pools kept around,
+    pool_maxsize the number of connections kept open to a single host and
+    pool_block whether callers wait for a free connection once a host is
+    at pool_maxsize instead of opening a throwaway one.
+    """
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def idleConnections(pool):
+    # urllib3 fills the queue with None placeholders up to maxsize, only
+    # the rest are open connections waiting to be reused
+    if not pool.pool:
+        return 0
+    return sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+
+def poolStats(session):
+    """
+    Summarize the connection pools held by a session, keyed by host.
+    """
+    if isinstance(session, Transport):
+        return session.poolStats()
+
+    hosts = {}
+    totals = {"connections": 0, "requests": 0, "idle": 0}
+
+    for adapter in set(session.adapters.values()):
+        manager = getattr(adapter, "poolmanager", None)
+        if manager is None:
+            continue
+
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+
+            host = "{}://{}:{}".format(pool.scheme, pool.host, pool.port)
+            stats = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": idleConnections(pool),
+                "maxsize": pool.pool.maxsize if pool.pool else 0
+            }
+            hosts[host] = stats
+
+            for field in totals:
+                totals[field] += stats[field]
+
+    totals["hosts"] = hosts
+    return totals
+
+
 def request(url, method, headers={}, payload={}, options={}):
+    import json
+
+    http = options.get("session")
+    if isinstance(http, Transport):
+        data = json.dumps(payload) if method in ("POST", "PUT") else None
+        return http.send(
+            url,
+            method,
+            headers,
+            data,
+            timeout=options.get("timeout"),
+            stream=bool(options.get("stream"))
+        )
+
+    import requests
+
+    http = http or requests
+
+    kwargs = {"headers": headers}
+    if options.get("timeout") is not None:
+        kwargs["timeout"] = options["timeout"]
+    if options.get("stream"):
+        kwargs["stream"] = True
+
     try:
         if method == "GET":
-            return requests.get(url, headers=headers)
+            return http.get(url, **kwargs)
         elif method == "POST":
-            return requests.post(url, headers=headers, data=json.dumps(payload))
+            return http.post(url, data=json.dumps(payload), **kwargs)
         elif method == "PUT":
-            return requests.put(url, headers=headers, data=json.dumps(payload))
+            return http.put(url, data=json.dumps(payload), **kwargs)
         elif method == "DELETE":
-            return requests.delete(url, headers=headers)
+            return http.delete(url, **kwargs)
 
     except requests.exceptions.HTTPError as e:
         raise NetworkError(repr(e))
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+
+from atrium.errors import (
+    MaintenanceError,
+    NetworkError,
+    RequestTimeoutError,
+    ServerError,
+    TooManyRequestsError
+)
+
+
+RETRYABLE_ERRORS = (
+    MaintenanceError,
+    NetworkError,
+    RequestTimeoutError,
+    ServerError,
+    TooManyRequestsError
+)
+
+
+def parseRetryAfter(value, now=None):
+    """
+    Turn a Retry-After header (delta seconds or an HTTP date) into seconds.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    from email.utils import mktime_tz, parsedate_tz
+
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+
+    now = time.time() if now is None else now
+    return max(mktime_tz(parsed) - now, 0.0)
+
+
+class RetryBudget(object):
+    """
+    A token bucket capping how much retries can add on top of normal traffic.
+
+    Every failed attempt costs a token and every success earns back
+    `token_ratio` of one. Retries are only allowed while more than half of
+    `max_tokens` are left, so during an outage the retry rate falls to a
+    fraction of the success rate instead of multiplying the load.
+    """
+
+    def __init__(self, max_tokens=100, token_ratio=0.1):
+        self.max_tokens = float(max_tokens)
+        self.token_ratio = token_ratio
+        self.tokens = self.max_tokens
+        self._lock = threading.Lock()
+
+    def recordSuccess(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.token_ratio, self.max_tokens)
+
+    def recordFailure(self):
+        with self._lock:
+            self.tokens = max(self.tokens - 1, 0.0)
+
+    def allowRetry(self):
+        return self.tokens > self.max_tokens / 2
+
+
+# Shared by every policy that is not given its own budget
+processBudget = RetryBudget()
+
+
+class RetryPolicy(object):
+    """
+    Retries transient failures with capped exponential backoff and full
+    jitter.
+
+    attempts is the total number of tries per request. Only methods listed
+    in `methods` are retried, so a POST is never sent twice by default.
+    A Retry-After header on the failed response takes precedence over the
+    computed backoff, up to `max_retry_after` seconds.
+    """
+
+    def __init__(self, attempts=3, backoff=0.5, max_backoff=30,
+                 max_retry_after=120, methods=("GET", "PUT", "DELETE"),
+                 errors=RETRYABLE_ERRORS, budget=None, sleep=time.sleep):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.methods = frozenset(methods)
+        self.errors = errors
+        self.budget = budget or processBudget
+        self.sleep = sleep
+
+    def shouldRetry(self, method, error, attempt):
+        if not isinstance(error, self.errors):
+            return False
+
+        self.budget.recordFailure()
+
+        if method not in self.methods or attempt >= self.attempts:
+            return False
+
+        return self.budget.allowRetry()
+
+    def delay(self, attempt, error):
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+
+        ceiling = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def backoffWithin(self, attempt, error, deadline=None):
+        """
+        The delay before the next attempt, raising RequestTimeoutError when
+        the deadline would run out before it.
+        """
+        delay = self.delay(attempt, error)
+        if deadline is not None and delay >= deadline.remaining():
+            raise RequestTimeoutError("Deadline exceeded while backing off")
+        return delay
+
+    def call(self, method, send, deadline=None):
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            # An expired deadline is not a failure of the server, so it
+            # raises here instead of costing the shared budget a token
+            if deadline is not None:
+                deadline.remaining()
+
+            try:
+                result = send()
+            except Exception as e:
+                if not self.shouldRetry(method, e, attempt):
+                    raise
+                self.sleep(self.backoffWithin(attempt, e, deadline))
+                continue
+
+            self.budget.recordSuccess()
+            return result
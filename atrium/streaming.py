@@ -0,0 +1,185 @@
+import codecs
+import json
+import re
+
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _Buffer(object):
+    """
+    Decoded text of a body arriving in chunks. Consumed text is dropped
+    whenever a new chunk comes in, so only the unparsed tail is kept.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decode = codecs.getincrementaldecoder("utf-8")().decode
+        self.decoder = json.JSONDecoder()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+
+        for chunk in self.chunks:
+            text = self.decode(chunk)
+            if text:
+                self.text = self.text[self.pos:] + text
+                self.pos = 0
+                return True
+
+        self.eof = True
+        tail = self.decode(b"", True)
+        if tail:
+            self.text = self.text[self.pos:] + tail
+            self.pos = 0
+        return bool(tail)
+
+    def peek(self):
+        """
+        The next non-whitespace character, or None at the end of the body.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def take(self, *expected):
+        char = self.peek()
+        if char not in expected:
+            raise ValueError("Expected {} at {!r}".format(
+                " or ".join(expected),
+                self.text[self.pos:self.pos + 20]
+            ))
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.pos)
+
+                # A number running to the end of the buffer may continue in
+                # the next chunk, so only trust it once more text follows
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+
+            self.fill()
+
+
+def iterRecords(chunks, key, extra=None):
+    """
+    Parse a JSON object arriving as byte chunks and yield the elements of
+    its `key` array as soon as each one is complete. Every other top-level
+    member is stored in `extra`, once it has been parsed.
+    """
+    buf = _Buffer(chunks)
+
+    buf.take("{")
+    if buf.peek() == "}":
+        return
+
+    while True:
+        name = buf.value()
+        buf.take(":")
+
+        if name == key and buf.peek() == "[":
+            buf.take("[")
+
+            if buf.peek() == "]":
+                buf.take("]")
+            else:
+                while True:
+                    yield buf.value()
+                    if buf.take(",", "]") == "]":
+                        break
+
+        else:
+            value = buf.value()
+            if extra is not None:
+                extra[name] = value
+
+        if buf.take(",", "}") == "}":
+            return
+
+
+def iterChunks(response, size=CHUNK_SIZE):
+    """
+    The body of a streamed response as it arrives, closing the response
+    once it is read or the iterator is dropped.
+    """
+    try:
+        for chunk in response.iter_content(size):
+            if chunk:
+                yield chunk
+    finally:
+        response.close()
+
+
+class StreamedPage(object):
+    """
+    A list response whose records are parsed off the socket while they are
+    iterated, instead of being decoded into one big list first.
+
+    `get(key)` returns the record iterator; any other member, such as
+    "pagination", is available once the records before it were consumed.
+    """
+
+    def __init__(self, response, key):
+        self.response = response
+        self.key = key
+        self.extra = {}
+        self._records = iterRecords(
+            response.iter_content(CHUNK_SIZE),
+            key,
+            self.extra
+        )
+
+    def records(self):
+        try:
+            for record in self._records:
+                yield record
+
+            # drain the rest of the body for members after the records
+            for _ in self._records:
+                pass
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Release the connection. Whatever is left of the body is read first,
+        so that the connection can go back to the pool instead of being
+        dropped.
+        """
+        try:
+            for _ in self.response.iter_content(CHUNK_SIZE):
+                pass
+        except Exception:
+            # already read, or the connection broke: nothing to keep
+            pass
+        finally:
+            self.response.close()
+
+    def get(self, name, default=None):
+        if name == self.key:
+            return self.records()
+        return self.extra.get(name, default)
+
+    def __getitem__(self, name):
+        if name == self.key:
+            return self.records()
+        return self.extra[name]
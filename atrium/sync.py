@@ -0,0 +1,193 @@
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from atrium.utils import dateRange, isoDate
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_watermarks (
+    user_guid TEXT NOT NULL,
+    account_guid TEXT NOT NULL,
+    watermark TEXT NOT NULL,
+    PRIMARY KEY (user_guid, account_guid)
+);
+CREATE TABLE IF NOT EXISTS sync_seen (
+    user_guid TEXT NOT NULL,
+    account_guid TEXT NOT NULL,
+    guid TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (user_guid, account_guid, guid)
+);
+"""
+
+
+class MemoryWatermarkStore(object):
+    """
+    Keeps watermarks and recently seen GUIDs for the life of the process.
+
+    A watermark is kept per user, and per account when syncing by account
+    (stored under the account GUID, the user-wide one under "").
+    """
+
+    def __init__(self):
+        self._watermarks = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def watermark(self, userGuid, accountGuid=None):
+        with self._lock:
+            return self._watermarks.get((userGuid, accountGuid or ""))
+
+    def seen(self, userGuid, accountGuid=None):
+        with self._lock:
+            return set(self._seen.get((userGuid, accountGuid or ""), ()))
+
+    def advance(self, userGuid, accountGuid, watermark, seen, keepSince):
+        """
+        Move the watermark and remember `seen` (GUID -> date), forgetting
+        GUIDs dated before keepSince that no later window will return.
+        """
+        key = (userGuid, accountGuid or "")
+
+        with self._lock:
+            known = self._seen.setdefault(key, {})
+            known.update(seen)
+            for guid in [g for g, day in known.items() if day < keepSince]:
+                del known[guid]
+            self._watermarks[key] = watermark
+
+
+class SQLiteWatermarkStore(object):
+    """
+    Keeps watermarks and recently seen GUIDs in a local SQLite file, so
+    they survive between runs.
+    """
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def watermark(self, userGuid, accountGuid=None):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT watermark FROM sync_watermarks"
+                " WHERE user_guid = ? AND account_guid = ?",
+                (userGuid, accountGuid or "")
+            ).fetchone()
+        return row[0] if row else None
+
+    def seen(self, userGuid, accountGuid=None):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT guid FROM sync_seen"
+                " WHERE user_guid = ? AND account_guid = ?",
+                (userGuid, accountGuid or "")
+            ).fetchall()
+        return set(row[0] for row in rows)
+
+    def advance(self, userGuid, accountGuid, watermark, seen, keepSince):
+        key = (userGuid, accountGuid or "")
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sync_seen VALUES (?, ?, ?, ?)",
+                [key + (guid, day) for guid, day in seen.items()]
+            )
+            self._db.execute(
+                "DELETE FROM sync_seen"
+                " WHERE user_guid = ? AND account_guid = ? AND date < ?",
+                key + (keepSince,)
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_watermarks VALUES (?, ?, ?)",
+                key + (watermark,)
+            )
+
+    def close(self):
+        self._db.close()
+
+
+class TransactionSync(object):
+    """
+    Fetch only the transactions that are new since the last sync of a user
+    or account.
+
+    Each run asks for the window from the previous watermark, minus
+    `overlap` days to catch late-posted transactions, up to today. Any GUID
+    already returned by an earlier run is skipped, and the watermark only
+    moves once a run has been consumed completely.
+
+    With skip_seen=False, transactions the overlap fetches again are
+    returned again too, in their latest state, for callers that upsert
+    them such as atrium.mirror.Mirror.
+    """
+
+    def __init__(self, api, store=None, overlap=7, workers=1, stream=False,
+                 skip_seen=True, today=date.today):
+        self.api = api
+        self.store = store if store is not None else MemoryWatermarkStore()
+        self.overlap = timedelta(days=overlap)
+        self.workers = workers
+        self.stream = stream
+        self.skip_seen = skip_seen
+        self.today = today
+
+    def window(self, userGuid, accountGuid=None):
+        """
+        The (from, to) dates the next sync would fetch. `from` is None until
+        the first sync has completed.
+        """
+        end = self.today()
+        watermark = self.store.watermark(userGuid, accountGuid)
+        if watermark is None:
+            return None, end
+
+        start = datetime.strptime(watermark, "%Y-%m-%d").date()
+        return start - self.overlap, end
+
+    def sync(self, userGuid, accountGuid=None, queryParams={}):
+        """
+        Yield every transaction of the user (or one of their accounts) that
+        no earlier sync has returned.
+        """
+        start, end = self.window(userGuid, accountGuid)
+        params = dateRange(start, end, queryParams)
+
+        if accountGuid:
+            records = self.api.iterTransactionsByAccount(
+                userGuid,
+                accountGuid,
+                queryParams=params,
+                workers=self.workers,
+                stream=self.stream
+            )
+        else:
+            records = self.api.iterTransactions(
+                userGuid,
+                queryParams=params,
+                workers=self.workers,
+                stream=self.stream
+            )
+
+        known = self.store.seen(userGuid, accountGuid) if self.skip_seen else ()
+        seen = {}
+
+        for record in records:
+            guid = record.get("guid")
+            if guid in known or guid in seen:
+                continue
+
+            seen[guid] = record.get("date") or isoDate(end)
+            yield record
+
+        self.store.advance(
+            userGuid,
+            accountGuid,
+            isoDate(end),
+            seen if self.skip_seen else {},
+            isoDate(end - self.overlap)
+        )
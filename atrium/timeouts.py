@@ -0,0 +1,43 @@
+import time
+
+from atrium.errors import RequestTimeoutError
+
+
+class Deadline(object):
+    """
+    A point in time after which no more requests should be started for an
+    operation, however many requests or retries it takes.
+    """
+
+    def __init__(self, seconds, clock=time.time):
+        self.clock = clock
+        self.expires = clock() + seconds
+
+    def remaining(self):
+        remaining = self.expires - self.clock()
+        if remaining <= 0:
+            raise RequestTimeoutError("Deadline exceeded")
+        return remaining
+
+    def earliest(self, other):
+        if other is None or self.expires <= other.expires:
+            return self
+        return other
+
+
+def capTimeout(timeout, deadline):
+    """
+    Shrink a (connect, read) timeout so neither outlives the deadline.
+    """
+    if deadline is None:
+        return timeout
+
+    remaining = deadline.remaining()
+    if timeout is None:
+        return (remaining, remaining)
+
+    connect, read = timeout
+    return (
+        remaining if connect is None else min(connect, remaining),
+        remaining if read is None else min(read, remaining)
+    )
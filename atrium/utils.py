@@ -1,3 +1,9 @@
+try:
+    from collections.abc import Iterator, Sequence
+except ImportError:
+    from collections import Iterator, Sequence
+
+
 
 def cleanData(key):
 
@@ -9,19 +15,235 @@ def cleanData(key):
                 new_data = {}
                 new_data[key] = kwargs.get('payload')
                 kwargs['payload'] = new_data
-            # Unpack using the same key
-            res = func(*args, **kwargs)[key]
+            res = func(*args, **kwargs)
+
+            # Let the client pick what records are wrapped in
+            wrapperFor = getattr(args[0], '_wrapperFor', None)
+            wrap = wrapperFor(key) if wrapperFor else storage
 
-            # storigify them
-            if isinstance(res, list):
-                return [storage(r) for r in res]
-            return storage(res)
+            # Async clients hand back a coroutine, unpack it once it resolves
+            if hasattr(res, '__await__'):
+                from atrium.async_api import unpackLater
+                return unpackLater(res, key, wrap)
+
+            return unpack(res, key, wrap)
 
         return anotherWrapper
 
     return wrapper
 
 
+def unpack(data, key, wrap=None):
+    # Raw bodies, see Api.raw(), are handed back untouched
+    if isRaw(data):
+        return data
+
+    wrap = wrap or storage
+
+    # Unpack using the same key
+    res = data[key]
+
+    # storigify them
+    if isinstance(res, list):
+        if isLazy(wrap):
+            return LazyList(res, wrap)
+        return [wrap(r) for r in res]
+    return wrap(res)
+
+
+def isRaw(data):
+    # Python 2 iterators have next() rather than __next__
+    return isinstance(data, (bytes, bytearray, memoryview, Iterator))
+
+
+def responseSize(response, stream=False):
+    """
+    Body size of a response in bytes. Streamed bodies are not read here,
+    their Content-Length is used instead.
+    """
+    if response is None:
+        return 0
+    if not stream:
+        content = getattr(response, "content", None)
+        if isinstance(content, bytes):
+            return len(content)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return int(headers.get("Content-Length") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def endpointTemplate(endpoint):
+    """
+    Replace the GUIDs and codes in an endpoint with {}, so
+    "users/USR-1/accounts/ACT-2?page=3" becomes "users/{}/accounts/{}".
+    Atrium paths alternate resource names and identifiers.
+    """
+    parts = endpoint.split("?", 1)[0].split("/")
+    return "/".join(
+        "{}" if index % 2 else part
+        for index, part in enumerate(parts)
+    )
+
+
+def isoDate(value):
+    """
+    Format a date, datetime or already formatted string as YYYY-MM-DD.
+    """
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def dateRange(dateStart, dateEnd=None, queryParams={}):
+    """
+    Query params filtering a list of transactions to a date window. An open
+    ended window (dateEnd=None) runs up to the present.
+    """
+    params = dict(queryParams)
+    if dateStart is not None:
+        params["from_date"] = isoDate(dateStart)
+    if dateEnd is not None:
+        params["to_date"] = isoDate(dateEnd)
+    return params
+
+
+class RecordView(object):
+    """
+    Attribute and item access over a parsed record, without copying it.
+    Missing attributes raise AttributeError, like Storage. The parsed dict
+    may be shared with a cache, so the first write copies it.
+
+        >>> data = {"guid": "ACT-1", "balance": 10.0}
+        >>> view = RecordView(data)
+        >>> view.balance, view["guid"]
+        (10.0, 'ACT-1')
+        >>> view.toDict() is data
+        True
+        >>> view.balance = 0.0
+        >>> data["balance"]
+        10.0
+    """
+    __slots__ = ("_data", "_owned")
+
+    def __init__(self, data):
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_owned", False)
+
+    def __getattr__(self, key):
+        try:
+            return self._data[key]
+        except KeyError as k:
+            raise AttributeError(k)
+
+    def __setattr__(self, key, value):
+        if not self._owned:
+            object.__setattr__(self, "_data", dict(self._data))
+            object.__setattr__(self, "_owned", True)
+        self._data[key] = value
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def keys(self):
+        return self._data.keys()
+
+    def items(self):
+        return self._data.items()
+
+    def toDict(self):
+        """
+        The parsed dict itself, or its copy once the view has been written.
+        """
+        return self._data
+
+    def __eq__(self, other):
+        if isinstance(other, RecordView):
+            other = other._data
+        return self._data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self._data
+
+    def __setstate__(self, data):
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_owned", True)
+
+    def __repr__(self):
+        return "<RecordView {!r}>".format(self._data)
+
+
+def isLazy(wrap):
+    return isinstance(wrap, type) and issubclass(wrap, RecordView)
+
+
+class LazyList(Sequence):
+    """
+    A read-only sequence over a parsed list that wraps each element only
+    when it is accessed. Slicing returns another LazyList over the same
+    list, so neither the list nor its records are ever copied.
+
+        >>> accounts = LazyList([{"guid": "A"}, {"guid": "B"}, {"guid": "C"}])
+        >>> accounts[-1].guid
+        'C'
+        >>> [a.guid for a in accounts[::2]]
+        ['A', 'C']
+    """
+    __slots__ = ("_items", "_wrap", "_indices")
+
+    def __init__(self, items, wrap=RecordView, indices=None):
+        self._items = items
+        self._wrap = wrap
+        self._indices = range(len(items)) if indices is None else indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyList(self._items, self._wrap, self._indices[index])
+        return self._wrap(self._items[self._indices[index]])
+
+    def __iter__(self):
+        items, wrap = self._items, self._wrap
+        for index in self._indices:
+            yield wrap(items[index])
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, LazyList)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other)
+        )
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "<LazyList of {} records>".format(len(self))
+
+
 class Storage(dict):
     """
     A Storage object is like a dictionary except `obj.foo` can be used
@@ -0,0 +1,81 @@
+"""
+Connections opened and requests per second of concurrent Api calls over
+HTTP/1.1 connection pooling versus one multiplexed HTTP/2 connection, each
+against a local FakeAtrium.
+
+    python benchmarks/bench_http2.py [--latency 0.01] [--concurrency 64]
+
+Needs httpx and h2 (pip install pytrium[http2]).
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, ".")
+
+from atrium import Api
+from atrium.http2 import Http2Transport
+from atrium.metrics import Metrics
+from benchmarks.fake_atrium import FakeAtrium
+
+
+def run(name, server, concurrency, requests, **apiOptions):
+    metrics = Metrics()
+    api = Api(
+        key="key",
+        client_id="client",
+        root=server.root,
+        metrics=metrics,
+        **apiOptions
+    )
+
+    def call(index):
+        api.readUser("USR-{}".format(index))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # warm up, so both protocols start with their connections open
+        list(pool.map(call, range(concurrency)))
+        metrics.reset()
+
+        start = time.time()
+        list(pool.map(call, range(requests)))
+        elapsed = time.time() - start
+
+    latency = metrics.snapshot()["GET users/{}"]["latency"]
+    api.close()
+
+    print("{:<10} {:>12} {:>10.0f} {:>10.2f} {:>10.2f}".format(
+        name,
+        server.connections,
+        requests / elapsed,
+        latency["p50"] * 1000,
+        latency["p99"] * 1000
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="server latency per request, in seconds")
+    parser.add_argument("--concurrency", type=int, default=64,
+                        help="calls in flight at once")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="calls measured per protocol")
+    args = parser.parse_args()
+
+    print("{:<10} {:>12} {:>10} {:>10} {:>10}".format(
+        "protocol", "connections", "req/s", "p50 ms", "p99 ms"
+    ))
+
+    with FakeAtrium(latency=args.latency) as server:
+        run("HTTP/1.1", server, args.concurrency, args.requests,
+            pool_maxsize=args.concurrency)
+
+    with FakeAtrium(latency=args.latency, http2=True) as server:
+        run("HTTP/2", server, args.concurrency, args.requests,
+            session=Http2Transport(max_connections=1, prior_knowledge=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Per-call latency of Api against a local keep-alive HTTP server, with and
+without connection reuse.
+
+    python benchmarks/bench_pool.py [calls]
+"""
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from atrium import Api
+from benchmarks.fake_atrium import FakeAtrium
+
+
+def timeCalls(api, calls):
+    api.readUser("USR-123")
+
+    start = time.time()
+    for _ in range(calls):
+        api.readUser("USR-123")
+    return (time.time() - start) / calls
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with FakeAtrium() as server:
+        fresh = Api(key="key", client_id="client", root=server.root, keep_alive=False)
+        pooled = Api(key="key", client_id="client", root=server.root)
+
+        fresh_latency = timeCalls(fresh, calls)
+        pooled_latency = timeCalls(pooled, calls)
+
+        print("calls:              {}".format(calls))
+        print("new connection:     {:.1f} us/call".format(fresh_latency * 1e6))
+        print("pooled keep-alive:  {:.1f} us/call".format(pooled_latency * 1e6))
+        print("speedup:            {:.2f}x".format(fresh_latency / pooled_latency))
+        print("pool stats:         {}".format(pooled.poolStats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Memory held by Storage versus Transaction records for a synthetic set of
+parsed transactions.
+
+    python benchmarks/bench_records.py [count]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from atrium.models.records import Transaction
+from atrium.utils import storage
+
+
+def syntheticTransactions(count):
+    categories = ["Groceries", "Gas", "Restaurants", "Paycheck", "Transfer"]
+
+    # Atrium sends every field, null or not
+    empty = dict((field, None) for field in Transaction.fields)
+
+    for i in range(count):
+        transaction = dict(empty)
+        transaction.update({
+            "guid": "TRN-{:032d}".format(i),
+            "account_guid": "ACT-{:032d}".format(i % 7),
+            "user_guid": "USR-00000000000000000000000000000001",
+            "member_guid": "MBR-00000000000000000000000000000001",
+            "amount": 10.0 + (i % 5000) / 100.0,
+            "category": categories[i % 5],
+            "top_level_category": categories[i % 5],
+            "date": "2016-09-{:02d}".format(1 + i % 28),
+            "description": "Whole Foods",
+            "original_description": "WHOLE FOODS #1234",
+            "is_expense": i % 5 != 3,
+            "is_income": i % 5 == 3,
+            "status": "POSTED",
+            "type": "DEBIT"
+        })
+        yield transaction
+
+
+def measure(wrap, raw):
+    gc.collect()
+    start = time.time()
+    wrapped = [wrap(r) for r in raw]
+    elapsed = time.time() - start
+    del wrapped
+
+    gc.collect()
+    tracemalloc.start()
+    wrapped = [wrap(r) for r in raw]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del wrapped
+    return size, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    # The parsed JSON is shared by both, only the wrappers are measured
+    raw = list(syntheticTransactions(count))
+
+    storage_size, storage_time = measure(storage, raw)
+    record_size, record_time = measure(Transaction, raw)
+
+    print("transactions:  {}".format(count))
+    print("Storage:       {:8.1f} MB  {:.2f}s".format(storage_size / 1e6, storage_time))
+    print("Transaction:   {:8.1f} MB  {:.2f}s".format(record_size / 1e6, record_time))
+    print("saved:         {:8.1f}%".format(100.0 * (1 - float(record_size) / storage_size)))
+
+
+if __name__ == "__main__":
+    main()
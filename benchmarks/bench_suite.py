@@ -0,0 +1,117 @@
+"""
+Requests per second, p99 request latency and peak memory of the main
+access patterns, against a local FakeAtrium.
+
+    python benchmarks/bench_suite.py [--latency 0.002] [--scale 1]
+
+Run it before and after a change to catch regressions offline. Latency is
+per request as seen by Api, measured with atrium.metrics.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from atrium import Api
+from atrium.metrics import Metrics
+from benchmarks.fake_atrium import FakeAtrium
+
+
+def singleCalls(api, scale):
+    for _ in range(300 * scale):
+        api.readUser("USR-1")
+
+
+def pagination(workers):
+    def run(api, scale):
+        for _ in api.iterTransactions(
+            "USR-1",
+            queryParams={"records_per_page": 250},
+            workers=workers
+        ):
+            pass
+    return run
+
+
+def fanOut(concurrency):
+    def run(api, scale):
+        guids = ("USR-{}".format(i) for i in range(200 * scale))
+        for result in api.forEachUser(guids, "getAccounts", concurrency):
+            if result.error:
+                raise result.error
+    return run
+
+
+SCENARIOS = [
+    ("single readUser", singleCalls, {}),
+    ("paginate x1", pagination(1), {"records": 10000}),
+    ("paginate x8", pagination(8), {"records": 10000}),
+    ("fan-out x16", fanOut(16), {})
+]
+
+
+def measure(name, scenario, server, scale, **apiOptions):
+    metrics = Metrics()
+    api = Api(
+        key="key",
+        client_id="client",
+        root=server.root,
+        metrics=metrics,
+        **apiOptions
+    )
+
+    # warm the connection pool and the server's response cache
+    scenario(api, 1)
+    metrics.reset()
+
+    start = time.time()
+    scenario(api, scale)
+    elapsed = time.time() - start
+    snapshot = metrics.snapshot()
+
+    # tracemalloc slows everything down, so memory gets a run of its own
+    tracemalloc.start()
+    scenario(api, scale)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    requests = 0
+    p99 = 0
+    for endpoint in snapshot.values():
+        requests += endpoint["requests"]
+        p99 = max(p99, endpoint["latency"]["p99"] or 0)
+
+    api.close()
+    print("{:<18} {:>10.0f} {:>10.2f} {:>10.1f} {:>8.2f}".format(
+        name,
+        requests / elapsed,
+        p99 * 1000,
+        peak / 1e6,
+        elapsed
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="server latency per request, in seconds")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="multiply the work done by every scenario")
+    args = parser.parse_args()
+
+    print("{:<18} {:>10} {:>10} {:>10} {:>8}".format(
+        "scenario", "req/s", "p99 ms", "peak MB", "secs"
+    ))
+
+    for name, scenario, serverOptions in SCENARIOS:
+        options = dict(serverOptions)
+        options["records"] = options.get("records", 100) * args.scale
+
+        with FakeAtrium(latency=args.latency, **options) as server:
+            measure(name, scenario, server, args.scale, pool_maxsize=16)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+"""
+A local fake of the Atrium API for benchmarks, serving every endpoint Api
+uses with synthetic records.
+
+    with FakeAtrium(latency=0.005, records=500, page_size=100) as server:
+        api = Api(key="key", client_id="client", root=server.root)
+
+latency (seconds, plus up to `jitter`) is slept before every response.
+List endpoints hold `records` records served `page_size` per page unless
+records_per_page is asked for, each padded to about `record_size` bytes.
+`error_rate` of the requests fail with `error_status`, and failNext()
+queues failures for the next requests. With http2=True the server speaks
+cleartext HTTP/2 with prior knowledge instead of HTTP/1.1 (this needs h2).
+`connections` counts the connections accepted.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import BaseRequestHandler, TCPServer, ThreadingMixIn
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import BaseRequestHandler, TCPServer, ThreadingMixIn
+    from urlparse import parse_qs, urlsplit
+
+from atrium.utils import endpointTemplate
+
+
+# endpoint template -> key of the records list
+LISTS = {
+    "users": "users",
+    "users/{}/transactions": "transactions",
+    "users/{}/accounts": "accounts",
+    "users/{}/accounts/{}/transactions": "transactions",
+    "users/{}/members": "members",
+    "users/{}/holdings": "holdings",
+    "institutions": "institutions"
+}
+
+# endpoint template -> key of the single record
+RECORDS = {
+    "users": "user",
+    "users/{}": "user",
+    "users/{}/transactions/{}": "transaction",
+    "users/{}/accounts/{}": "account",
+    "users/{}/members": "member",
+    "users/{}/members/{}": "member",
+    "users/{}/members/{}/status": "member",
+    "users/{}/members/{}/aggregate": "member",
+    "users/{}/members/{}/resume": "member",
+    "users/{}/holdings/{}": "holding",
+    "institutions/{}": "institution"
+}
+
+CHALLENGES = {
+    "institutions/{}/credentials": "credentials",
+    "users/{}/members/{}/challenges": "credentials"
+}
+
+CATEGORIES = ["Groceries", "Gas", "Restaurants", "Paycheck", "Transfer"]
+
+
+def guid(prefix, index):
+    return "{}-{:032d}".format(prefix, index)
+
+
+def makeRecord(kind, index, ids, padding):
+    """
+    A synthetic record of `kind`. `ids` are the GUIDs from the URL, in
+    path order.
+    """
+    user = ids[0] if ids else guid("USR", 0)
+
+    if kind == "user":
+        return {"guid": ids[0] if ids else guid("USR", index),
+                "identifier": "U{}".format(index),
+                "is_disabled": False,
+                "metadata": padding}
+    if kind == "transaction":
+        return {"guid": guid("TRN", index),
+                "user_guid": user,
+                "account_guid": ids[1] if len(ids) > 1 else guid("ACT", 0),
+                "member_guid": guid("MBR", 0),
+                "amount": 10.0 + (index % 5000) / 100.0,
+                "category": CATEGORIES[index % 5],
+                "date": "2016-09-{:02d}".format(1 + index % 28),
+                "description": padding,
+                "status": "POSTED",
+                "type": "CREDIT" if index % 5 == 3 else "DEBIT"}
+    if kind == "account":
+        return {"guid": guid("ACT", index),
+                "user_guid": user,
+                "member_guid": guid("MBR", 0),
+                "balance": 1000.0 + index,
+                "name": padding,
+                "type": "CHECKING"}
+    if kind == "member":
+        return {"guid": guid("MBR", index),
+                "user_guid": user,
+                "institution_code": "mxbank",
+                "name": padding,
+                "status": "COMPLETED"}
+    if kind == "holding":
+        return {"guid": guid("HOL", index),
+                "user_guid": user,
+                "account_guid": guid("ACT", index % 3),
+                "symbol": "MX",
+                "shares": index,
+                "description": padding}
+    if kind == "institution":
+        return {"code": ids[0] if ids else "inst{}".format(index),
+                "name": padding,
+                "url": "https://example.com"}
+    return {"guid": guid("CRD", index),
+            "label": "Question {}".format(index),
+            "type": "TEXT",
+            "field_name": padding}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.fake.connected()
+
+    def do_GET(self):
+        self.server.fake.handle(self, "GET")
+
+    def do_POST(self):
+        self.server.fake.handle(self, "POST")
+
+    def do_PUT(self):
+        self.server.fake.handle(self, "PUT")
+
+    def do_DELETE(self):
+        self.server.fake.handle(self, "DELETE")
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class H2Handler(BaseRequestHandler):
+    """
+    One HTTP/2 connection. Its streams are answered concurrently, each on a
+    thread of its own, while this thread reads frames off the socket.
+    """
+
+    def setup(self):
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        self.server.fake.connected()
+        self.h2 = H2Connection(H2Configuration(
+            client_side=False,
+            header_encoding="utf-8"
+        ))
+        self.condition = threading.Condition()
+        self.streams = {}
+        self.closed = False
+
+    def handle(self):
+        from h2.events import (
+            ConnectionTerminated,
+            DataReceived,
+            RequestReceived,
+            StreamEnded
+        )
+
+        with self.condition:
+            self.h2.initiate_connection()
+            self.flush()
+
+        while not self.closed:
+            try:
+                data = self.request.recv(65536)
+            except (OSError, IOError):
+                data = b""
+
+            with self.condition:
+                if not data:
+                    self.closed = True
+                    break
+
+                for event in self.h2.receive_data(data):
+                    if isinstance(event, RequestReceived):
+                        self.streams[event.stream_id] = (
+                            dict(event.headers), []
+                        )
+                    elif isinstance(event, DataReceived):
+                        self.streams[event.stream_id][1].append(event.data)
+                        self.h2.acknowledge_received_data(
+                            event.flow_controlled_length,
+                            event.stream_id
+                        )
+                    elif isinstance(event, StreamEnded):
+                        headers, body = self.streams.pop(event.stream_id)
+                        responder = threading.Thread(
+                            target=self.respond,
+                            args=(event.stream_id, headers, b"".join(body))
+                        )
+                        responder.daemon = True
+                        responder.start()
+                    elif isinstance(event, ConnectionTerminated):
+                        self.closed = True
+
+                # window updates may unblock responders
+                self.condition.notify_all()
+                self.flush()
+
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def respond(self, stream_id, headers, body):
+        from h2.exceptions import H2Error
+
+        status, extra, body = self.server.fake.process(
+            headers[":method"],
+            headers[":path"],
+            body
+        )
+        response = [
+            (":status", str(status)),
+            ("content-type", "application/json"),
+            ("content-length", str(len(body)))
+        ] + extra
+
+        with self.condition:
+            try:
+                self.h2.send_headers(stream_id, response, end_stream=not body)
+                self.flush()
+
+                sent = 0
+                while sent < len(body) and not self.closed:
+                    window = min(
+                        self.h2.local_flow_control_window(stream_id),
+                        self.h2.max_outbound_frame_size,
+                        len(body) - sent
+                    )
+                    if window <= 0:
+                        self.condition.wait()
+                        continue
+
+                    self.h2.send_data(
+                        stream_id,
+                        body[sent:sent + window],
+                        end_stream=sent + window == len(body)
+                    )
+                    sent += window
+                    self.flush()
+            except H2Error:
+                pass
+
+    def flush(self):
+        data = self.h2.data_to_send()
+        if data and not self.closed:
+            try:
+                self.request.sendall(data)
+            except (OSError, IOError):
+                self.closed = True
+
+
+class H2Server(ThreadingMixIn, TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeAtrium(object):
+
+    def __init__(self, latency=0, jitter=0, records=100, page_size=25,
+                 record_size=200, error_rate=0, error_status=503,
+                 retry_after=None, member_statuses=("COMPLETED",),
+                 seed=0, host="127.0.0.1", port=0, http2=False):
+        self.latency = latency
+        self.jitter = jitter
+        self.records = records
+        self.page_size = page_size
+        self.record_size = record_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.member_statuses = list(member_statuses)
+
+        self.requests = 0
+        self.connections = 0
+        self.hits = Counter()
+        self._random = random.Random(seed)
+        self._failures = deque()
+        self._polls = Counter()
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+        if http2:
+            self._server = H2Server((host, port), H2Handler)
+        else:
+            self._server = Server((host, port), Handler)
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def root(self):
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}/".format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05}
+        )
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def failNext(self, status, times=1):
+        """
+        Answer the next `times` requests with `status`.
+        """
+        with self._lock:
+            self._failures.extend([status] * times)
+
+    def connected(self):
+        with self._lock:
+            self.connections += 1
+
+    def handle(self, handler, method):
+        length = int(handler.headers.get("Content-Length") or 0)
+        status, headers, body = self.process(
+            method,
+            handler.path,
+            handler.rfile.read(length) if length else b""
+        )
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            handler.send_header(name, value)
+        if handler.headers.get("Connection", "").lower() == "close":
+            handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def process(self, method, path, body):
+        """
+        The (status, extra headers, body) answering a request.
+        """
+        url = urlsplit(path)
+        endpoint = url.path.lstrip("/")
+        template = endpointTemplate(endpoint)
+        query = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+        payload = json.loads(body.decode("utf-8")) if body else {}
+
+        with self._lock:
+            self.requests += 1
+            self.hits[method, template] += 1
+            status = self._failures.popleft() if self._failures else None
+            if status is None and self._random.random() < self.error_rate:
+                status = self.error_status
+            delay = self.latency + self._random.random() * self.jitter
+
+        if delay:
+            time.sleep(delay)
+
+        if status is None:
+            status, body = self.respond(
+                method, endpoint, template, query, payload
+            )
+        else:
+            body = self.encode({"error": {"message": "injected"}})
+
+        headers = []
+        if status in (429, 503) and self.retry_after is not None:
+            headers.append(("retry-after", str(self.retry_after)))
+        return status, headers, body
+
+    def respond(self, method, endpoint, template, query, payload):
+        """
+        The (status, body) of a request that is not failed on purpose.
+        """
+        if method == "DELETE":
+            return 204, b""
+
+        if template == "users/{}/members/{}/status":
+            return 200, self.memberStatus(endpoint)
+
+        if method == "GET":
+            key = (endpoint, tuple(sorted(query.items())))
+            body = self._bodies.get(key)
+            if body is None:
+                body = self._bodies[key] = self.read(endpoint, template, query)
+            return (404, b"") if body is None else (200, body)
+
+        kind = RECORDS.get(template)
+        if kind is None:
+            return 404, b""
+
+        record = self.single(kind, template, endpoint)
+        record.update(payload.get(kind) or {})
+        return 200 if method == "PUT" else 202, self.encode({kind: record})
+
+    def read(self, endpoint, template, query):
+        ids = self.ids(endpoint)
+
+        if template in LISTS:
+            key = LISTS[template]
+            kind = key[:-1]
+            page = int(query.get("page", 1))
+            per_page = int(query.get("records_per_page", self.page_size))
+            first = (page - 1) * per_page
+            last = min(first + per_page, self.records)
+
+            return self.encode({
+                key: [
+                    makeRecord(kind, index, ids, self.padding())
+                    for index in range(first, last)
+                ],
+                "pagination": {
+                    "current_page": page,
+                    "per_page": per_page,
+                    "total_entries": self.records,
+                    "total_pages": max(1, -(-self.records // per_page))
+                }
+            })
+
+        if template in CHALLENGES:
+            return self.encode({"credentials": [
+                makeRecord("credential", index, ids, self.padding())
+                for index in range(2)
+            ]})
+
+        if template in RECORDS:
+            kind = RECORDS[template]
+            return self.encode({kind: self.single(kind, template, endpoint)})
+
+        return None
+
+    def memberStatus(self, endpoint):
+        with self._lock:
+            polls = self._polls[endpoint]
+            self._polls[endpoint] += 1
+
+        statuses = self.member_statuses
+        status = statuses[min(polls, len(statuses) - 1)]
+        member = self.single("member", "users/{}/members/{}/status", endpoint)
+        member["status"] = status
+        return self.encode({"member": member})
+
+    def single(self, kind, template, endpoint):
+        ids = self.ids(endpoint)
+        record = makeRecord(kind, 0, ids, self.padding())
+
+        # The record a path points at keeps the GUID from the path
+        if "guid" in record and ids and (
+                template.endswith("{}") or "/members/{}/" in template):
+            record["guid"] = ids[-1]
+        return record
+
+    def ids(self, endpoint):
+        return endpoint.split("/")[1::2]
+
+    def padding(self):
+        return "x" * self.record_size
+
+    def encode(self, data):
+        return json.dumps(data).encode("utf-8")
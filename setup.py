@@ -28,9 +28,16 @@ setup(
         'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ],
 
+    # AsyncApi needs Python 3.7, everything else still runs on 2.7
+    python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, !=3.4.*, !=3.5.*, !=3.6.*',
+
     keywords='MX Atrium API',
 
     packages=find_packages(exclude=['tests']),
@@ -43,7 +50,10 @@ setup(
     # your project is installed. For an analysis of "install_requires" vs pip's
     # requirements files see:
     # https://packaging.python.org/en/latest/requirements.html
-    install_requires=['requests==2.11.1', 'future==0.15.2'],
+    install_requires=[
+        'requests>=2.11.1',
+        'futures==3.0.5; python_version < "3"'
+    ],
 
     # List additional groups of dependencies here (e.g. development
     # dependencies). You can install these using the following syntax,
@@ -51,6 +61,9 @@ setup(
     # $ pip install -e .[dev,test]
     extras_require={
         'dev': ['twine'],
+        'async': ['aiohttp'],
+        'http2': ['httpx[http2]'],
+        'numpy': ['numpy'],
         # 'test': ['coverage'],
     }
 )
\ No newline at end of file
@@ -0,0 +1,160 @@
+import threading
+import unittest
+
+from atrium.aggregation import AggregationOrchestrator
+from atrium.errors import ConflictError
+from atrium.utils import storage
+
+
+FAST = {"default_interval": 0.001, "intervals": {"INITIATED": 0.001, "RESUMED": 0.001}}
+
+
+class AggregationApi(object):
+    """
+    Members go INITIATED -> `outcome`. Members in `challenged` are
+    CHALLENGED until resumed.
+    """
+
+    def __init__(self, outcomes, challenged=(), failing=()):
+        self.outcomes = outcomes
+        self.challenged = set(challenged)
+        self.failing = set(failing)
+        self.polls = dict((guid, 0) for guid in outcomes)
+        self.resumed = {}
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def startMemberAgg(self, userGuid, memGuid):
+        if memGuid in self.failing:
+            raise ConflictError()
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        return storage(guid=memGuid, status="INITIATED")
+
+    def getMemberStatus(self, userGuid, memGuid):
+        with self.lock:
+            self.polls[memGuid] += 1
+            if self.polls[memGuid] < 2:
+                return storage(guid=memGuid, status="INITIATED")
+            if memGuid in self.challenged:
+                return storage(guid=memGuid, status="CHALLENGED")
+            self.active -= 1
+            return storage(guid=memGuid, status=self.outcomes[memGuid])
+
+    def getMemberChallenges(self, userGuid, memGuid):
+        return [storage(guid="CRD-1", label="What is your favorite color?")]
+
+    def resumeMemberAgg(self, userGuid, memGuid, payload={}):
+        with self.lock:
+            self.resumed[memGuid] = payload
+            self.challenged.discard(memGuid)
+            self.polls[memGuid] = 0
+        return storage(guid=memGuid, status="RESUMED")
+
+
+class TestAggregationOrchestrator(unittest.TestCase):
+
+    def members(self, count):
+        return [("USR-1", "MBR-{}".format(i)) for i in range(count)]
+
+    def testRunsEveryMember(self):
+        api = AggregationApi(dict(("MBR-{}".format(i), "COMPLETED") for i in range(20)))
+        orchestrator = AggregationOrchestrator(api, concurrency=4, **FAST)
+
+        results = list(orchestrator.run(self.members(20)))
+
+        self.assertEqual(sorted(r.memGuid for r in results), sorted(api.outcomes))
+        self.assertTrue(all(r.member.status == "COMPLETED" for r in results))
+        self.assertTrue(api.peak <= 4)
+
+        progress = orchestrator.progress()
+        self.assertEqual((progress.started, progress.finished, progress.completed), (20, 20, 20))
+        self.assertEqual(progress.in_flight, 0)
+
+    def testRoutesChallenges(self):
+        api = AggregationApi({"MBR-0": "COMPLETED", "MBR-1": "COMPLETED"}, challenged=["MBR-1"])
+        asked = []
+
+        def handler(userGuid, memGuid, challenges):
+            asked.append(memGuid)
+            return [{"guid": challenges[0].guid, "value": "blue"}]
+
+        orchestrator = AggregationOrchestrator(api, challenge_handler=handler, **FAST)
+        results = dict((r.memGuid, r) for r in orchestrator.run(self.members(2)))
+
+        self.assertEqual(asked, ["MBR-1"])
+        self.assertEqual(api.resumed["MBR-1"], {"challenges": [{"guid": "CRD-1", "value": "blue"}]})
+        self.assertEqual(results["MBR-1"].member.status, "COMPLETED")
+        self.assertEqual(orchestrator.progress().challenged, 1)
+
+    def testSlowHandlersDoNotBlockStarts(self):
+        '''
+        Members should still be started while every worker could be busy
+        answering challenges
+        '''
+        outcomes = dict(("MBR-{}".format(i), "COMPLETED") for i in range(6))
+        api = AggregationApi(outcomes, challenged=["MBR-0", "MBR-1"])
+        asked = threading.Semaphore(0)
+        release = threading.Event()
+
+        def handler(userGuid, memGuid, challenges):
+            asked.release()
+            release.wait(5)
+            return None
+
+        orchestrator = AggregationOrchestrator(
+            api,
+            concurrency=4,
+            workers=2,
+            challenge_handler=handler,
+            **FAST
+        )
+        results = orchestrator.run(self.members(6))
+
+        try:
+            finished = [next(results).memGuid for _ in range(4)]
+            self.assertTrue(asked.acquire(timeout=5) and asked.acquire(timeout=5))
+        finally:
+            release.set()
+        finished += [result.memGuid for result in results]
+
+        # the other four finished while both handlers were still waiting
+        self.assertEqual(sorted(finished[:4]), ["MBR-2", "MBR-3", "MBR-4", "MBR-5"])
+        self.assertEqual(sorted(finished[4:]), ["MBR-0", "MBR-1"])
+
+    def testUnansweredChallenge(self):
+        api = AggregationApi({"MBR-0": "COMPLETED"}, challenged=["MBR-0"])
+        orchestrator = AggregationOrchestrator(api, challenge_handler=lambda *args: None, **FAST)
+
+        result = list(orchestrator.run(self.members(1)))[0]
+
+        self.assertEqual(result.member.status, "CHALLENGED")
+        self.assertEqual(api.resumed, {})
+
+    def testNoHandler(self):
+        api = AggregationApi({"MBR-0": "COMPLETED"}, challenged=["MBR-0"])
+
+        result = list(AggregationOrchestrator(api, **FAST).run(self.members(1)))[0]
+
+        self.assertEqual(result.member.status, "CHALLENGED")
+
+    def testFailures(self):
+        api = AggregationApi({"MBR-0": "FAILED", "MBR-1": "COMPLETED"}, failing=["MBR-1"])
+        orchestrator = AggregationOrchestrator(api, **FAST)
+
+        results = dict((r.memGuid, r) for r in orchestrator.run(self.members(2)))
+
+        self.assertEqual(results["MBR-0"].member.status, "FAILED")
+        self.assertIsInstance(results["MBR-1"].error, ConflictError)
+        self.assertEqual(orchestrator.progress().failed, 2)
+
+    def testProgressCallback(self):
+        api = AggregationApi(dict(("MBR-{}".format(i), "COMPLETED") for i in range(3)))
+        reports = []
+
+        list(AggregationOrchestrator(api, progress=reports.append, **FAST).run(self.members(3)))
+
+        self.assertEqual([p.finished for p in reports], [1, 2, 3])
+        self.assertTrue(reports[-1].throughput > 0)
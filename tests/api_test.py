@@ -1,5 +1,6 @@
 import sys
 import unittest
+from datetime import date
 from mock import patch, MagicMock, Mock
 
 requesterMock = sys.modules['atrium.requester'] = MagicMock()
@@ -9,6 +10,11 @@ import pytest
 from atrium import Api
 from atrium.utils import storage
 
+# Earlier test modules may have imported atrium.api with the real requester
+import atrium.api
+for name in ("createSession", "poolStats", "request"):
+    setattr(atrium.api, name, getattr(requesterMock, name))
+
 from atrium.errors import (
     BadRequestError,
     ConfigError,
@@ -17,7 +23,9 @@ from atrium.errors import (
     MethodNotAllowedError,
     NotAcceptable,
     NotFoundError,
+    RequestTimeoutError,
     ServerError,
+    TooManyRequestsError,
     UnauthorizedError,
     UnprocessableEntityError
 )
@@ -43,6 +51,33 @@ class TestApiInit(unittest.TestCase):
         api = Api(key="foo", client_id="bar")
         self.assertTrue(api.root)
 
+    def test_session(self):
+        '''
+        It should own a pooled session built from the pool options
+        '''
+        requesterMock.createSession.reset_mock()
+        api = Api(key="foo", client_id="bar", pool_maxsize=50, keep_alive=False)
+
+        self.assertEqual(api.session, requesterMock.createSession.return_value)
+        requesterMock.createSession.assert_called_with(
+            pool_connections=10,
+            pool_maxsize=50,
+            pool_block=False,
+            keep_alive=False
+        )
+
+    def test_injected_session(self):
+        session = MagicMock()
+        api = Api(key="foo", client_id="bar", session=session)
+
+        self.assertEqual(api.session, session)
+
+        api.poolStats()
+        requesterMock.poolStats.assert_called_with(session)
+
+        api.close()
+        self.assertTrue(session.close.called)
+
 
 class TestApiHeaders(unittest.TestCase):
 
@@ -102,7 +137,8 @@ class TestMakeRequest(unittest.TestCase):
             self.api.root + self.url,
             self.method,
             headers=self.headers,
-            payload={}
+            payload={},
+            options={"session": self.api.session, "timeout": (10, 60)}
         )
 
     def test400(self):
@@ -155,6 +191,13 @@ class TestMakeRequest(unittest.TestCase):
             })
             self.api._makeRequest(self.url, self.method)
 
+    def test429(self):
+        with pytest.raises(TooManyRequestsError):
+            requesterMock.request.return_value = storage({
+                "status_code": 429
+            })
+            self.api._makeRequest(self.url, self.method)
+
     def test500(self):
         with pytest.raises(ServerError):
             requesterMock.request.return_value = storage({
@@ -170,6 +213,135 @@ class TestMakeRequest(unittest.TestCase):
             self.api._makeRequest(self.url, self.method)
 
 
+class TestTimeouts(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(key="foo", client_id="bar", connect_timeout=3, read_timeout=20)
+        requesterMock.request.reset_mock()
+        requesterMock.request.return_value = storage({
+            "status_code": 200
+        })
+
+    def timeoutUsed(self):
+        return requesterMock.request.call_args[1]["options"]["timeout"]
+
+    @patch('atrium.Api._parseResponse')
+    def testDefaultTimeout(self, parse_mock):
+        self.api._makeRequest("users", "GET")
+        self.assertEqual(self.timeoutUsed(), (3, 20))
+
+    @patch('atrium.Api._parseResponse')
+    def testTimeoutScope(self, parse_mock):
+        with self.api.timeout(read=5):
+            self.api._makeRequest("users", "GET")
+            self.assertEqual(self.timeoutUsed(), (3, 5))
+
+            with self.api.timeout(connect=1):
+                self.api._makeRequest("users", "GET")
+                self.assertEqual(self.timeoutUsed(), (1, 5))
+
+        self.api._makeRequest("users", "GET")
+        self.assertEqual(self.timeoutUsed(), (3, 20))
+
+    @patch('atrium.Api._parseResponse')
+    def testDeadlineCapsTimeout(self, parse_mock):
+        with self.api.deadline(2):
+            self.api._makeRequest("users", "GET")
+
+        connect, read = self.timeoutUsed()
+        self.assertLessEqual(connect, 2)
+        self.assertLessEqual(read, 2)
+
+    def testExpiredDeadline(self):
+        with pytest.raises(RequestTimeoutError):
+            with self.api.deadline(0):
+                self.api._makeRequest("users", "GET")
+
+        self.assertFalse(requesterMock.request.called)
+
+    @patch('atrium.Api._makeRequest')
+    def testIterDeadline(self, request_mock):
+        '''
+        It should apply one deadline across every page fetched
+        '''
+        deadlines = []
+
+        def fetch(url, method):
+            deadlines.append(self.api._getScope("deadline"))
+            return {"transactions": [{}], "pagination": {"total_pages": 3}}
+        request_mock.side_effect = fetch
+
+        list(self.api.iterTransactions("userGuid", deadline=30, workers=2))
+
+        self.assertEqual(len(deadlines), 3)
+        self.assertIsNotNone(deadlines[0])
+        self.assertEqual(len(set(id(d) for d in deadlines)), 1)
+        self.assertIsNone(self.api._getScope("deadline"))
+
+
+    @patch('atrium.Api._makeRequest')
+    def testScopesFollowPrefetchWorkers(self, request_mock):
+        '''
+        Pages fetched on worker threads should keep the caller's scopes
+        '''
+        seen = []
+
+        def fetch(url, method):
+            seen.append((self.api._getScope("deadline"), self.api._currentTimeout()))
+            return {"transactions": [{}], "pagination": {"total_pages": 4}}
+        request_mock.side_effect = fetch
+
+        with self.api.deadline(30) as deadline:
+            with self.api.timeout(read=5):
+                list(self.api.iterTransactions("userGuid", workers=3))
+
+        self.assertEqual(seen, [(deadline, (3, 5))] * 4)
+
+    @patch('atrium.Api._makeRequest')
+    def testScopesEnteredAfterStart(self, request_mock):
+        '''
+        Scopes entered while consuming an iterator should apply to its pages
+        '''
+        seen = []
+
+        def fetch(url, method):
+            seen.append((self.api._getScope("deadline"), self.api._currentTimeout()))
+            return {"transactions": [{}], "pagination": {"total_pages": 4}}
+        request_mock.side_effect = fetch
+
+        with self.api.deadline(60):
+            for workers in (1, 3):
+                del seen[:]
+                transactions = self.api.iterTransactions("userGuid", workers=workers)
+
+                with self.api.deadline(30) as deadline:
+                    with self.api.timeout(read=5):
+                        list(transactions)
+
+                self.assertEqual(seen, [(deadline, (3, 5))] * 4)
+
+    @patch('atrium.Api._makeRequest')
+    def testScopesFollowBulkWorkers(self, request_mock):
+        seen = []
+
+        def fetch(url, method):
+            seen.append((self.api._getScope("deadline"), self.api._currentTimeout()))
+            return {"account": {"guid": url.rsplit("/", 1)[1]}}
+        request_mock.side_effect = fetch
+
+        with self.api.deadline(30) as deadline:
+            with self.api.timeout(connect=1):
+                self.api.readAccounts("userGuid", ["ACT-1", "ACT-2"])
+                results = list(self.api.forEachUser(
+                    ["USR-1", "USR-2"],
+                    lambda user: self.api._currentTimeout(),
+                    concurrency=2
+                ))
+
+        self.assertEqual(seen, [(deadline, (1, 20))] * 2)
+        self.assertEqual([res.result for res in results], [(1, 20)] * 2)
+
+
 class TestParseReponse(unittest.TestCase):
 
     def setUp(self):
@@ -278,6 +450,22 @@ class TestTransactionMethods(unittest.TestCase):
         })
         request_mock.assert_called_with("users/userGuid/transactions?foo=bar", "GET")
 
+    @patch('atrium.Api._makeRequest')
+    def testGetTransactionsByDate(self, request_mock):
+        self.api.getTransactionsByDate('userGuid', date(2016, 9, 1), "2016-09-30")
+        request_mock.assert_called_with(
+            "users/userGuid/transactions?from_date=2016-09-01&to_date=2016-09-30",
+            "GET"
+        )
+
+    @patch('atrium.Api._makeRequest')
+    def testGetTransactionsByDateOpenEnded(self, request_mock):
+        self.api.getTransactionsByDate('userGuid', "2016-09-01", queryParams={"foo": "bar"})
+        request_mock.assert_called_with(
+            "users/userGuid/transactions?foo=bar&from_date=2016-09-01",
+            "GET"
+        )
+
     @patch('atrium.Api._makeRequest')
     def testTransactionsByAccountNoParams(self, request_mock):
         self.api.getTransactionsByAccount(
@@ -489,6 +677,74 @@ class TestHoldingMethods(unittest.TestCase):
         request_mock.assert_called_with("users/userGuid/holdings/holdGuid", "GET")
 
 
+class TestIterMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(key="foo", client_id="bar")
+
+    def pages(self, key):
+        return [
+            {key: [{"guid": "1"}], "pagination": {"current_page": 1, "total_pages": 2}},
+            {key: [{"guid": "2"}], "pagination": {"current_page": 2, "total_pages": 2}}
+        ]
+
+    @patch('atrium.Api._makeRequest')
+    def testIterTransactions(self, request_mock):
+        request_mock.side_effect = self.pages("transactions")
+
+        records = list(self.api.iterTransactions("userGuid", queryParams={"foo": "bar"}))
+
+        self.assertEqual([r.guid for r in records], ["1", "2"])
+        request_mock.assert_any_call("users/userGuid/transactions?foo=bar&page=1", "GET")
+        request_mock.assert_called_with("users/userGuid/transactions?foo=bar&page=2", "GET")
+
+    @patch('atrium.Api._makeRequest')
+    def testIterTransactionsPrefetch(self, request_mock):
+        request_mock.side_effect = self.pages("transactions")
+
+        records = list(self.api.iterTransactions("userGuid", workers=4, window=2))
+
+        self.assertEqual([r.guid for r in records], ["1", "2"])
+        request_mock.assert_called_with("users/userGuid/transactions?page=2", "GET")
+
+    @patch('atrium.Api._makeRequest')
+    def testIterTransactionsByAccount(self, request_mock):
+        request_mock.side_effect = self.pages("transactions")
+
+        self.assertEqual(len(list(self.api.iterTransactionsByAccount("userGuid", "acctGuid"))), 2)
+        request_mock.assert_called_with(
+            "users/userGuid/accounts/acctGuid/transactions?page=2",
+            "GET"
+        )
+
+    @patch('atrium.Api._makeRequest')
+    def testIterAccounts(self, request_mock):
+        request_mock.side_effect = self.pages("accounts")
+
+        self.assertEqual(len(list(self.api.iterAccounts("userGuid"))), 2)
+        request_mock.assert_called_with("users/userGuid/accounts?page=2", "GET")
+
+    @patch('atrium.Api._makeRequest')
+    def testIterInstitutions(self, request_mock):
+        request_mock.side_effect = self.pages("institutions")
+
+        self.assertEqual(len(list(self.api.iterInstitutions())), 2)
+        request_mock.assert_called_with("institutions?page=2", "GET")
+
+    @patch('atrium.Api._makeRequest')
+    def testIterMembers(self, request_mock):
+        request_mock.side_effect = self.pages("members")
+
+        self.assertEqual(len(list(self.api.iterMembers("userGuid"))), 2)
+        request_mock.assert_called_with("users/userGuid/members?page=2", "GET")
+
+    @patch('atrium.Api._makeRequest')
+    def testIterHoldings(self, request_mock):
+        request_mock.side_effect = self.pages("holdings")
+
+        self.assertEqual(len(list(self.api.iterHoldings("userGuid"))), 2)
+        request_mock.assert_called_with("users/userGuid/holdings?page=2", "GET")
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,375 @@
+import asyncio
+import json
+import unittest
+
+try:
+    from unittest.mock import AsyncMock, patch
+except ImportError:
+    # AsyncMock is only in the standard library since Python 3.8
+    from mock import AsyncMock, patch
+
+import pytest
+
+from atrium.async_api import AsyncApi
+from atrium.async_requester import Response
+from atrium.models.async_user import AsyncUser
+from atrium.retry import RetryBudget, RetryPolicy
+from atrium.errors import (
+    ConfigError,
+    MaintenanceError,
+    NotFoundError,
+    RequestTimeoutError,
+    ServerError
+)
+
+
+def respond(status, body=None):
+    content = json.dumps(body).encode("utf-8") if body is not None else b""
+    return Response(status, {}, content)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncApiInit(unittest.TestCase):
+
+    def test_init_no_key(self):
+        with self.assertRaises(ConfigError):
+            AsyncApi()
+
+    def test_init_lazy_session(self):
+        api = AsyncApi(key="foo", client_id="bar", max_concurrency=5)
+        self.assertIsNone(api.session)
+        self.assertEqual(api.poolStats(), {"in_flight": 0, "max_concurrency": 5})
+
+
+class TestAsyncMakeRequest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = AsyncApi(key="foo", client_id="bar", session=object())
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testRequestCall(self, request_mock):
+        request_mock.return_value = respond(200, {"foo": "bar"})
+
+        res = run(self.api._makeRequest("users", "POST", payload={"a": 1}))
+
+        self.assertEqual(res, {"foo": "bar"})
+        request_mock.assert_called_with(
+            self.api.root + "users",
+            "POST",
+            headers=self.api._buildHeaders("POST"),
+            payload={"a": 1},
+            options={"session": self.api.session, "timeout": (10, 60)}
+        )
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testRaw(self, request_mock):
+        request_mock.return_value = respond(200, {"user": {"guid": "USR-1"}})
+
+        async def main():
+            with self.api.raw():
+                return await self.api.readUser("USR-1")
+
+        self.assertEqual(run(main()), request_mock.return_value.content)
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testRawStatusMapping(self, request_mock):
+        request_mock.return_value = respond(404)
+        api = AsyncApi(key="foo", client_id="bar", session=object(), raw="chunks")
+
+        with pytest.raises(NotFoundError):
+            run(api.readUser("USR-1"))
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testEmpty204(self, request_mock):
+        request_mock.return_value = respond(204)
+
+        self.assertEqual(run(self.api._makeRequest("users/x", "DELETE")), {})
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testErrorMapping(self, request_mock):
+        for status, error in [(404, NotFoundError),
+                              (500, ServerError),
+                              (503, MaintenanceError)]:
+            request_mock.return_value = respond(status)
+
+            with pytest.raises(error):
+                run(self.api._makeRequest("users/x", "GET"))
+
+    @patch('atrium.async_api.asyncio.sleep', new_callable=AsyncMock)
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testRetry(self, request_mock, sleep_mock):
+        self.api.retry = RetryPolicy(budget=RetryBudget())
+        busy = Response(503, {"Retry-After": "2"}, b"")
+        request_mock.side_effect = [busy, respond(200, {"user": {"guid": "USR-1"}})]
+
+        user = run(self.api.readUser("USR-1"))
+
+        self.assertEqual(user.guid, "USR-1")
+        sleep_mock.assert_awaited_once_with(2.0)
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testDeadlinePerTask(self, request_mock):
+        '''
+        It should scope deadlines to the task that set them
+        '''
+        request_mock.return_value = respond(200, {"user": {}})
+        seen = {}
+
+        async def withDeadline():
+            with self.api.deadline(5):
+                await asyncio.sleep(0.01)
+                await self.api.readUser("USR-1")
+                seen["inside"] = request_mock.call_args[1]["options"]["timeout"]
+
+        async def without():
+            await asyncio.sleep(0.005)
+            seen["other"] = self.api._getScope("deadline")
+
+        async def main():
+            await asyncio.gather(withDeadline(), without())
+
+        run(main())
+
+        self.assertIsNone(seen["other"])
+        self.assertLessEqual(seen["inside"][1], 5)
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testCleanData(self, request_mock):
+        '''
+        It should unwrap and storigify the same way Api does
+        '''
+        request_mock.return_value = respond(200, {"user": {"guid": "USR-1"}})
+
+        user = run(self.api.readUser("USR-1"))
+
+        self.assertEqual(user.guid, "USR-1")
+        self.assertEqual(request_mock.call_args[0][0], self.api.root + "users/USR-1")
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testCleanDataPayload(self, request_mock):
+        request_mock.return_value = respond(200, {"member": {"guid": "MBR-1"}})
+
+        run(self.api.createMember("USR-1", payload={"foo": "bar"}))
+
+        self.assertEqual(
+            request_mock.call_args[1]["payload"],
+            {"member": {"foo": "bar"}}
+        )
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testUncleanedEndpoint(self, request_mock):
+        request_mock.return_value = respond(200, {"transactions": []})
+
+        res = run(self.api.getTransactions("USR-1", queryParams={"page": 2}))
+
+        self.assertEqual(res, {"transactions": []})
+        self.assertEqual(
+            request_mock.call_args[0][0],
+            self.api.root + "users/USR-1/transactions?page=2"
+        )
+
+    def testBoundedConcurrency(self):
+        '''
+        It should never have more than max_concurrency requests in flight
+        '''
+        api = AsyncApi(key="foo", client_id="bar", session=object(), max_concurrency=3)
+        peak = []
+
+        async def slowRequest(*args, **kwargs):
+            peak.append(api.in_flight)
+            await asyncio.sleep(0.01)
+            return respond(200, {"user": {}})
+
+        async def main():
+            with patch('atrium.async_api.request', new=slowRequest):
+                await asyncio.gather(*[api.readUser(i) for i in range(20)])
+
+        run(main())
+
+        self.assertEqual(len(peak), 20)
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(api.in_flight, 0)
+
+    def testCoalesce(self):
+        '''
+        Concurrent identical GETs should share one request
+        '''
+        api = AsyncApi(key="foo", client_id="bar", session=object(), coalesce=True)
+        calls = []
+
+        async def slowRequest(url, *args, **kwargs):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return respond(200, {"user": {"guid": "USR-1"}})
+
+        async def main():
+            with patch('atrium.async_api.request', new=slowRequest):
+                return await asyncio.gather(*(
+                    [api.readUser("USR-1") for _ in range(5)] + [api.readUser("USR-2")]
+                ))
+
+        users = run(main())
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([u.guid for u in users], ["USR-1"] * 6)
+        self.assertEqual(api.coalesce.inFlight(), 0)
+
+    def testCoalesceDeadline(self):
+        '''
+        A caller sharing a slow request should still be bound by its deadline
+        '''
+        api = AsyncApi(key="foo", client_id="bar", session=object(), coalesce=True)
+
+        async def slowRequest(url, *args, **kwargs):
+            await asyncio.sleep(0.2)
+            return respond(200, {"user": {"guid": "USR-1"}})
+
+        async def hurried():
+            await asyncio.sleep(0.01)
+            with api.deadline(0.05):
+                return await api.readUser("USR-1")
+
+        async def main():
+            with patch('atrium.async_api.request', new=slowRequest):
+                return await asyncio.gather(
+                    api.readUser("USR-1"),
+                    hurried(),
+                    return_exceptions=True
+                )
+
+        user, error = run(main())
+
+        self.assertEqual(user.guid, "USR-1")
+        self.assertIsInstance(error, RequestTimeoutError)
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testIterTransactions(self, request_mock):
+        request_mock.side_effect = [
+            respond(200, {
+                "transactions": [{"guid": "1"}, {"guid": "2"}],
+                "pagination": {"current_page": 1, "total_pages": 2}
+            }),
+            respond(200, {
+                "transactions": [{"guid": "3"}],
+                "pagination": {"current_page": 2, "total_pages": 2}
+            })
+        ]
+
+        async def collect():
+            return [r.guid async for r in self.api.iterTransactions("USR-1")]
+
+        self.assertEqual(run(collect()), ["1", "2", "3"])
+        self.assertEqual(
+            request_mock.call_args[0][0],
+            self.api.root + "users/USR-1/transactions?page=2"
+        )
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testReadTransactions(self, request_mock):
+        def respond_to(url, *args, **kwargs):
+            if "?" in url:
+                return respond(200, {
+                    "transactions": [{"guid": str(i)} for i in range(10)],
+                    "pagination": {"current_page": 1, "total_pages": 1}
+                })
+            return respond(404)
+        request_mock.side_effect = respond_to
+
+        results = run(self.api.readTransactions("USR-1", ["1", "2", "3", "4", "5", "x"]))
+
+        self.assertEqual(results["3"].result.guid, "3")
+        self.assertIsInstance(results["x"].error, NotFoundError)
+        self.assertEqual(request_mock.call_count, 2)
+
+    @patch('atrium.async_api.request', new_callable=AsyncMock)
+    def testIterTransactionsPrefetch(self, request_mock):
+        def pageFor(url, *args, **kwargs):
+            number = int(url.rsplit("=", 1)[1])
+            return respond(200, {
+                "transactions": [{"guid": number}],
+                "pagination": {"current_page": number, "total_pages": 6}
+            })
+        request_mock.side_effect = pageFor
+
+        async def collect():
+            records = self.api.iterTransactions("USR-1", workers=3, window=4)
+            return [r.guid async for r in records]
+
+        self.assertEqual(run(collect()), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(request_mock.call_count, 6)
+
+
+class TestAsyncFanOut(unittest.TestCase):
+
+    def setUp(self):
+        self.api = AsyncApi(key="foo", client_id="bar", session=object())
+        self.active = 0
+        self.peak = 0
+
+    async def readUser(self, guid):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.002)
+        self.active -= 1
+
+        if guid == "USR-2":
+            raise NotFoundError(guid)
+        return {"guid": guid}
+
+    def testForEachUser(self):
+        self.api.readUser = self.readUser
+        guids = ["USR-{}".format(i) for i in range(20)]
+
+        async def collect():
+            results = self.api.forEachUser(guids, "getUser", concurrency=4)
+            return [r async for r in results]
+
+        results = run(collect())
+
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(self.peak, 4)
+        errors = [r for r in results if r.error]
+        self.assertEqual([r.guid for r in errors], ["USR-2"])
+        self.assertIsInstance(errors[0].error, NotFoundError)
+
+
+class TestAsyncUser(unittest.TestCase):
+
+    def setUp(self):
+        self.api = AsyncMock()
+        self.user = AsyncUser(self.api, "userGuid")
+
+    def testGetUser(self):
+        run(self.user.getUser())
+        self.api.readUser.assert_awaited_with("userGuid")
+
+    def testGetAccounts(self):
+        run(self.user.getAccounts(queryParams={"foo": "bar"}))
+        self.api.getAccounts.assert_awaited_with("userGuid", queryParams={"foo": "bar"})
+
+    def testCreateMember(self):
+        run(self.user.createMember({"foo": "bar"}))
+        self.api.createMember.assert_awaited_with("userGuid", payload={"foo": "bar"})
+
+    def testResumeAggregation(self):
+        run(self.user.resumeAggregation("memGuid", {"foo": "bar"}))
+        self.api.resumeMemberAgg.assert_awaited_with(
+            "userGuid",
+            "memGuid",
+            payload={"foo": "bar"}
+        )
+
+    def testGetTransactionsByAccount(self):
+        run(self.user.getTransactionsByAccount("acctGuid"))
+        self.api.getTransactionsByAccount.assert_awaited_with(
+            "userGuid",
+            "acctGuid",
+            queryParams={}
+        )
+
+    def testReadHolding(self):
+        run(self.user.readHolding("holdGuid"))
+        self.api.readHolding.assert_awaited_with("userGuid", "holdGuid")
@@ -0,0 +1,241 @@
+import threading
+import time
+import unittest
+from mock import MagicMock, patch
+
+try:
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from urlparse import parse_qs, urlsplit
+
+from atrium import Api
+from atrium.bulk import (
+    BulkResult,
+    fanOut,
+    preferList,
+    readEach,
+    resolveOperation,
+    unique
+)
+from atrium.errors import NotFoundError
+
+
+class TestResolveOperation(unittest.TestCase):
+
+    def testName(self):
+        user = MagicMock()
+        resolveOperation("getAccounts")(user)
+        user.getAccounts.assert_called_with()
+
+    def testCallable(self):
+        operation = MagicMock()
+        self.assertEqual(resolveOperation(operation), operation)
+
+
+class TestFanOut(unittest.TestCase):
+
+    def setUp(self):
+        self.api = MagicMock(spec=Api)
+        self.api.getAccounts.side_effect = self.getAccounts
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def getAccounts(self, guid, queryParams={}):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+        time.sleep(0.002)
+
+        with self.lock:
+            self.active -= 1
+
+        if guid == "USR-3":
+            raise NotFoundError(guid)
+        return {"accounts": [guid]}
+
+    def testResults(self):
+        guids = ["USR-{}".format(i) for i in range(10)]
+        results = list(fanOut(self.api, guids, "getAccounts", concurrency=4))
+
+        self.assertEqual(sorted(r.guid for r in results), sorted(guids))
+
+        byGuid = dict((r.guid, r) for r in results)
+        self.assertEqual(byGuid["USR-1"], BulkResult("USR-1", {"accounts": ["USR-1"]}, None))
+
+    def testErrorsDoNotAbort(self):
+        '''
+        It should report a failing user and keep going
+        '''
+        guids = ["USR-{}".format(i) for i in range(10)]
+        results = list(fanOut(self.api, guids, "getAccounts", concurrency=4))
+
+        errors = [r for r in results if r.error]
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].guid, "USR-3")
+        self.assertIsInstance(errors[0].error, NotFoundError)
+
+    def testBoundedConcurrency(self):
+        guids = ("USR-{}".format(i) for i in range(30))
+        list(fanOut(self.api, guids, "getAccounts", concurrency=5))
+
+        self.assertLessEqual(self.peak, 5)
+        self.assertGreater(self.peak, 1)
+
+    def testLazyGuids(self):
+        '''
+        It should only pull as many GUIDs as it has slots for
+        '''
+        pulled = []
+
+        def guids():
+            for i in range(1000):
+                pulled.append(i)
+                yield "USR-{}".format(i)
+
+        results = fanOut(self.api, guids(), "getAccounts", concurrency=2)
+        next(results)
+
+        self.assertLessEqual(len(pulled), 3)
+        results.close()
+
+    def testCallableOperation(self):
+        results = list(fanOut(
+            self.api,
+            ["USR-1"],
+            lambda user: user.guid.lower()
+        ))
+
+        self.assertEqual(results, [BulkResult("USR-1", "usr-1", None)])
+
+    def testApiForEachUser(self):
+        api = Api(key="foo", client_id="bar", session=MagicMock())
+        api.readUser = MagicMock(side_effect=lambda guid: {"guid": guid})
+
+        results = list(api.forEachUser(["USR-1", "USR-2"], "getUser"))
+
+        self.assertEqual(
+            sorted(r.result["guid"] for r in results),
+            ["USR-1", "USR-2"]
+        )
+
+
+class TestReadEach(unittest.TestCase):
+
+    def read(self, guid):
+        if guid == "missing":
+            raise NotFoundError(guid)
+        return {"guid": guid}
+
+    def testResults(self):
+        results = readEach(self.read, ["a", "missing", "b"], concurrency=2)
+
+        self.assertEqual(results["a"], BulkResult("a", {"guid": "a"}, None))
+        self.assertIsInstance(results["missing"].error, NotFoundError)
+        self.assertEqual(list(results), ["a", "missing", "b"])
+
+    def testNothingToRead(self):
+        self.assertEqual(readEach(self.read, []), {})
+
+    def testUnique(self):
+        self.assertEqual(unique(["b", "a", "b", "c", "a"]), ["b", "a", "c"])
+
+    def testPreferList(self):
+        self.assertTrue(preferList(40, {"total_pages": 10}))
+        self.assertFalse(preferList(39, {"total_pages": 10}))
+        self.assertTrue(preferList(4, {}))
+
+
+class TestReadMany(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(key="foo", client_id="bar", session=MagicMock())
+        self.accounts = ["ACT-{}".format(i) for i in range(30)]
+        self.perPage = 1000
+        self.requests = []
+
+    def respond(self, url, method, payload={}):
+        self.requests.append(url)
+        parts = urlsplit(url)
+        path = parts.path.split("/")
+
+        if len(path) == 4:
+            if path[3] not in self.accounts:
+                raise NotFoundError(url)
+            return {"account": {"guid": path[3]}}
+
+        query = parse_qs(parts.query)
+        page = int(query["page"][0])
+        start = (page - 1) * self.perPage
+        return {
+            "accounts": [
+                {"guid": guid}
+                for guid in self.accounts[start:start + self.perPage]
+            ],
+            "pagination": {
+                "current_page": page,
+                "total_pages": -(-len(self.accounts) // self.perPage)
+            }
+        }
+
+    def lists(self):
+        return [url for url in self.requests if "?" in url]
+
+    @patch('atrium.Api._makeRequest')
+    def testFewGuidsReadOneByOne(self, request_mock):
+        request_mock.side_effect = self.respond
+
+        results = self.api.readAccounts("USR-1", ["ACT-1", "ACT-2", "nope"])
+
+        self.assertEqual(self.lists(), [])
+        self.assertEqual(results["ACT-1"].result.guid, "ACT-1")
+        self.assertIsInstance(results["nope"].error, NotFoundError)
+
+    @patch('atrium.Api._makeRequest')
+    def testListScan(self, request_mock):
+        request_mock.side_effect = self.respond
+        wanted = self.accounts[:20] + ["nope"]
+
+        results = self.api.readAccounts("USR-1", wanted)
+
+        self.assertEqual(len(self.lists()), 1)
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(list(results), wanted)
+        self.assertEqual(results["ACT-7"].result.guid, "ACT-7")
+        self.assertIsInstance(results["nope"].error, NotFoundError)
+
+    @patch('atrium.Api._makeRequest')
+    def testListScanPages(self, request_mock):
+        request_mock.side_effect = self.respond
+        self.perPage = 8
+
+        results = self.api.readAccounts("USR-1", self.accounts[:20], 1)
+
+        self.assertEqual(len(self.lists()), 3)
+        self.assertEqual(len(self.requests), 3)
+        self.assertTrue(all(r.error is None for r in results.values()))
+
+    @patch('atrium.Api._makeRequest')
+    def testLongListReadsOneByOne(self, request_mock):
+        request_mock.side_effect = self.respond
+        self.perPage = 2
+
+        results = self.api.readAccounts("USR-1", self.accounts[:6])
+
+        # the first page still gives ACT-0 and ACT-1
+        self.assertEqual(len(self.lists()), 1)
+        self.assertEqual(len(self.requests), 5)
+        self.assertEqual(results["ACT-5"].result.guid, "ACT-5")
+        self.assertEqual(results["ACT-1"].result.guid, "ACT-1")
+
+    @patch('atrium.Api._makeRequest')
+    def testFirstPageIsUsed(self, request_mock):
+        request_mock.side_effect = self.respond
+        self.perPage = 10
+
+        results = self.api.readAccounts("USR-1", self.accounts[:10])
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual([r.result.guid for r in results.values()], self.accounts[:10])
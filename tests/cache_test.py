@@ -0,0 +1,265 @@
+import threading
+import unittest
+from mock import MagicMock, patch
+
+from atrium import Api
+from atrium.cache import MISSING, ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = MagicMock(return_value=1000.0)
+        self.cache = ResponseCache(clock=self.clock)
+
+    def testDefaultEndpoints(self):
+        '''
+        It should only cache institution lookups unless asked
+        '''
+        self.assertEqual(self.cache.ttlFor("institutions?name=mx"), 3600)
+        self.assertEqual(self.cache.ttlFor("institutions/mxbank"), 3600)
+        self.assertEqual(self.cache.ttlFor("institutions/mxbank/credentials"), 3600)
+        self.assertIsNone(self.cache.ttlFor("users/USR-1"))
+        self.assertIsNone(self.cache.ttlFor("users/USR-1/accounts"))
+
+    def testEndpointList(self):
+        cache = ResponseCache(endpoints=["users/{}/accounts"], ttl=30)
+
+        self.assertEqual(cache.ttlFor("users/USR-1/accounts"), 30)
+        self.assertIsNone(cache.ttlFor("institutions"))
+
+    def testHitAndMiss(self):
+        self.assertIs(self.cache.get("institutions/mxbank"), MISSING)
+
+        self.cache.set("institutions/mxbank", {"code": "mxbank"})
+
+        self.assertEqual(self.cache.get("institutions/mxbank"), {"code": "mxbank"})
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def testExpires(self):
+        self.cache.set("institutions/mxbank", {}, ttl=10)
+        self.clock.return_value = 1010.0
+
+        self.assertIs(self.cache.get("institutions/mxbank"), MISSING)
+
+    def testMaxEntries(self):
+        cache = ResponseCache(max_entries=2, clock=self.clock)
+        cache.set("institutions/a", "a")
+        cache.set("institutions/b", "b")
+
+        # touch a so that b is the least recently used
+        cache.get("institutions/a")
+        cache.set("institutions/c", "c")
+
+        self.assertEqual(cache.get("institutions/a"), "a")
+        self.assertIs(cache.get("institutions/b"), MISSING)
+        self.assertEqual(cache.get("institutions/c"), "c")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def testMaxBytes(self):
+        cache = ResponseCache(max_bytes=100, clock=self.clock)
+        cache.set("institutions/a", "a", size=60)
+        cache.set("institutions/b", "b", size=60)
+
+        self.assertIs(cache.get("institutions/a"), MISSING)
+        self.assertEqual(cache.stats()["bytes"], 60)
+
+        cache.set("institutions/huge", "huge", size=1000)
+        self.assertIs(cache.get("institutions/huge"), MISSING)
+
+    def testInvalidatePrefix(self):
+        self.cache.set("institutions/mx", 1)
+        self.cache.set("institutions/mx/credentials", 2)
+        self.cache.set("institutions/mxbank", 3)
+
+        self.cache.invalidate("institutions/mx")
+
+        self.assertIs(self.cache.get("institutions/mx"), MISSING)
+        self.assertIs(self.cache.get("institutions/mx/credentials"), MISSING)
+        self.assertEqual(self.cache.get("institutions/mxbank"), 3)
+
+    def testInvalidateAll(self):
+        self.cache.set("institutions/mx", 1, size=10)
+        self.cache.invalidate()
+
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertEqual(self.cache.stats()["bytes"], 0)
+
+    def testConditionalHeaders(self):
+        self.cache.set("institutions/mx", 1, etag='"abc"', last_modified="Wed, 21 Oct 2015 07:28:00 GMT")
+
+        self.assertEqual(self.cache.conditionalHeaders("institutions/mx"), {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"
+        })
+        self.assertEqual(self.cache.conditionalHeaders("institutions/other"), {})
+
+    def testRevalidated(self):
+        self.cache.set("institutions/mx", 1, ttl=10, etag='"abc"')
+        self.clock.return_value = 1020.0
+        self.assertIs(self.cache.get("institutions/mx"), MISSING)
+
+        self.assertEqual(self.cache.revalidated("institutions/mx", ttl=10), 1)
+        self.assertEqual(self.cache.get("institutions/mx"), 1)
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+
+        self.assertIs(self.cache.revalidated("institutions/other", ttl=10), MISSING)
+
+    def testThreadSafe(self):
+        cache = ResponseCache(max_entries=50)
+
+        def work(n):
+            for i in range(500):
+                key = "institutions/{}".format((n * i) % 80)
+                cache.set(key, i, size=1)
+                cache.get(key)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        self.assertLessEqual(stats["entries"], 50)
+        self.assertEqual(stats["bytes"], stats["entries"])
+
+
+class TestApiCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.api = Api(key="foo", client_id="bar", session=MagicMock(), cache=self.cache)
+
+    def response(self, body):
+        r = MagicMock(status_code=200, content=b"x" * 10)
+        r.json.return_value = body
+        return r
+
+    @patch('atrium.api.request')
+    def testCachesInstitutions(self, request_mock):
+        request_mock.return_value = self.response({"institution": {"code": "mxbank"}})
+
+        first = self.api.readInstitution("mxbank")
+        second = self.api.readInstitution("mxbank")
+
+        self.assertEqual(first, second)
+        self.assertEqual(request_mock.call_count, 1)
+        self.assertEqual(self.cache.stats()["bytes"], 10)
+
+    @patch('atrium.api.request')
+    def testSkipsUserData(self, request_mock):
+        request_mock.return_value = self.response({"user": {"guid": "USR-1"}})
+
+        self.api.readUser("USR-1")
+        self.api.readUser("USR-1")
+
+        self.assertEqual(request_mock.call_count, 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    @patch('atrium.api.request')
+    def testWriteInvalidates(self, request_mock):
+        cache = ResponseCache(endpoints=["users/{}/members"])
+        api = Api(key="foo", client_id="bar", session=MagicMock(), cache=cache)
+        request_mock.return_value = self.response({"members": []})
+
+        api.getMembers("USR-1")
+        api.getMembers("USR-1")
+        self.assertEqual(request_mock.call_count, 1)
+
+        request_mock.return_value = self.response({"member": {}})
+        api.createMember("USR-1", payload={"foo": "bar"})
+
+        request_mock.return_value = self.response({"members": []})
+        api.getMembers("USR-1")
+        self.assertEqual(request_mock.call_count, 3)
+
+    @patch('atrium.api.request')
+    def testSharedAcrossRoots(self, request_mock):
+        sandbox = Api(key="foo", client_id="bar", root="https://sandbox/", session=MagicMock(), cache=self.cache)
+        production = Api(key="foo", client_id="bar", root="https://production/", session=MagicMock(), cache=self.cache)
+
+        request_mock.return_value = self.response({"institution": {"name": "sandbox"}})
+        sandbox.readInstitution("mxbank")
+        request_mock.return_value = self.response({"institution": {"name": "production"}})
+
+        self.assertEqual(production.readInstitution("mxbank").name, "production")
+        self.assertEqual(sandbox.readInstitution("mxbank").name, "sandbox")
+        self.assertEqual(request_mock.call_count, 2)
+
+    @patch('atrium.api.request')
+    def testNoCacheByDefault(self, request_mock):
+        api = Api(key="foo", client_id="bar", session=MagicMock())
+        request_mock.return_value = self.response({"institution": {}})
+
+        api.readInstitution("mxbank")
+        api.readInstitution("mxbank")
+
+        self.assertEqual(request_mock.call_count, 2)
+
+
+class TestConditionalGet(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(endpoints={"users/{}/accounts/{}": 0})
+        self.api = Api(key="foo", client_id="bar", session=MagicMock(), cache=self.cache)
+
+    def response(self, status, body=None, headers={}):
+        r = MagicMock(status_code=status, content=b"x" * 10, headers=headers)
+        r.json.return_value = body
+        return r
+
+    @patch('atrium.api.request')
+    def testNotModified(self, request_mock):
+        '''
+        It should send validators and reuse the cached body on a 304
+        '''
+        request_mock.side_effect = [
+            self.response(200, {"account": {"guid": "ACT-1", "balance": 10}}, {"ETag": '"v1"'}),
+            self.response(304)
+        ]
+
+        first = self.api.readAccount("USR-1", "ACT-1")
+        second = self.api.readAccount("USR-1", "ACT-1")
+
+        self.assertEqual(first, second)
+        self.assertNotIn("If-None-Match", request_mock.call_args_list[0][1]["headers"])
+        self.assertEqual(request_mock.call_args_list[1][1]["headers"]["If-None-Match"], '"v1"')
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+
+    @patch('atrium.api.request')
+    def testModified(self, request_mock):
+        request_mock.side_effect = [
+            self.response(200, {"account": {"balance": 10}}, {"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+            self.response(200, {"account": {"balance": 20}}, {"Last-Modified": "Thu, 22 Oct 2015 07:28:00 GMT"})
+        ]
+
+        self.api.readAccount("USR-1", "ACT-1")
+        second = self.api.readAccount("USR-1", "ACT-1")
+
+        self.assertEqual(second.balance, 20)
+        self.assertEqual(
+            request_mock.call_args[1]["headers"]["If-Modified-Since"],
+            "Wed, 21 Oct 2015 07:28:00 GMT"
+        )
+        self.assertEqual(
+            self.cache.conditionalHeaders(self.api._cacheKey("users/USR-1/accounts/ACT-1")),
+            {"If-Modified-Since": "Thu, 22 Oct 2015 07:28:00 GMT"}
+        )
+
+    @patch('atrium.api.request')
+    def testEvictedBeforeNotModified(self, request_mock):
+        request_mock.side_effect = [
+            self.response(200, {"account": {"balance": 10}}, {"ETag": '"v1"'}),
+            self.response(304),
+            self.response(200, {"account": {"balance": 10}}, {"ETag": '"v1"'})
+        ]
+        self.api.readAccount("USR-1", "ACT-1")
+
+        headers = self.cache.conditionalHeaders
+        self.cache.conditionalHeaders = lambda key: (headers(key), self.cache.invalidate())[0]
+
+        self.assertEqual(self.api.readAccount("USR-1", "ACT-1").balance, 10)
+        self.assertEqual(request_mock.call_count, 3)
+        self.assertNotIn("If-None-Match", request_mock.call_args[1]["headers"])
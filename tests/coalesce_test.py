@@ -0,0 +1,177 @@
+import threading
+import time
+import unittest
+from mock import MagicMock, patch
+
+from atrium import Api
+from atrium.coalesce import SingleFlight
+from atrium.errors import NotFoundError, RequestTimeoutError
+from atrium.timeouts import Deadline
+
+
+def concurrently(count, fn):
+    results = [None] * count
+    errors = [None] * count
+
+    def run(index):
+        try:
+            results[index] = fn()
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = []
+
+    def slow(self, value):
+        def call():
+            self.calls.append(value)
+            time.sleep(0.05)
+            return value
+        return call
+
+    def testSharesResult(self):
+        results, errors = concurrently(8, lambda: self.flight.do("key", self.slow({"a": 1})))
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(errors, [None] * 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.flight.inFlight(), 0)
+
+    def testSharesException(self):
+        def fail():
+            self.calls.append(1)
+            time.sleep(0.05)
+            raise NotFoundError("users/USR-1")
+
+        results, errors = concurrently(4, lambda: self.flight.do("key", fail))
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(all(isinstance(error, NotFoundError) for error in errors))
+        self.assertEqual(self.flight.inFlight(), 0)
+
+    def testKeysAreSeparate(self):
+        concurrently(2, lambda: self.flight.do(threading.current_thread().name, self.slow(1)))
+
+        self.assertEqual(len(self.calls), 2)
+
+    def testFollowerDeadline(self):
+        '''
+        A waiting caller should give up once its own deadline runs out
+        '''
+        release = threading.Event()
+        leader = threading.Thread(
+            target=lambda: self.flight.do("key", lambda: release.wait(5))
+        )
+        leader.start()
+        while not self.flight.inFlight():
+            time.sleep(0.001)
+
+        started = time.time()
+        try:
+            with self.assertRaises(RequestTimeoutError):
+                self.flight.do("key", self.slow(1), Deadline(0.05))
+            with self.assertRaises(RequestTimeoutError):
+                self.flight.do("key", self.slow(1), Deadline(-1))
+        finally:
+            release.set()
+            leader.join(5)
+
+        self.assertTrue(time.time() - started < 1)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.flight.inFlight(), 0)
+
+    def testSequentialCallsRunAgain(self):
+        self.flight.do("key", self.slow(1))
+        self.flight.do("key", self.slow(2))
+
+        self.assertEqual(self.calls, [1, 2])
+
+
+class TestApiCoalesce(unittest.TestCase):
+
+    def response(self, status=200, body=None):
+        def send(*args, **kwargs):
+            time.sleep(0.05)
+            r = MagicMock()
+            r.status_code = status
+            r.headers = {}
+            r.json.return_value = body
+            return r
+        return send
+
+    def testDisabledByDefault(self):
+        self.assertIsNone(Api(key="foo", client_id="bar").coalesce)
+
+    def testSharedCoalescer(self):
+        flight = SingleFlight()
+        self.assertIs(Api(key="foo", client_id="bar", coalesce=flight).coalesce, flight)
+
+    @patch('atrium.api.request')
+    def testCoalescesIdenticalGets(self, request_mock):
+        request_mock.side_effect = self.response(body={"user": {"guid": "USR-1"}})
+        api = Api(key="foo", client_id="bar", coalesce=True)
+
+        results, errors = concurrently(6, lambda: api.readUser("USR-1"))
+
+        self.assertEqual(request_mock.call_count, 1)
+        self.assertEqual([user.guid for user in results], ["USR-1"] * 6)
+
+    @patch('atrium.api.request')
+    def testSharedAcrossClients(self, request_mock):
+        def send(url, method, headers={}, payload={}, options={}):
+            time.sleep(0.05)
+            r = MagicMock(status_code=200, headers={})
+            r.json.return_value = {"user": {"guid": "U", "client": headers["MX-CLIENT-ID"]}}
+            return r
+        request_mock.side_effect = send
+
+        flight = SingleFlight()
+        sandbox = Api(key="foo", client_id="a", root="https://sandbox/", coalesce=flight)
+        production = Api(key="foo", client_id="b", root="https://production/", coalesce=flight)
+
+        clients = iter([sandbox, production])
+        results, errors = concurrently(2, lambda: next(clients).readUser("U"))
+
+        self.assertEqual(request_mock.call_count, 2)
+        self.assertEqual(sorted(user.client for user in results), ["a", "b"])
+
+    @patch('atrium.api.request')
+    def testDifferentQueryStrings(self, request_mock):
+        request_mock.side_effect = self.response(body={"institutions": []})
+        api = Api(key="foo", client_id="bar", coalesce=True)
+
+        concurrently(2, lambda: api.getInstitutions(queryParams={
+            "name": threading.current_thread().name
+        }))
+
+        self.assertEqual(request_mock.call_count, 2)
+
+    @patch('atrium.api.request')
+    def testWritesAreNotCoalesced(self, request_mock):
+        request_mock.side_effect = self.response(body={"user": {}})
+        api = Api(key="foo", client_id="bar", coalesce=True)
+
+        concurrently(3, lambda: api.updateUser("USR-1", payload={"metadata": "x"}))
+
+        self.assertEqual(request_mock.call_count, 3)
+
+    @patch('atrium.api.request')
+    def testSharesErrors(self, request_mock):
+        request_mock.side_effect = self.response(status=404)
+        api = Api(key="foo", client_id="bar", coalesce=True)
+
+        results, errors = concurrently(4, lambda: api.readAccount("USR-1", "ACT-1"))
+
+        self.assertEqual(request_mock.call_count, 1)
+        self.assertTrue(all(isinstance(error, NotFoundError) for error in errors))
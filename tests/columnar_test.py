@@ -0,0 +1,94 @@
+import unittest
+from mock import MagicMock, patch
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from atrium import Api
+from atrium.columnar import transactionColumns
+from atrium.models.records import Transaction
+from atrium.utils import storage
+
+
+TRANSACTIONS = [
+    {"guid": "TRN-1", "amount": 10.25, "date": "2016-08-30", "category": "Gas",
+     "type": "DEBIT", "account_guid": "ACT-1"},
+    {"guid": "TRN-2", "amount": 3.10, "date": "2016-09-01", "category": "Groceries",
+     "type": "DEBIT", "account_guid": "ACT-1"},
+    {"guid": "TRN-3", "amount": 1000.0, "date": "2016-09-15", "category": "Paycheck",
+     "type": "CREDIT", "account_guid": "ACT-2"},
+    {"guid": "TRN-4", "amount": 4.65, "date": None, "category": "Gas",
+     "type": "DEBIT", "account_guid": "ACT-1"}
+]
+
+
+class TestTransactionColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = transactionColumns(TRANSACTIONS)
+
+    def testDtypes(self):
+        self.assertEqual(len(self.columns), 4)
+        self.assertEqual(self.columns.amount.dtype, numpy.float64)
+        self.assertEqual(self.columns.amount_cents.dtype, numpy.int64)
+        self.assertEqual(self.columns.date.dtype, numpy.dtype("datetime64[D]"))
+
+    def testValues(self):
+        self.assertEqual(self.columns.amount_cents.tolist(), [1025, 310, 100000, 465])
+        self.assertEqual(self.columns.date[1], numpy.datetime64("2016-09-01"))
+        self.assertTrue(numpy.isnat(self.columns.date[3]))
+
+    def testCategorical(self):
+        category = self.columns.category
+
+        self.assertEqual(category.labels, ["Gas", "Groceries", "Paycheck"])
+        self.assertEqual(category.codes.tolist(), [0, 1, 2, 0])
+        self.assertEqual(category.code("Paycheck"), 2)
+        self.assertEqual(category.code("Nope"), -1)
+        self.assertEqual(category.values().tolist(), ["Gas", "Groceries", "Paycheck", "Gas"])
+
+    def testTotalsBy(self):
+        totals = self.columns.totalsBy("account_guid")
+
+        self.assertAlmostEqual(totals["ACT-1"], 18.0)
+        self.assertAlmostEqual(totals["ACT-2"], 1000.0)
+
+    def testMonthlyTotals(self):
+        months, totals = self.columns.monthlyTotals()
+
+        self.assertEqual(months.tolist(), [
+            numpy.datetime64("2016-08").item(),
+            numpy.datetime64("2016-09").item()
+        ])
+        self.assertEqual(totals.tolist(), [10.25, 1003.10])
+
+    def testFilter(self):
+        debits = self.columns.filter(
+            self.columns.type.codes == self.columns.type.code("DEBIT")
+        )
+
+        self.assertEqual(debits.guid.tolist(), ["TRN-1", "TRN-2", "TRN-4"])
+        self.assertEqual(debits.totalsBy("category")["Gas"], 14.9)
+
+    def testRecordInputs(self):
+        columns = transactionColumns(
+            [storage(TRANSACTIONS[0]), Transaction(TRANSACTIONS[1])]
+        )
+        self.assertEqual(columns.guid.tolist(), ["TRN-1", "TRN-2"])
+
+
+class TestApiColumnar(unittest.TestCase):
+
+    @patch('atrium.Api._makeRequest')
+    def testGetTransactionsColumnar(self, request_mock):
+        request_mock.side_effect = [
+            {"transactions": TRANSACTIONS[:2], "pagination": {"total_pages": 2}},
+            {"transactions": TRANSACTIONS[2:], "pagination": {"total_pages": 2}}
+        ]
+        api = Api(key="foo", client_id="bar", session=MagicMock())
+
+        columns = api.getTransactionsColumnar("USR-1")
+
+        self.assertEqual(len(columns), 4)
+        request_mock.assert_called_with("users/USR-1/transactions?page=2", "GET")
@@ -0,0 +1,6 @@
+import sys
+
+# AsyncApi needs async/await and contextvars, so Python 3.7
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append("async_api_test.py")
@@ -0,0 +1,108 @@
+import json
+import unittest
+
+try:
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+except ImportError:
+    from urllib2 import HTTPError, Request, urlopen
+
+from benchmarks.fake_atrium import FakeAtrium
+
+
+class TestFakeAtrium(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeAtrium(
+            records=60,
+            page_size=25,
+            record_size=10,
+            member_statuses=("INITIATED", "COMPLETED")
+        ).start()
+        self.addCleanup(self.server.stop)
+
+    def fetch(self, path, method="GET", payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = Request(self.server.root + path, data=data)
+        request.get_method = lambda: method
+        response = urlopen(request)
+        body = response.read()
+        return response.getcode(), json.loads(body.decode("utf-8")) if body else None
+
+    def testPagination(self):
+        status, first = self.fetch("users/USR-1/transactions")
+        status, last = self.fetch("users/USR-1/transactions?page=3")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(first["transactions"]), 25)
+        self.assertEqual(len(last["transactions"]), 10)
+        self.assertEqual(last["pagination"]["total_pages"], 3)
+        self.assertEqual(last["transactions"][0]["user_guid"], "USR-1")
+
+    def testRecordsPerPage(self):
+        status, page = self.fetch("users/USR-1/accounts?records_per_page=100")
+
+        self.assertEqual(len(page["accounts"]), 60)
+        self.assertEqual(page["pagination"]["total_pages"], 1)
+
+    def testEveryEndpoint(self):
+        for path, key in [
+            ("users", "users"),
+            ("users/USR-1", "user"),
+            ("users/USR-1/transactions/TRN-1", "transaction"),
+            ("users/USR-1/accounts/ACT-1", "account"),
+            ("users/USR-1/accounts/ACT-1/transactions", "transactions"),
+            ("users/USR-1/members", "members"),
+            ("users/USR-1/members/MBR-1", "member"),
+            ("users/USR-1/members/MBR-1/challenges", "credentials"),
+            ("users/USR-1/holdings", "holdings"),
+            ("users/USR-1/holdings/HOL-1", "holding"),
+            ("institutions", "institutions"),
+            ("institutions/mxbank", "institution"),
+            ("institutions/mxbank/credentials", "credentials")
+        ]:
+            status, body = self.fetch(path)
+            self.assertEqual(status, 200, path)
+            self.assertIn(key, body, path)
+
+    def testWrites(self):
+        status, body = self.fetch("users", "POST", {"user": {"identifier": "U9"}})
+        self.assertEqual((status, body["user"]["identifier"]), (202, "U9"))
+
+        status, body = self.fetch("users/USR-1/members/MBR-1/resume", "PUT", {"member": {}})
+        self.assertEqual(body["member"]["guid"], "MBR-1")
+
+        self.assertEqual(self.fetch("users/USR-1", "DELETE"), (204, None))
+
+    def testMemberStatus(self):
+        statuses = [
+            self.fetch("users/USR-1/members/MBR-1/status")[1]["member"]["status"]
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, ["INITIATED", "COMPLETED", "COMPLETED"])
+
+    def testFailNext(self):
+        self.server.failNext(503, times=2)
+
+        for _ in range(2):
+            with self.assertRaises(HTTPError) as e:
+                self.fetch("users/USR-1")
+            self.assertEqual(e.exception.code, 503)
+
+        self.assertEqual(self.fetch("users/USR-1")[0], 200)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.server.hits["GET", "users/{}"], 3)
+
+    def testErrorRate(self):
+        server = FakeAtrium(error_rate=1, error_status=429, retry_after=2).start()
+        self.addCleanup(server.stop)
+
+        with self.assertRaises(HTTPError) as e:
+            urlopen(server.root + "users/USR-1")
+        self.assertEqual(e.exception.code, 429)
+        self.assertEqual(e.exception.headers["Retry-After"], "2")
+
+    def testUnknownEndpoint(self):
+        with self.assertRaises(HTTPError) as e:
+            self.fetch("nope/1/2/3")
+        self.assertEqual(e.exception.code, 404)
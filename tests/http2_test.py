@@ -0,0 +1,138 @@
+import importlib
+import json
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from mock import patch
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+# api_test replaces the requester with a mock, these tests need the real one
+sys.modules.pop('atrium.requester', '')
+requester = importlib.import_module('atrium.requester')
+
+from atrium import Api
+from atrium.errors import NetworkError, NotFoundError, RequestTimeoutError
+from atrium.http2 import Http2Transport
+from benchmarks.fake_atrium import FakeAtrium
+
+
+class TestHttp2Transport(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('atrium.api.request', requester.request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.sent = []
+        self.transport = Http2Transport(client=httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handle)
+        ))
+        self.api = Api(key="foo", client_id="bar", session=self.transport)
+        self.addCleanup(self.api.close)
+
+    def handle(self, request):
+        self.sent.append(request)
+        if request.url.path.endswith("USR-404"):
+            return httpx.Response(404)
+        if request.url.path.endswith("USR-slow"):
+            raise httpx.ReadTimeout("slow", request=request)
+        if request.url.path.endswith("USR-down"):
+            raise httpx.ConnectError("down", request=request)
+        return httpx.Response(200, json={"user": {"guid": "USR-1"}})
+
+    def testRead(self):
+        self.assertEqual(self.api.readUser("USR-1").guid, "USR-1")
+
+        request = self.sent[0]
+        self.assertEqual(request.method, "GET")
+        self.assertEqual(request.headers["MX-API-KEY"], "foo")
+        self.assertEqual(request.extensions["timeout"]["connect"], 10)
+        self.assertEqual(request.extensions["timeout"]["read"], 60)
+
+    def testPayload(self):
+        self.api.updateUser("USR-1", payload={"metadata": "x"})
+
+        self.assertEqual(self.sent[0].method, "PUT")
+        self.assertEqual(
+            json.loads(self.sent[0].content.decode("utf-8")),
+            {"user": {"metadata": "x"}}
+        )
+
+    def testStatusMapping(self):
+        with pytest.raises(NotFoundError):
+            self.api.readUser("USR-404")
+
+    def testTimeout(self):
+        with pytest.raises(RequestTimeoutError):
+            self.api.readUser("USR-slow")
+
+    def testNetworkError(self):
+        with pytest.raises(NetworkError):
+            self.api.readUser("USR-down")
+
+    def testRawChunks(self):
+        with self.api.raw("chunks"):
+            body = b"".join(self.api.readUser("USR-1"))
+
+        self.assertEqual(json.loads(body.decode("utf-8")), {"user": {"guid": "USR-1"}})
+
+    def testPoolStats(self):
+        self.api.readUser("USR-1")
+
+        stats = self.transport.poolStats()
+
+        self.assertEqual(stats["requests"], 1)
+        self.assertEqual(stats["hosts"]["https://atrium.mx.com:443"]["requests"], 1)
+
+
+class TestHttp2Multiplexing(unittest.TestCase):
+
+    def setUp(self):
+        pytest.importorskip("h2")
+        patcher = patch('atrium.api.request', requester.request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = FakeAtrium(latency=0.02, http2=True).start()
+        self.addCleanup(self.server.stop)
+
+    def testOneConnection(self):
+        api = Api(
+            key="foo",
+            client_id="bar",
+            root=self.server.root,
+            session=Http2Transport(max_connections=2, prior_knowledge=True)
+        )
+        self.addCleanup(api.close)
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            users = list(pool.map(
+                lambda i: api.readUser("USR-{}".format(i)),
+                range(64)
+            ))
+
+        self.assertEqual(users[5].guid, "USR-5")
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(api.session.poolStats()["http2"], 1)
+
+    def testConcurrentStress(self):
+        api = Api(
+            key="foo",
+            client_id="bar",
+            root=self.server.root,
+            session=Http2Transport(max_connections=1, prior_knowledge=True)
+        )
+        self.addCleanup(api.close)
+
+        def read(i):
+            return api.readUser("USR-{}".format(i)).guid
+
+        with ThreadPoolExecutor(max_workers=64) as pool:
+            for _ in range(5):
+                guids = list(pool.map(read, range(128)))
+                self.assertEqual(guids, ["USR-{}".format(i) for i in range(128)])
+
+        self.assertEqual(self.server.connections, 1)
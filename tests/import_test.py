@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only, never by `import atrium`
+LAZY = (
+    "aiohttp",
+    "asyncio",
+    "concurrent",
+    "email",
+    "future",
+    "h2",
+    "httpx",
+    "json",
+    "numpy",
+    "requests",
+    "sqlite3",
+    "urllib3"
+)
+
+# seconds, generous so that only real regressions trip it
+IMPORT_BUDGET = 0.25
+
+
+def importTimes(statement="import atrium"):
+    """
+    Cumulative import time in seconds of every module loaded by statement,
+    as reported by `python -X importtime` in a fresh interpreter.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        stderr=subprocess.STDOUT
+    ).decode("utf-8")
+
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "-X importtime needs Python 3.7")
+class TestImportTime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.times = importTimes()
+
+    def testNoHeavyImports(self):
+        loaded = set(name.split(".")[0] for name in self.times)
+        self.assertEqual(loaded.intersection(LAZY), set())
+
+    def testWithinBudget(self):
+        self.assertLess(self.times["atrium"], IMPORT_BUDGET)
+
+    def testRequestsLoadedOnFirstUse(self):
+        times = importTimes(
+            "import atrium; atrium.Api(key='key', client_id='client')"
+        )
+        self.assertIn("requests", times)
@@ -0,0 +1,150 @@
+import logging
+import unittest
+from mock import MagicMock, patch
+
+from atrium import Api
+from atrium.errors import NetworkError, NotFoundError
+from atrium.metrics import Histogram, LoggingExporter, Metrics, prometheusText
+
+
+class FakeClock(object):
+
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class TestHistogram(unittest.TestCase):
+
+    def testEmpty(self):
+        histogram = Histogram()
+        self.assertIsNone(histogram.quantile(0.5))
+        self.assertEqual(histogram.summary()["count"], 0)
+
+    def testQuantiles(self):
+        histogram = Histogram((1, 2, 3, 4))
+        for value in [0.5] * 50 + [1.5] * 45 + [3.5] * 5:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [50, 45, 0, 5, 0])
+        self.assertEqual(histogram.quantile(0.5), 1.0)
+        self.assertAlmostEqual(histogram.quantile(0.95), 2.0)
+        self.assertAlmostEqual(histogram.quantile(0.99), 3.5)
+        self.assertEqual(histogram.max, 3.5)
+
+    def testOverflowBucket(self):
+        histogram = Histogram((1,))
+        histogram.observe(10)
+
+        self.assertAlmostEqual(histogram.quantile(0.99), 9.91)
+        self.assertEqual(histogram.quantile(1), 10)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def testGroupsByTemplate(self):
+        self.metrics.request("GET", "users/USR-1/transactions?page=2", 0.1, status=200, bytes_in=10)
+        self.metrics.request("GET", "users/USR-2/transactions", 0.3, status=200, bytes_in=20)
+        self.metrics.request("POST", "users", 0.2, status=400, error=NotFoundError("x"), bytes_out=5)
+
+        snapshot = self.metrics.snapshot()
+
+        self.assertEqual(sorted(snapshot), ["GET users/{}/transactions", "POST users"])
+        transactions = snapshot["GET users/{}/transactions"]
+        self.assertEqual(transactions["requests"], 2)
+        self.assertEqual(transactions["statuses"], {200: 2})
+        self.assertEqual(transactions["bytes_in"], 30)
+        self.assertEqual(transactions["latency"]["count"], 2)
+        self.assertEqual(snapshot["POST users"]["errors"], {"NotFoundError": 1})
+        self.assertEqual(snapshot["POST users"]["bytes_out"], 5)
+
+    def testExport(self):
+        exporter = MagicMock()
+        self.metrics.exporters.append(exporter)
+        self.metrics.decoded("GET", "users", 0.01)
+
+        snapshot = self.metrics.export()
+
+        exporter.assert_called_once_with(snapshot)
+        self.assertEqual(snapshot["GET users"]["decode"]["count"], 1)
+
+    def testReset(self):
+        self.metrics.request("GET", "users", 0.1)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def testLoggingExporter(self):
+        logger = MagicMock()
+        self.metrics.request("GET", "users", 0.1, status=200)
+
+        LoggingExporter(logger, logging.DEBUG)(self.metrics.snapshot())
+
+        args = logger.log.call_args[0]
+        self.assertEqual(args[0], logging.DEBUG)
+        self.assertEqual(args[2:4], ("GET users", 1))
+
+    def testPrometheusText(self):
+        self.metrics.request("GET", "users/USR-1", 0.02, status=200)
+
+        text = prometheusText(self.metrics.snapshot())
+
+        self.assertIn('atrium_requests_total{method="GET",endpoint="users/{}"} 1', text)
+        self.assertIn('atrium_responses_total{method="GET",endpoint="users/{}",status="200"} 1', text)
+        self.assertIn('atrium_latency_seconds_bucket{method="GET",endpoint="users/{}",le="+Inf"} 1', text)
+
+
+class TestApiMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics(clock=FakeClock(0.5))
+        self.api = Api(key="foo", client_id="bar", metrics=self.metrics)
+
+    def response(self, status, body, content=b"{}"):
+        r = MagicMock()
+        r.status_code = status
+        r.headers = {}
+        r.content = content
+        r.json.return_value = body
+        return r
+
+    def testDisabledByDefault(self):
+        self.assertIsNone(Api(key="foo", client_id="bar").metrics)
+
+    @patch('atrium.api.request')
+    def testRecordsRequests(self, request_mock):
+        request_mock.return_value = self.response(200, {"user": {"guid": "USR-1"}}, b'{"user": {}}')
+
+        self.api.readUser("USR-1")
+        self.api.updateUser("USR-1", payload={"metadata": "x"})
+
+        snapshot = self.metrics.snapshot()
+        read = snapshot["GET users/{}"]
+        self.assertEqual(read["requests"], 1)
+        self.assertEqual(read["statuses"], {200: 1})
+        self.assertEqual(read["bytes_in"], 12)
+        self.assertEqual(read["latency"]["max"], 0.5)
+        self.assertEqual(read["decode"]["count"], 1)
+        self.assertTrue(snapshot["PUT users/{}"]["bytes_out"] > 0)
+
+    @patch('atrium.api.request')
+    def testRecordsErrors(self, request_mock):
+        request_mock.return_value = self.response(404, None)
+
+        with self.assertRaises(NotFoundError):
+            self.api.readUser("USR-1")
+
+        request_mock.side_effect = NetworkError("down")
+        with self.assertRaises(NetworkError):
+            self.api.readUser("USR-1")
+
+        read = self.metrics.snapshot()["GET users/{}"]
+        self.assertEqual(read["requests"], 2)
+        self.assertEqual(read["statuses"], {404: 1})
+        self.assertEqual(read["errors"], {"NotFoundError": 1, "NetworkError": 1})
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from mock import MagicMock
+
+from atrium.mirror import Mirror
+from atrium.models.records import Transaction
+from atrium.utils import storage
+
+
+def transaction(guid, day, account="ACT-1", category="Groceries", amount=10.0):
+    return storage(
+        guid=guid,
+        user_guid="USR-1",
+        account_guid=account,
+        date=day,
+        category=category,
+        amount=amount
+    )
+
+
+class TestMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.api._wrapperFor.return_value = storage
+        self.api.readUser.return_value = storage(guid="USR-1", identifier="U1")
+        self.api.iterMembers.return_value = iter([storage(guid="MBR-1", institution_code="mxbank")])
+        self.api.iterAccounts.return_value = iter([
+            storage(guid="ACT-1", member_guid="MBR-1"),
+            storage(guid="ACT-2", member_guid="MBR-1")
+        ])
+        self.api.iterHoldings.return_value = iter([storage(guid="HOL-1", account_guid="ACT-2")])
+        self.api.iterTransactions.return_value = iter([
+            transaction("TRN-1", "2016-09-01"),
+            transaction("TRN-2", "2016-09-15", category="Gas", amount=30.0),
+            transaction("TRN-3", "2016-09-20", account="ACT-2", amount=5.5)
+        ])
+
+        self.day = date(2016, 9, 30)
+        self.mirror = Mirror(self.api, batch_size=2, today=lambda: self.day)
+        self.mirror.refreshUser("USR-1")
+
+    def tearDown(self):
+        self.mirror.close()
+
+    def testRefreshUser(self):
+        self.assertEqual(self.mirror.readUser("USR-1").identifier, "U1")
+        self.assertEqual([m.guid for m in self.mirror.members("USR-1")], ["MBR-1"])
+        self.assertEqual(len(self.mirror.accounts("USR-1")), 2)
+        self.assertEqual(len(self.mirror.accounts(memberGuid="MBR-1")), 2)
+        self.assertEqual([h.guid for h in self.mirror.holdings(accountGuid="ACT-2")], ["HOL-1"])
+        self.assertIsNone(self.mirror.readUser("USR-2"))
+
+    def testFirstRefreshFetchesEverything(self):
+        self.api.iterTransactions.assert_called_with(
+            "USR-1",
+            queryParams={"to_date": "2016-09-30"},
+            workers=1,
+            stream=False
+        )
+
+    def testQueryTransactions(self):
+        guids = lambda records: [r.guid for r in records]
+
+        self.assertEqual(guids(self.mirror.transactions("USR-1")), ["TRN-3", "TRN-2", "TRN-1"])
+        self.assertEqual(guids(self.mirror.transactions(accountGuid="ACT-2")), ["TRN-3"])
+        self.assertEqual(guids(self.mirror.transactions(category="Gas")), ["TRN-2"])
+        self.assertEqual(
+            guids(self.mirror.transactions(dateStart="2016-09-15", dateEnd=date(2016, 9, 20))),
+            ["TRN-3", "TRN-2"]
+        )
+        self.assertEqual(guids(self.mirror.transactions(limit=1)), ["TRN-3"])
+
+    def testTotalsByCategory(self):
+        self.assertEqual(self.mirror.totalsByCategory("USR-1"), {
+            "Groceries": (2, 15.5),
+            "Gas": (1, 30.0)
+        })
+        self.assertEqual(
+            self.mirror.totalsByCategory(accountGuid="ACT-1", dateStart="2016-09-10"),
+            {"Gas": (1, 30.0)}
+        )
+
+    def testIncrementalRefresh(self):
+        self.day = date(2016, 10, 7)
+        self.api.iterTransactions.return_value = iter([
+            transaction("TRN-3", "2016-09-20", account="ACT-2", amount=6.5),
+            transaction("TRN-4", "2016-10-06")
+        ])
+
+        self.assertEqual(self.mirror.refreshTransactions("USR-1"), 2)
+
+        self.api.iterTransactions.assert_called_with(
+            "USR-1",
+            queryParams={"from_date": "2016-09-23", "to_date": "2016-10-07"},
+            workers=1,
+            stream=False
+        )
+        self.assertEqual(len(self.mirror.transactions("USR-1")), 4)
+        self.assertEqual(self.mirror.transactions(accountGuid="ACT-2")[0].amount, 6.5)
+
+    def testWatermarksPersist(self):
+        path = os.path.join(tempfile.mkdtemp(), "mirror.db")
+        self.api.iterTransactions.return_value = iter([transaction("TRN-1", "2016-09-01")])
+
+        mirror = Mirror(self.api, path, today=lambda: self.day)
+        mirror.refreshTransactions("USR-1")
+        mirror.close()
+
+        mirror = Mirror(self.api, path, today=lambda: self.day)
+        self.addCleanup(mirror.close)
+
+        self.assertEqual(mirror.sync.window("USR-1"), (date(2016, 9, 23), self.day))
+        self.assertEqual([t.guid for t in mirror.transactions("USR-1")], ["TRN-1"])
+
+    def testFailedRefreshKeepsWatermark(self):
+        def failing():
+            yield transaction("TRN-5", "2016-10-01")
+            raise ValueError("boom")
+
+        self.day = date(2016, 10, 7)
+        self.api.iterTransactions.return_value = failing()
+
+        with self.assertRaises(ValueError):
+            self.mirror.refreshTransactions("USR-1")
+        self.assertEqual(self.mirror.sync.window("USR-1")[0], date(2016, 9, 23))
+
+    def testReplaceDropsDeleted(self):
+        self.api.iterAccounts.return_value = iter([storage(guid="ACT-1", member_guid="MBR-1")])
+        self.mirror.refreshAccounts("USR-1")
+
+        self.assertEqual([a.guid for a in self.mirror.accounts("USR-1")], ["ACT-1"])
+
+    def testFailedReplaceKeepsRows(self):
+        def failing():
+            yield storage(guid="ACT-3")
+            raise ValueError("boom")
+
+        self.api.iterAccounts.return_value = failing()
+
+        with self.assertRaises(ValueError):
+            self.mirror.refreshAccounts("USR-1")
+        self.assertEqual(len(self.mirror.accounts("USR-1")), 2)
+
+    def testRecordsWrap(self):
+        self.api._wrapperFor.side_effect = lambda key: Transaction if key == "transactions" else storage
+        self.api.iterTransactions.return_value = iter([
+            Transaction({"guid": "TRN-9", "date": "2016-09-29", "amount": 1.0})
+        ])
+        self.mirror.refreshTransactions("USR-1")
+
+        record = self.mirror.transactions(category=None, dateStart="2016-09-29")[0]
+        self.assertIsInstance(record, Transaction)
+        self.assertEqual(record.guid, "TRN-9")
@@ -0,0 +1,164 @@
+import threading
+import time
+import unittest
+from mock import MagicMock
+
+import pytest
+
+from atrium.errors import ServerError
+from atrium.pagination import paginate, prefetch, nextPage
+
+
+def page(key, records, current, total):
+    return {
+        key: records,
+        "pagination": {
+            "current_page": current,
+            "per_page": 2,
+            "total_entries": total * 2,
+            "total_pages": total
+        }
+    }
+
+
+class TestNextPage(unittest.TestCase):
+
+    def testMorePages(self):
+        self.assertEqual(nextPage(1, {"total_pages": 3}, 2), 2)
+
+    def testLastPage(self):
+        self.assertIsNone(nextPage(3, {"total_pages": 3}, 2))
+
+    def testEmptyPage(self):
+        self.assertIsNone(nextPage(1, {"total_pages": 3}, 0))
+
+    def testNoMetadata(self):
+        self.assertIsNone(nextPage(1, {}, 2))
+
+
+class TestPaginate(unittest.TestCase):
+
+    def setUp(self):
+        self.fetch = MagicMock(side_effect=[
+            page("transactions", [{"guid": "TRN-1"}, {"guid": "TRN-2"}], 1, 2),
+            page("transactions", [{"guid": "TRN-3"}], 2, 2)
+        ])
+
+    def testYieldsEveryRecord(self):
+        records = list(paginate(self.fetch, "transactions"))
+
+        self.assertEqual([r.guid for r in records], ["TRN-1", "TRN-2", "TRN-3"])
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def testLazy(self):
+        '''
+        It should only fetch the next page once the current one is consumed
+        '''
+        records = paginate(self.fetch, "transactions")
+        self.assertEqual(self.fetch.call_count, 0)
+
+        next(records)
+        next(records)
+        self.assertEqual(self.fetch.call_count, 1)
+
+        next(records)
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def testQueryParams(self):
+        '''
+        It should keep the caller's params and not mutate them
+        '''
+        params = {"from_date": "2016-09-01", "records_per_page": 2}
+        list(paginate(self.fetch, "transactions", params))
+
+        self.fetch.assert_any_call({
+            "from_date": "2016-09-01",
+            "records_per_page": 2,
+            "page": 1
+        })
+        self.fetch.assert_called_with({
+            "from_date": "2016-09-01",
+            "records_per_page": 2,
+            "page": 2
+        })
+        self.assertEqual(params, {"from_date": "2016-09-01", "records_per_page": 2})
+
+    def testStartPage(self):
+        self.fetch.side_effect = [page("transactions", [{"guid": "TRN-3"}], 2, 2)]
+
+        records = list(paginate(self.fetch, "transactions", {"page": 2}))
+
+        self.assertEqual(len(records), 1)
+        self.fetch.assert_called_once_with({"page": 2})
+
+    def testEmpty(self):
+        self.fetch.side_effect = [{"transactions": []}]
+
+        self.assertEqual(list(paginate(self.fetch, "transactions")), [])
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.total = 10
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.requested = []
+
+    def fetch(self, params):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.requested.append(params["page"])
+
+        # later pages come back first
+        time.sleep(0.001 * (self.total - params["page"]))
+
+        with self.lock:
+            self.active -= 1
+
+        number = params["page"]
+        return page("transactions", [{"guid": number}], number, self.total)
+
+    def testPageOrder(self):
+        records = list(prefetch(self.fetch, "transactions", workers=4))
+
+        self.assertEqual([r.guid for r in records], list(range(1, 11)))
+
+    def testBoundedWorkers(self):
+        list(prefetch(self.fetch, "transactions", workers=3, window=10))
+
+        self.assertLessEqual(self.peak, 3)
+        self.assertEqual(sorted(self.requested), list(range(1, 11)))
+
+    def testWindow(self):
+        '''
+        It should not fetch more than `window` pages ahead of the consumer
+        '''
+        records = prefetch(self.fetch, "transactions", workers=2, window=3)
+
+        next(records)
+        next(records)
+        time.sleep(0.05)
+
+        # page 1, page 2 being consumed and at most 3 more ahead of it
+        self.assertLessEqual(len(self.requested), 5)
+        records.close()
+
+    def testSinglePage(self):
+        fetch = MagicMock(return_value=page("transactions", [{"guid": 1}], 1, 1))
+
+        self.assertEqual(len(list(prefetch(fetch, "transactions"))), 1)
+        fetch.assert_called_once_with({"page": 1})
+
+    def testErrorStopsIteration(self):
+        def fetch(params):
+            if params["page"] == 3:
+                raise ServerError()
+            return self.fetch(params)
+
+        records = prefetch(fetch, "transactions", workers=2)
+
+        with pytest.raises(ServerError):
+            list(records)
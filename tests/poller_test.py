@@ -0,0 +1,142 @@
+import threading
+import time
+import unittest
+from mock import MagicMock
+
+import pytest
+
+from atrium.errors import NotFoundError, RequestTimeoutError, ServerError
+from atrium.poller import StatusPoller, _Watch
+from atrium.utils import storage
+
+
+FAST = dict((status, 0.001) for status in (
+    "INITIATED", "REQUESTED", "RESUMED", "RECEIVED", "TRANSFERRED", "PROCESSED", "DELAYED"
+))
+
+
+class StatusApi(object):
+
+    def __init__(self, statuses):
+        self.statuses = dict((guid, list(s)) for guid, s in statuses.items())
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def getMemberStatus(self, userGuid, memGuid):
+        with self.lock:
+            self.calls.append(memGuid)
+            status = self.statuses[memGuid].pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return storage(guid=memGuid, status=status)
+
+
+class TestStatusPoller(unittest.TestCase):
+
+    def poller(self, api, **kwargs):
+        kwargs.setdefault("intervals", FAST)
+        kwargs.setdefault("default_interval", 0.001)
+        poller = StatusPoller(api, **kwargs)
+        self.addCleanup(poller.close)
+        return poller
+
+    def testResolvesOnTerminalStatus(self):
+        api = StatusApi({
+            "MBR-1": ["INITIATED", "RECEIVED", "COMPLETED"],
+            "MBR-2": ["REQUESTED", "FAILED"]
+        })
+        poller = self.poller(api, workers=2)
+
+        first = poller.watch("USR-1", "MBR-1")
+        second = poller.watch("USR-1", "MBR-2")
+
+        self.assertEqual(first.result(timeout=5).status, "COMPLETED")
+        self.assertEqual(second.result(timeout=5).status, "FAILED")
+        self.assertEqual(api.calls.count("MBR-1"), 3)
+        self.assertEqual(poller.outstanding, 0)
+
+    def testResolvesOnChallenged(self):
+        api = StatusApi({"MBR-1": ["INITIATED", "CHALLENGED", "COMPLETED"]})
+        done = []
+
+        future = self.poller(api).watch("USR-1", "MBR-1", callback=done.append)
+
+        self.assertEqual(future.result(timeout=5).status, "CHALLENGED")
+        self.assertEqual(done, [future])
+
+    def testRetriesRetryableErrors(self):
+        api = StatusApi({"MBR-1": [ServerError(), "COMPLETED"]})
+
+        future = self.poller(api).watch("USR-1", "MBR-1")
+
+        self.assertEqual(future.result(timeout=5).status, "COMPLETED")
+
+    def testOtherErrorsFail(self):
+        api = StatusApi({"MBR-1": [NotFoundError("users/USR-1/members/MBR-1/status")]})
+
+        future = self.poller(api).watch("USR-1", "MBR-1")
+
+        with pytest.raises(NotFoundError):
+            future.result(timeout=5)
+
+    def testTimeout(self):
+        api = StatusApi({"MBR-1": ["INITIATED"] * 1000})
+
+        future = self.poller(api, timeout=0.05).watch("USR-1", "MBR-1")
+
+        with pytest.raises(RequestTimeoutError):
+            future.result(timeout=5)
+
+    def testMaxOutstanding(self):
+        release = threading.Event()
+        api = MagicMock()
+        api.getMemberStatus.side_effect = lambda user, member: (
+            release.wait(5) and storage(guid=member, status="COMPLETED")
+        )
+        poller = self.poller(api, max_outstanding=1)
+
+        poller.watch("USR-1", "MBR-1")
+        watched = []
+        thread = threading.Thread(target=lambda: watched.append(poller.watch("USR-1", "MBR-2")))
+        thread.start()
+
+        time.sleep(0.05)
+        self.assertEqual(watched, [])
+
+        release.set()
+        thread.join(5)
+        self.assertEqual(watched[0].result(timeout=5).status, "COMPLETED")
+
+    def testCloseCancelsWatches(self):
+        api = StatusApi({"MBR-1": ["INITIATED"] * 10})
+        poller = self.poller(api, intervals={"INITIATED": 60})
+
+        future = poller.watch("USR-1", "MBR-1")
+        time.sleep(0.05)
+        poller.close()
+
+        self.assertTrue(future.cancelled())
+        self.assertEqual(poller.outstanding, 0)
+        with pytest.raises(RuntimeError):
+            poller.watch("USR-1", "MBR-2")
+
+
+class TestIntervals(unittest.TestCase):
+
+    def setUp(self):
+        self.poller = StatusPoller(MagicMock(), growth=2, max_interval=5)
+        self.watch = _Watch("USR-1", "MBR-1", None, None)
+
+    def tearDown(self):
+        self.poller.close()
+
+    def testPerStatus(self):
+        self.assertEqual(self.poller._nextInterval(self.watch, "INITIATED"), 1)
+        self.assertEqual(self.poller._nextInterval(self.watch, "DELAYED"), 30)
+        self.assertEqual(self.poller._nextInterval(self.watch, "UNKNOWN"), 2)
+
+    def testGrowsWhileUnchanged(self):
+        intervals = [self.poller._nextInterval(self.watch, "RECEIVED") for _ in range(4)]
+        self.assertEqual(intervals, [2, 4, 5, 5])
+
+        self.assertEqual(self.poller._nextInterval(self.watch, "PROCESSED"), 1)
@@ -0,0 +1,149 @@
+import pickle
+import unittest
+from mock import MagicMock, patch
+
+import pytest
+
+from atrium import Api
+from atrium.cache import ResponseCache
+from atrium.errors import ConfigError
+from atrium.models.records import (
+    Account,
+    Holding,
+    Institution,
+    Member,
+    Transaction,
+    RECORD_TYPES
+)
+from atrium.utils import LazyList, RecordView, Storage
+
+
+class TestRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {
+            "guid": "TRN-1",
+            "amount": 61.11,
+            "category": "Groceries",
+            "brand_new_field": True
+        }
+        self.transaction = Transaction(self.data)
+
+    def testAttributes(self):
+        self.assertEqual(self.transaction.guid, "TRN-1")
+        self.assertEqual(self.transaction.amount, 61.11)
+
+    def testMissingKnownField(self):
+        self.assertIsNone(self.transaction.memo)
+
+    def testUnknownField(self):
+        '''
+        It should keep fields it does not have a slot for
+        '''
+        self.assertTrue(self.transaction.brand_new_field)
+
+        with pytest.raises(AttributeError):
+            self.transaction.nope
+
+    def testItems(self):
+        self.assertEqual(self.transaction["category"], "Groceries")
+        self.assertEqual(self.transaction.get("nope", 1), 1)
+
+        with pytest.raises(KeyError):
+            self.transaction["nope"]
+
+    def testNoInstanceDict(self):
+        self.assertFalse(hasattr(self.transaction, "__dict__"))
+
+    def testToDict(self):
+        data = self.transaction.toDict()
+
+        self.assertEqual(data["guid"], "TRN-1")
+        self.assertTrue(data["brand_new_field"])
+        self.assertIsNone(data["memo"])
+        self.assertEqual(set(data), set(Transaction.fields) | set(["brand_new_field"]))
+
+    def testEquality(self):
+        self.assertEqual(self.transaction, Transaction(self.data))
+        self.assertNotEqual(self.transaction, Transaction({"guid": "TRN-2"}))
+
+    def testPickle(self):
+        copy = pickle.loads(pickle.dumps(self.transaction))
+        self.assertEqual(copy, self.transaction)
+
+    def testTypes(self):
+        self.assertEqual(Account({"balance": 1}).balance, 1)
+        self.assertEqual(Holding({"symbol": "MX"}).symbol, "MX")
+        self.assertEqual(Institution({"code": "mxbank"}).code, "mxbank")
+        self.assertEqual(Member({"status": "COMPLETED"}).status, "COMPLETED")
+        self.assertIs(RECORD_TYPES["transactions"], Transaction)
+
+
+class TestApiRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(key="foo", client_id="bar", session=MagicMock(), wrap="records")
+
+    def testUnknownWrap(self):
+        with pytest.raises(ConfigError):
+            Api(key="foo", client_id="bar", session=MagicMock(), wrap="nope")
+
+    @patch('atrium.Api._makeRequest')
+    def testCleanData(self, request_mock):
+        request_mock.return_value = {"account": {"guid": "ACT-1"}}
+
+        account = self.api.readAccount("USR-1", "ACT-1")
+
+        self.assertIsInstance(account, Account)
+        self.assertEqual(account.guid, "ACT-1")
+
+    @patch('atrium.Api._makeRequest')
+    def testFallsBackToStorage(self, request_mock):
+        request_mock.return_value = {"user": {"guid": "USR-1"}}
+
+        self.assertIsInstance(self.api.readUser("USR-1"), Storage)
+
+    @patch('atrium.api.request')
+    def testWritesLeaveCacheAlone(self, request_mock):
+        response = MagicMock(status_code=200, headers={}, content=b"{}")
+        response.json.return_value = {"institution": {"code": "mxbank", "name": "MX Bank"}}
+        request_mock.return_value = response
+        self.api.cache = ResponseCache()
+
+        institution = self.api.readInstitution("mxbank")
+        institution.name = "X"
+
+        self.assertEqual(self.api.readInstitution("mxbank").name, "MX Bank")
+        self.assertEqual(request_mock.call_count, 1)
+
+    @patch('atrium.Api._makeRequest')
+    def testIterators(self, request_mock):
+        request_mock.return_value = {"transactions": [{"guid": "TRN-1"}]}
+
+        transactions = list(self.api.iterTransactions("USR-1"))
+
+        self.assertIsInstance(transactions[0], Transaction)
+
+
+class TestApiLazyRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(key="foo", client_id="bar", session=MagicMock(), wrap="lazy")
+
+    @patch('atrium.Api._makeRequest')
+    def testListsAreViews(self, request_mock):
+        data = [{"guid": "CRD-1"}, {"guid": "CRD-2"}]
+        request_mock.return_value = {"credentials": data}
+
+        credentials = self.api.getCredentials("mxbank")
+
+        self.assertIsInstance(credentials, LazyList)
+        self.assertIs(credentials[1].toDict(), data[1])
+
+    @patch('atrium.Api._makeRequest')
+    def testIterators(self, request_mock):
+        request_mock.return_value = {"transactions": [{"guid": "TRN-1"}]}
+
+        transactions = list(self.api.iterTransactions("USR-1"))
+
+        self.assertIsInstance(transactions[0], RecordView)
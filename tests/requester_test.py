@@ -2,7 +2,7 @@ import sys
 # Clear possible previous mock... there has to be better way
 sys.modules.pop('atrium.requester', '')
 
-from mock import MagicMock
+from mock import MagicMock, patch
 requestsMock = sys.modules['requests'] = MagicMock(spec=[
     'get',
     'post',
@@ -11,7 +11,7 @@ requestsMock = sys.modules['requests'] = MagicMock(spec=[
     'exceptions'
 ])
 
-from atrium.requester import request
+from atrium.requester import Transport, createSession, poolStats, request
 from atrium.errors import (
     NetworkError,
     RequestTimeoutError
@@ -119,3 +119,124 @@ class TestRequest(unittest.TestCase):
 
         with pytest.raises(RequestTimeoutError):
             request("foo", "GET")
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        requestsMock.get.reset_mock(side_effect=True)
+
+    def testGetUsesSession(self):
+        request("foo", "GET", headers={"foo": "bar"}, options={
+            "session": self.session
+        })
+        self.session.get.assert_called_with("foo", headers={"foo": "bar"})
+        self.assertFalse(requestsMock.get.called)
+
+    def testPostUsesSession(self):
+        request("foo", "POST", payload={"bar": "baz"}, options={
+            "session": self.session
+        })
+        self.session.post.assert_called_with(
+            "foo",
+            headers={},
+            data=json.dumps({"bar": "baz"})
+        )
+
+    def testTimeoutOption(self):
+        request("foo", "PUT", payload={}, options={
+            "session": self.session,
+            "timeout": (3, 20)
+        })
+        self.session.put.assert_called_with(
+            "foo",
+            headers={},
+            data=json.dumps({}),
+            timeout=(3, 20)
+        )
+
+    def testStreamOption(self):
+        request("foo", "GET", options={"session": self.session, "stream": True})
+        self.session.get.assert_called_with("foo", headers={}, stream=True)
+
+    def testSessionTimeout(self):
+        self.session.get.side_effect = Timeout('foo')
+
+        with pytest.raises(RequestTimeoutError):
+            request("foo", "GET", options={"session": self.session})
+
+    @patch.dict(sys.modules, {'requests': MagicMock()})
+    def testCreateSession(self):
+        mock_requests = sys.modules['requests']
+        session = createSession(pool_connections=2, pool_maxsize=20)
+
+        mock_requests.adapters.HTTPAdapter.assert_called_with(
+            pool_connections=2,
+            pool_maxsize=20,
+            pool_block=False
+        )
+        adapter = mock_requests.adapters.HTTPAdapter.return_value
+        session.mount.assert_any_call("https://", adapter)
+        session.mount.assert_any_call("http://", adapter)
+
+    @patch.dict(sys.modules, {'requests': MagicMock()})
+    def testCreateSessionNoKeepAlive(self):
+        sys.modules['requests'].Session.return_value.headers = {}
+        session = createSession(keep_alive=False)
+
+        self.assertEqual(session.headers, {"Connection": "close"})
+
+    def testTransport(self):
+        transport = MagicMock(spec=Transport)
+        requestsMock.post.reset_mock()
+
+        request("foo", "POST", payload={"bar": "baz"}, options={
+            "session": transport,
+            "timeout": (3, 20)
+        })
+
+        transport.send.assert_called_with(
+            "foo",
+            "POST",
+            {},
+            json.dumps({"bar": "baz"}),
+            timeout=(3, 20),
+            stream=False
+        )
+        self.assertFalse(requestsMock.post.called)
+
+    def testTransportPoolStats(self):
+        transport = MagicMock(spec=Transport)
+        transport.poolStats.return_value = {"connections": 1}
+
+        self.assertEqual(poolStats(transport), {"connections": 1})
+
+    def testPoolStats(self):
+        import urllib3
+
+        # A real pool: its queue starts out holding maxsize placeholders
+        pool = urllib3.HTTPSConnectionPool("atrium.mx.com", 443, maxsize=10)
+        pool.pool.get()
+        pool.pool.put(pool._new_conn())
+        pool.num_connections = 2
+        pool.num_requests = 40
+
+        adapter = MagicMock()
+        adapter.poolmanager.pools.keys.return_value = ["key"]
+        adapter.poolmanager.pools.get.return_value = pool
+        self.session.adapters = {"https://": adapter, "http://": adapter}
+
+        stats = poolStats(self.session)
+
+        self.assertEqual(stats["connections"], 2)
+        self.assertEqual(stats["requests"], 40)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["hosts"], {
+            "https://atrium.mx.com:443": {
+                "connections": 2,
+                "requests": 40,
+                "idle": 1,
+                "maxsize": 10
+            }
+        })
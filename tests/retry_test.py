@@ -0,0 +1,194 @@
+import unittest
+from mock import MagicMock, patch
+
+import pytest
+
+from atrium import Api
+from atrium.retry import RetryBudget, RetryPolicy, parseRetryAfter
+from atrium.timeouts import Deadline
+from atrium.utils import storage
+from atrium.errors import (
+    BadRequestError,
+    MaintenanceError,
+    NetworkError,
+    RequestTimeoutError,
+    ServerError,
+    TooManyRequestsError
+)
+
+
+class TestParseRetryAfter(unittest.TestCase):
+
+    def testSeconds(self):
+        self.assertEqual(parseRetryAfter("120"), 120.0)
+
+    def testDate(self):
+        delay = parseRetryAfter("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412480)
+        self.assertEqual(delay, 30.0)
+
+    def testPastDate(self):
+        self.assertEqual(parseRetryAfter("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def testMissing(self):
+        self.assertIsNone(parseRetryAfter(None))
+        self.assertIsNone(parseRetryAfter("soon"))
+
+
+class TestRetryBudget(unittest.TestCase):
+
+    def testAllowsWhileHalfFull(self):
+        budget = RetryBudget(max_tokens=10, token_ratio=0.5)
+
+        for _ in range(5):
+            budget.recordFailure()
+        self.assertFalse(budget.allowRetry())
+
+        budget.recordSuccess()
+        self.assertTrue(budget.allowRetry())
+
+    def testCapped(self):
+        budget = RetryBudget(max_tokens=10)
+        budget.recordSuccess()
+        self.assertEqual(budget.tokens, 10)
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.sleep = MagicMock()
+        self.budget = RetryBudget()
+        self.policy = RetryPolicy(
+            attempts=3,
+            backoff=1,
+            budget=self.budget,
+            sleep=self.sleep
+        )
+
+    def testSucceedsAfterRetry(self):
+        send = MagicMock(side_effect=[ServerError(), NetworkError(), "ok"])
+
+        self.assertEqual(self.policy.call("GET", send), "ok")
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def testGivesUp(self):
+        send = MagicMock(side_effect=MaintenanceError())
+
+        with pytest.raises(MaintenanceError):
+            self.policy.call("GET", send)
+        self.assertEqual(send.call_count, 3)
+
+    def testNonIdempotentMethod(self):
+        '''
+        It should not retry a POST by default
+        '''
+        send = MagicMock(side_effect=ServerError())
+
+        with pytest.raises(ServerError):
+            self.policy.call("POST", send)
+        self.assertEqual(send.call_count, 1)
+
+    def testPermanentError(self):
+        send = MagicMock(side_effect=BadRequestError())
+
+        with pytest.raises(BadRequestError):
+            self.policy.call("GET", send)
+        self.assertEqual(send.call_count, 1)
+
+    def testBackoffWithJitter(self):
+        with patch('atrium.retry.random.uniform') as uniform:
+            uniform.side_effect = lambda low, high: high
+            self.assertEqual(self.policy.delay(1, ServerError()), 1)
+            self.assertEqual(self.policy.delay(3, ServerError()), 4)
+            self.assertEqual(self.policy.delay(10, ServerError()), 30)
+
+        for _ in range(50):
+            self.assertTrue(0 <= self.policy.delay(2, ServerError()) <= 2)
+
+    def testRetryAfter(self):
+        error = TooManyRequestsError()
+        error.retry_after = 7
+
+        self.assertEqual(self.policy.delay(1, error), 7)
+
+        error.retry_after = 1000
+        self.assertEqual(self.policy.delay(1, error), 120)
+
+    def testDeadlineStopsBackoff(self):
+        '''
+        It should raise RequestTimeoutError instead of sleeping past the deadline
+        '''
+        error = ServerError()
+        error.retry_after = 10
+        send = MagicMock(side_effect=error)
+
+        with pytest.raises(RequestTimeoutError):
+            self.policy.call("GET", send, deadline=Deadline(5))
+        self.assertEqual(send.call_count, 1)
+        self.assertFalse(self.sleep.called)
+
+    def testExpiredDeadlineSpendsNoBudget(self):
+        send = MagicMock(side_effect=RequestTimeoutError())
+
+        for _ in range(60):
+            with pytest.raises(RequestTimeoutError):
+                self.policy.call("GET", send, deadline=Deadline(-1))
+
+        self.assertFalse(send.called)
+        self.assertEqual(self.budget.tokens, 100)
+        self.assertTrue(self.budget.allowRetry())
+
+    def testBudgetExhausted(self):
+        '''
+        It should stop retrying once the budget is spent
+        '''
+        budget = RetryBudget(max_tokens=4)
+        policy = RetryPolicy(attempts=10, budget=budget, sleep=self.sleep)
+        send = MagicMock(side_effect=ServerError())
+
+        with pytest.raises(ServerError):
+            policy.call("GET", send)
+        self.assertEqual(send.call_count, 2)
+
+
+class TestApiRetry(unittest.TestCase):
+
+    def setUp(self):
+        self.sleep = MagicMock()
+        self.api = Api(
+            key="foo",
+            client_id="bar",
+            session=MagicMock(),
+            retry=RetryPolicy(budget=RetryBudget(), sleep=self.sleep)
+        )
+
+    @patch('atrium.api.request')
+    def testRetriesServerErrors(self, request_mock):
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {"user": {"guid": "USR-1"}}
+        request_mock.side_effect = [storage({"status_code": 503}), ok]
+
+        user = self.api.readUser("USR-1")
+
+        self.assertEqual(user.guid, "USR-1")
+        self.assertEqual(request_mock.call_count, 2)
+
+    @patch('atrium.api.request')
+    def testRetryAfterHeader(self, request_mock):
+        busy = storage({"status_code": 429, "headers": {"Retry-After": "3"}})
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {"user": {}}
+        request_mock.side_effect = [busy, ok]
+
+        self.api.readUser("USR-1")
+
+        self.sleep.assert_called_once_with(3.0)
+
+    @patch('atrium.api.request')
+    def testNoRetryByDefault(self, request_mock):
+        api = Api(key="foo", client_id="bar", session=MagicMock())
+        request_mock.return_value = storage({"status_code": 500})
+
+        with pytest.raises(ServerError):
+            api.readUser("USR-1")
+        self.assertEqual(request_mock.call_count, 1)
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+import importlib
+import json
+import sys
+import time
+import unittest
+from mock import MagicMock, patch
+
+from atrium import Api
+from atrium.errors import NotFoundError
+from atrium.cache import ResponseCache
+from atrium.errors import ConfigError
+from atrium.streaming import StreamedPage, iterChunks, iterRecords
+from benchmarks.fake_atrium import FakeAtrium
+
+# api_test and requester_test replace the requester and requests with mocks,
+# the pool test needs the real ones
+sys.modules.pop('atrium.requester', '')
+requester = importlib.import_module('atrium.requester')
+
+requestsMock = sys.modules.pop('requests', None)
+realRequests = importlib.import_module('requests')
+if requestsMock is not None:
+    sys.modules['requests'] = requestsMock
+
+
+def chunked(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def response(data, status=200, size=7):
+    body = json.dumps(data).encode("utf-8")
+    r = MagicMock()
+    r.status_code = status
+    r.headers = {}
+    r.content = body
+    r.json.return_value = data
+    r.iter_content.side_effect = lambda chunk_size: iter(chunked(body, size))
+    return r
+
+
+class TestIterRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {
+            "transactions": [
+                {"guid": "TRN-1", "amount": 12.5, "description": u"Café"},
+                {"guid": "TRN-2", "amount": 1000, "tags": [1, [2, {}]]},
+                123456789,
+                None
+            ],
+            "pagination": {"current_page": 1, "total_pages": 4}
+        }
+        self.body = json.dumps(self.data).encode("utf-8")
+
+    def testEveryChunkSize(self):
+        for size in range(1, 40):
+            extra = {}
+            records = list(iterRecords(chunked(self.body, size), "transactions", extra))
+
+            self.assertEqual(records, self.data["transactions"])
+            self.assertEqual(extra, {"pagination": self.data["pagination"]})
+
+    def testYieldsBeforeBodyEnds(self):
+        chunks = iter(chunked(self.body, 16))
+        records = iterRecords(chunks, "transactions")
+
+        self.assertEqual(next(records)["guid"], "TRN-1")
+        self.assertTrue(len(list(chunks)) > 0)
+
+    def testMembersBeforeRecords(self):
+        body = b'{"pagination": {"total_pages": 1}, "accounts": [{"guid": "A"}]}'
+        extra = {}
+
+        self.assertEqual(list(iterRecords([body], "accounts", extra)), [{"guid": "A"}])
+        self.assertEqual(extra, {"pagination": {"total_pages": 1}})
+
+    def testEmpty(self):
+        self.assertEqual(list(iterRecords([b'{"accounts": []}'], "accounts")), [])
+        self.assertEqual(list(iterRecords([b'{}'], "accounts")), [])
+
+    def testMissingKey(self):
+        extra = {}
+        self.assertEqual(list(iterRecords([b'{"members": [1]}'], "accounts", extra)), [])
+        self.assertEqual(extra, {"members": [1]})
+
+    def testTruncatedBody(self):
+        with self.assertRaises(ValueError):
+            list(iterRecords([b'{"accounts": [{"guid": "A"}, {"gu'], "accounts"))
+
+    def testMalformedBody(self):
+        with self.assertRaises(ValueError):
+            list(iterRecords([b'{"accounts": [1 2]}'], "accounts"))
+
+
+class TestStreamedPage(unittest.TestCase):
+
+    def testRecordsThenPagination(self):
+        page = StreamedPage(response({
+            "accounts": [{"guid": "A"}, {"guid": "B"}],
+            "pagination": {"total_pages": 2}
+        }), "accounts")
+
+        self.assertIsNone(page.get("pagination"))
+        self.assertEqual(len(list(page.get("accounts"))), 2)
+        self.assertEqual(page.get("pagination"), {"total_pages": 2})
+        page.response.close.assert_called_once_with()
+
+    def testAbandonedIterationCloses(self):
+        page = StreamedPage(response({"accounts": [{"guid": "A"}, {"guid": "B"}]}), "accounts")
+
+        records = page.get("accounts")
+        next(records)
+        records.close()
+
+        page.response.close.assert_called_once_with()
+
+
+class TestApiStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(key="foo", client_id="bar")
+
+    def pages(self):
+        return [
+            response({"transactions": [{"guid": "1"}, {"guid": "2"}], "pagination": {"total_pages": 2}}),
+            response({"transactions": [{"guid": "3"}], "pagination": {"total_pages": 2}})
+        ]
+
+    @patch('atrium.api.request')
+    def testIterTransactionsStream(self, request_mock):
+        request_mock.side_effect = self.pages()
+
+        records = list(self.api.iterTransactions("userGuid", stream=True))
+
+        self.assertEqual([r.guid for r in records], ["1", "2", "3"])
+        self.assertEqual(request_mock.call_count, 2)
+        self.assertTrue(request_mock.call_args[1]["options"]["stream"])
+
+    @patch('atrium.api.request')
+    def testStreamPrefetch(self, request_mock):
+        request_mock.side_effect = self.pages()
+
+        records = list(self.api.iterTransactions("userGuid", stream=True, workers=2))
+
+        self.assertEqual([r.guid for r in records], ["1", "2", "3"])
+
+    @patch('atrium.api.request')
+    def testStreamScopeIsPerIteration(self, request_mock):
+        request_mock.side_effect = self.pages()
+        list(self.api.iterTransactions("userGuid", stream=True))
+
+        request_mock.side_effect = None
+        request_mock.return_value = response({"accounts": []})
+        self.api.getAccounts("userGuid")
+
+        self.assertNotIn("stream", request_mock.call_args[1]["options"])
+
+    @patch('atrium.api.request')
+    def testStreamStatusErrors(self, request_mock):
+        request_mock.return_value = response({}, status=404)
+
+        with self.assertRaises(NotFoundError):
+            list(self.api.iterTransactions("userGuid", stream=True))
+
+        request_mock.return_value.close.assert_called_once_with()
+
+    @patch('atrium.api.prefetch')
+    def testStreamWindowFitsPool(self, prefetch_mock):
+        prefetch_mock.return_value = iter([])
+
+        list(self.api.iterTransactions("userGuid", stream=True, workers=8))
+        self.assertEqual(prefetch_mock.call_args[0][4], 9)
+
+        api = Api(key="foo", client_id="bar", pool_maxsize=32)
+        list(api.iterTransactions("userGuid", stream=True, workers=8))
+        self.assertEqual(prefetch_mock.call_args[0][4], 16)
+
+        list(self.api.iterTransactions("userGuid", workers=8))
+        self.assertIsNone(prefetch_mock.call_args[0][4])
+
+
+class TestStreamedPrefetchPool(unittest.TestCase):
+
+    def setUp(self):
+        for patcher in (
+            patch('atrium.api.request', requester.request),
+            patch.dict(sys.modules, {'requests': realRequests})
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.server = FakeAtrium(records=200, page_size=10).start()
+        self.addCleanup(self.server.stop)
+
+        self.api = Api(
+            key="foo",
+            client_id="bar",
+            root=self.server.root,
+            session=requester.createSession(pool_maxsize=10)
+        )
+        self.addCleanup(self.api.close)
+
+    def testAbandonedPagesReleaseConnections(self):
+        transactions = self.api.iterTransactions("USR-1", stream=True, workers=4)
+        for _ in range(11):
+            next(transactions)
+        time.sleep(0.2)
+        transactions.close()
+
+        stats = requester.poolStats(self.api.session)
+        self.assertTrue(stats["connections"] > 1)
+        self.assertEqual(stats["idle"], stats["connections"])
+
+        # the next run reuses them instead of opening new ones
+        opened = self.server.connections
+        transactions = self.api.iterTransactions("USR-1", stream=True, workers=4)
+        for _ in range(11):
+            next(transactions)
+        time.sleep(0.2)
+        transactions.close()
+
+        self.assertEqual(self.server.connections, opened)
+
+
+class TestIterChunks(unittest.TestCase):
+
+    def testChunks(self):
+        r = response({"user": {"guid": "USR-1"}})
+
+        body = b"".join(iterChunks(r))
+
+        self.assertEqual(json.loads(body.decode("utf-8")), {"user": {"guid": "USR-1"}})
+        self.assertTrue(r.close.called)
+
+    def testClosesWhenDropped(self):
+        r = response({"user": {"guid": "USR-1"}})
+
+        chunks = iterChunks(r)
+        next(chunks)
+        chunks.close()
+
+        self.assertTrue(r.close.called)
+
+
+class TestApiRaw(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(key="foo", client_id="bar")
+        self.body = {"user": {"guid": "USR-1"}}
+
+    @patch('atrium.api.request')
+    def testRawScope(self, request_mock):
+        request_mock.return_value = response(self.body)
+
+        with self.api.raw():
+            user = self.api.readUser("USR-1")
+
+        self.assertEqual(user, request_mock.return_value.content)
+        self.assertEqual(self.api.readUser("USR-1").guid, "USR-1")
+
+    @patch('atrium.api.request')
+    def testMemoryview(self, request_mock):
+        request_mock.return_value = response(self.body)
+        api = Api(key="foo", client_id="bar", raw="memoryview")
+
+        body = api.readUser("USR-1")
+
+        self.assertIsInstance(body, memoryview)
+        self.assertEqual(body.tobytes(), request_mock.return_value.content)
+
+    @patch('atrium.api.request')
+    def testChunks(self, request_mock):
+        request_mock.return_value = response(self.body)
+
+        with self.api.raw("chunks"):
+            chunks = self.api.getTransactions("USR-1")
+
+        self.assertTrue(request_mock.call_args[1]["options"]["stream"])
+        self.assertEqual(b"".join(chunks), request_mock.return_value.content)
+
+    @patch('atrium.api.request')
+    def testStatusMapping(self, request_mock):
+        request_mock.return_value = response({}, status=404)
+
+        with self.api.raw():
+            with self.assertRaises(NotFoundError):
+                self.api.readUser("USR-1")
+
+        with self.api.raw("chunks"):
+            with self.assertRaises(NotFoundError):
+                self.api.readUser("USR-1")
+
+        request_mock.return_value.close.assert_called_once_with()
+
+    @patch('atrium.api.request')
+    def testSkipsCache(self, request_mock):
+        request_mock.return_value = response(self.body)
+        self.api.cache = ResponseCache(endpoints={"users/{}": 60})
+
+        with self.api.raw():
+            self.api.readUser("USR-1")
+
+        self.assertEqual(self.api.cache.stats()["entries"], 0)
+
+    @patch('atrium.api.request')
+    def testPaginationIsParsed(self, request_mock):
+        request_mock.return_value = response({"transactions": [{"guid": "1"}]})
+        api = Api(key="foo", client_id="bar", raw="bytes")
+
+        records = list(api.iterTransactions("USR-1"))
+
+        self.assertEqual([r.guid for r in records], ["1"])
+
+    def testUnknownMode(self):
+        with self.assertRaises(ConfigError):
+            self.api.raw("text")
+
+        with self.assertRaises(ConfigError):
+            Api(key="foo", client_id="bar", raw="text")
@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from mock import MagicMock
+
+from atrium.sync import (
+    MemoryWatermarkStore,
+    SQLiteWatermarkStore,
+    TransactionSync
+)
+from atrium.utils import storage
+
+
+def transaction(guid, day):
+    return storage(guid=guid, date=day)
+
+
+class StoreTests(object):
+
+    def testEmpty(self):
+        self.assertIsNone(self.store.watermark("USR-1"))
+        self.assertEqual(self.store.seen("USR-1"), set())
+
+    def testAdvance(self):
+        self.store.advance("USR-1", None, "2016-09-30", {"TRN-1": "2016-09-29"}, "2016-09-23")
+
+        self.assertEqual(self.store.watermark("USR-1"), "2016-09-30")
+        self.assertEqual(self.store.seen("USR-1"), set(["TRN-1"]))
+
+    def testScopedByAccount(self):
+        self.store.advance("USR-1", "ACT-1", "2016-09-30", {"TRN-1": "2016-09-29"}, "2016-09-23")
+
+        self.assertIsNone(self.store.watermark("USR-1"))
+        self.assertIsNone(self.store.watermark("USR-2", "ACT-1"))
+        self.assertEqual(self.store.watermark("USR-1", "ACT-1"), "2016-09-30")
+        self.assertEqual(self.store.seen("USR-1"), set())
+
+    def testForgetsOldGuids(self):
+        self.store.advance("USR-1", None, "2016-09-30", {
+            "TRN-1": "2016-09-20",
+            "TRN-2": "2016-09-29"
+        }, "2016-09-23")
+        self.store.advance("USR-1", None, "2016-10-07", {"TRN-3": "2016-10-06"}, "2016-09-30")
+
+        self.assertEqual(self.store.seen("USR-1"), set(["TRN-3"]))
+
+
+class TestMemoryWatermarkStore(StoreTests, unittest.TestCase):
+
+    def setUp(self):
+        self.store = MemoryWatermarkStore()
+
+
+class TestSQLiteWatermarkStore(StoreTests, unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "sync.db")
+        self.store = SQLiteWatermarkStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.dir)
+
+    def testPersists(self):
+        self.store.advance("USR-1", None, "2016-09-30", {"TRN-1": "2016-09-29"}, "2016-09-23")
+        self.store.close()
+
+        self.store = SQLiteWatermarkStore(self.path)
+        self.assertEqual(self.store.watermark("USR-1"), "2016-09-30")
+        self.assertEqual(self.store.seen("USR-1"), set(["TRN-1"]))
+
+
+class TestTransactionSync(unittest.TestCase):
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.day = date(2016, 9, 30)
+        self.sync = TransactionSync(self.api, overlap=7, today=lambda: self.day)
+
+    def testFirstSyncFetchesEverything(self):
+        self.api.iterTransactions.return_value = iter([
+            transaction("TRN-1", "2016-01-01"),
+            transaction("TRN-2", "2016-09-29")
+        ])
+
+        records = list(self.sync.sync("USR-1"))
+
+        self.assertEqual([r.guid for r in records], ["TRN-1", "TRN-2"])
+        self.api.iterTransactions.assert_called_with(
+            "USR-1",
+            queryParams={"to_date": "2016-09-30"},
+            workers=1,
+            stream=False
+        )
+        self.assertEqual(self.sync.store.watermark("USR-1"), "2016-09-30")
+
+    def testOverlapsWindowAndSkipsSeen(self):
+        self.api.iterTransactions.return_value = iter([transaction("TRN-2", "2016-09-29")])
+        list(self.sync.sync("USR-1"))
+
+        self.day = date(2016, 10, 7)
+        self.api.iterTransactions.return_value = iter([
+            transaction("TRN-2", "2016-09-29"),
+            transaction("TRN-3", "2016-09-28"),
+            transaction("TRN-4", "2016-10-06"),
+            transaction("TRN-4", "2016-10-06")
+        ])
+
+        records = list(self.sync.sync("USR-1", queryParams={"records_per_page": 100}))
+
+        self.assertEqual([r.guid for r in records], ["TRN-3", "TRN-4"])
+        self.api.iterTransactions.assert_called_with(
+            "USR-1",
+            queryParams={
+                "records_per_page": 100,
+                "from_date": "2016-09-23",
+                "to_date": "2016-10-07"
+            },
+            workers=1,
+            stream=False
+        )
+
+    def testReturnsSeenAgain(self):
+        sync = TransactionSync(self.api, skip_seen=False, today=lambda: self.day)
+        self.api.iterTransactions.return_value = iter([transaction("TRN-2", "2016-09-29")])
+        list(sync.sync("USR-1"))
+
+        self.day = date(2016, 10, 7)
+        self.api.iterTransactions.return_value = iter([
+            transaction("TRN-2", "2016-09-29"),
+            transaction("TRN-2", "2016-09-29"),
+            transaction("TRN-3", "2016-10-06")
+        ])
+
+        records = list(sync.sync("USR-1"))
+
+        self.assertEqual([r.guid for r in records], ["TRN-2", "TRN-3"])
+        self.assertEqual(sync.store.watermark("USR-1"), "2016-10-07")
+        self.assertEqual(sync.store.seen("USR-1"), set())
+
+    def testByAccount(self):
+        self.sync.store.advance("USR-1", "ACT-1", "2016-09-20", {}, "2016-09-13")
+        self.api.iterTransactionsByAccount.return_value = iter([])
+
+        list(self.sync.sync("USR-1", "ACT-1"))
+
+        self.api.iterTransactionsByAccount.assert_called_with(
+            "USR-1",
+            "ACT-1",
+            queryParams={"from_date": "2016-09-13", "to_date": "2016-09-30"},
+            workers=1,
+            stream=False
+        )
+        self.assertEqual(self.sync.store.watermark("USR-1", "ACT-1"), "2016-09-30")
+
+    def testAbandonedSyncKeepsWatermark(self):
+        self.api.iterTransactions.return_value = iter([
+            transaction("TRN-1", "2016-09-01"),
+            transaction("TRN-2", "2016-09-02")
+        ])
+
+        records = self.sync.sync("USR-1")
+        next(records)
+        records.close()
+
+        self.assertIsNone(self.sync.store.watermark("USR-1"))
+        self.assertEqual(self.sync.window("USR-1"), (None, self.day))
@@ -0,0 +1,50 @@
+import unittest
+from mock import MagicMock
+
+import pytest
+
+from atrium.errors import RequestTimeoutError
+from atrium.timeouts import Deadline, capTimeout
+
+
+class TestDeadline(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = MagicMock(return_value=100.0)
+
+    def testRemaining(self):
+        deadline = Deadline(10, clock=self.clock)
+        self.clock.return_value = 104.0
+
+        self.assertEqual(deadline.remaining(), 6.0)
+
+    def testExpired(self):
+        deadline = Deadline(10, clock=self.clock)
+        self.clock.return_value = 110.0
+
+        with pytest.raises(RequestTimeoutError):
+            deadline.remaining()
+
+    def testEarliest(self):
+        short = Deadline(5, clock=self.clock)
+        long = Deadline(50, clock=self.clock)
+
+        self.assertIs(short.earliest(long), short)
+        self.assertIs(long.earliest(short), short)
+        self.assertIs(long.earliest(None), long)
+
+
+class TestCapTimeout(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = MagicMock(return_value=100.0)
+
+    def testNoDeadline(self):
+        self.assertEqual(capTimeout((3, 20), None), (3, 20))
+
+    def testShrinks(self):
+        deadline = Deadline(5, clock=self.clock)
+
+        self.assertEqual(capTimeout((3, 20), deadline), (3, 5))
+        self.assertEqual(capTimeout(None, deadline), (5, 5))
+        self.assertEqual(capTimeout((None, 2), deadline), (5, 2))
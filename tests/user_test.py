@@ -1,4 +1,6 @@
 from atrium import User, Api
+from atrium.bulk import BulkResult
+from atrium.utils import storage
 
 from mock import MagicMock
 import pytest
@@ -10,6 +12,7 @@ class TestUser(unittest.TestCase):
     def setUp(self):
 
         self.apiMock = MagicMock(spec=Api)
+        self.apiMock._rawMode.return_value = None
         self.user = User(self.apiMock, 'userGuid')
         self.params = {
             "foo": "bar"
@@ -26,6 +29,52 @@ class TestUser(unittest.TestCase):
         self.user.getAccounts(queryParams=self.params)
         self.apiMock.getAccounts.assert_called_with("userGuid", queryParams=self.params)
 
+    def testIterAccounts(self):
+        self.user.iterAccounts(queryParams=self.params)
+        self.apiMock.iterAccounts.assert_called_with(
+            "userGuid",
+            queryParams=self.params,
+            workers=1,
+            window=None
+        )
+
+    def testIterMembers(self):
+        self.user.iterMembers(queryParams=self.params)
+        self.apiMock.iterMembers.assert_called_with(
+            "userGuid",
+            queryParams=self.params,
+            workers=1,
+            window=None
+        )
+
+    def testIterTransactions(self):
+        self.user.iterTransactions(queryParams=self.params, workers=8, window=16)
+        self.apiMock.iterTransactions.assert_called_with(
+            "userGuid",
+            queryParams=self.params,
+            workers=8,
+            window=16
+        )
+
+    def testIterTransactionsByAccount(self):
+        self.user.iterTransactionsByAccount("acctGuid")
+        self.apiMock.iterTransactionsByAccount.assert_called_with(
+            "userGuid",
+            "acctGuid",
+            queryParams={},
+            workers=1,
+            window=None
+        )
+
+    def testIterHoldings(self):
+        self.user.iterHoldings()
+        self.apiMock.iterHoldings.assert_called_with(
+            "userGuid",
+            queryParams={},
+            workers=1,
+            window=None
+        )
+
     def testReadAccount(self):
         self.user.readAccount("acctGuid")
         self.apiMock.readAccount.assert_called_with("userGuid", "acctGuid")
@@ -66,6 +115,15 @@ class TestUser(unittest.TestCase):
         self.user.getTransactions(queryParams=self.params)
         self.apiMock.getTransactions.assert_called_with("userGuid", queryParams=self.params)
 
+    def testGetTransactionsByDate(self):
+        self.user.getTransactionsByDate("2016-09-01", "2016-09-30", queryParams=self.params)
+        self.apiMock.getTransactionsByDate.assert_called_with(
+            "userGuid",
+            "2016-09-01",
+            "2016-09-30",
+            queryParams=self.params
+        )
+
     def testGetTransactionsByAccount(self):
         self.user.getTransactionsByAccount("acctGuid", queryParams=self.params)
         self.apiMock.getTransactionsByAccount.assert_called_with(
@@ -86,3 +144,112 @@ class TestUser(unittest.TestCase):
         self.user.readHolding("holdGuid")
         self.apiMock.readHolding.assert_called_with("userGuid", "holdGuid")
 
+
+
+class TestUserRelationships(unittest.TestCase):
+
+    def setUp(self):
+        self.apiMock = MagicMock(spec=Api)
+        self.apiMock._rawMode.return_value = None
+        self.apiMock.iterAccounts.side_effect = lambda *args, **kwargs: iter([
+            storage({"guid": "ACT-1"}),
+            storage({"guid": "ACT-2"})
+        ])
+        self.apiMock.iterMembers.side_effect = lambda *args, **kwargs: iter([
+            storage({"guid": "MBR-1"})
+        ])
+        self.user = User(self.apiMock, 'userGuid')
+
+    def testLoadedOnce(self):
+        accounts = self.user.accounts
+
+        self.assertEqual([a.guid for a in accounts], ["ACT-1", "ACT-2"])
+        self.assertIs(self.user.accounts, accounts)
+        self.assertEqual(self.apiMock.iterAccounts.call_count, 1)
+
+    def testIdentityMap(self):
+        accounts = self.user.accounts
+
+        self.assertIs(self.user.readAccount("ACT-2"), accounts[1])
+        self.assertFalse(self.apiMock.readAccount.called)
+
+    def testReadIsRemembered(self):
+        self.apiMock.readMember.return_value = storage({"guid": "MBR-9"})
+
+        member = self.user.readMember("MBR-9")
+
+        self.assertIs(self.user.readMember("MBR-9"), member)
+        self.assertEqual(self.apiMock.readMember.call_count, 1)
+
+    def testReadThenLoadKeepsIdentity(self):
+        self.apiMock.readMember.return_value = storage({"guid": "MBR-1"})
+        member = self.user.readMember("MBR-1")
+
+        self.assertIs(self.user.members[0], member)
+
+    def testRefresh(self):
+        first = self.user.accounts[0]
+
+        self.user.refresh("accounts")
+
+        self.assertEqual(self.apiMock.iterAccounts.call_count, 2)
+        self.assertIsNot(self.user.accounts[0], first)
+
+    def testInvalidate(self):
+        self.user.accounts
+        self.user.members
+
+        self.user.invalidate("members")
+        self.user.accounts
+        self.user.members
+
+        self.assertEqual(self.apiMock.iterAccounts.call_count, 1)
+        self.assertEqual(self.apiMock.iterMembers.call_count, 2)
+
+        with pytest.raises(ValueError):
+            self.user.invalidate("users")
+
+    def testCreateMemberInvalidatesMembers(self):
+        self.user.accounts
+        self.user.members
+
+        self.user.createMember({"institution_code": "mxbank"})
+        self.user.accounts
+        self.user.members
+
+        self.assertEqual(self.apiMock.iterAccounts.call_count, 1)
+        self.assertEqual(self.apiMock.iterMembers.call_count, 2)
+
+    def testAggregationInvalidatesEverything(self):
+        self.user.accounts
+
+        self.user.aggregateMember("MBR-1")
+        self.user.accounts
+
+        self.assertEqual(self.apiMock.iterAccounts.call_count, 2)
+
+    def testReadMany(self):
+        self.apiMock.readAccounts.return_value = {
+            "ACT-3": BulkResult("ACT-3", storage({"guid": "ACT-3"}), None)
+        }
+        accounts = self.user.accounts
+
+        results = self.user.readAccounts(["ACT-1", "ACT-3"])
+
+        self.apiMock.readAccounts.assert_called_with("userGuid", ["ACT-3"], 8)
+        self.assertIs(results["ACT-1"].result, accounts[0])
+        self.assertIs(self.user.readAccount("ACT-3"), results["ACT-3"].result)
+
+    def testRawReadsAreNotRemembered(self):
+        self.apiMock._rawMode.return_value = "bytes"
+        self.apiMock.readAccount.return_value = b'{"account": {"guid": "ACT-9"}}'
+        self.apiMock.readAccounts.return_value = {}
+
+        self.assertEqual(self.user.readAccount("ACT-9"), b'{"account": {"guid": "ACT-9"}}')
+        self.user.readAccounts(["ACT-9"])
+
+        self.apiMock._rawMode.return_value = None
+        self.apiMock.readAccount.return_value = storage({"guid": "ACT-9"})
+
+        self.assertEqual(self.user.readAccount("ACT-9").guid, "ACT-9")
+        self.apiMock.readAccounts.assert_called_with("userGuid", ["ACT-9"], 8)
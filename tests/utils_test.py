@@ -0,0 +1,121 @@
+import pickle
+import unittest
+
+import pytest
+
+from atrium.utils import LazyList, RecordView, endpointTemplate, isRaw, unpack
+
+
+class TestEndpointTemplate(unittest.TestCase):
+
+    def testCollection(self):
+        self.assertEqual(endpointTemplate("users"), "users")
+
+    def testNested(self):
+        self.assertEqual(
+            endpointTemplate("users/USR-1/accounts/ACT-2/transactions"),
+            "users/{}/accounts/{}/transactions"
+        )
+
+    def testAction(self):
+        self.assertEqual(
+            endpointTemplate("users/USR-1/members/MBR-2/status"),
+            "users/{}/members/{}/status"
+        )
+
+    def testQueryString(self):
+        self.assertEqual(
+            endpointTemplate("institutions/mxbank/credentials?page=2"),
+            "institutions/{}/credentials"
+        )
+
+
+class TestIsRaw(unittest.TestCase):
+
+    def testRawBodies(self):
+        chunks = (chunk for chunk in [b"{}"])
+
+        for body in (b"{}", bytearray(b"{}"), memoryview(b"{}"), chunks, iter([b"{}"])):
+            self.assertTrue(isRaw(body))
+
+    def testParsedData(self):
+        for data in ({"user": {}}, [{}], None, RecordView({})):
+            self.assertFalse(isRaw(data))
+
+
+class TestRecordView(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {"guid": "TRN-1", "amount": 10.5}
+        self.view = RecordView(self.data)
+
+    def testAccess(self):
+        self.assertEqual(self.view.guid, "TRN-1")
+        self.assertEqual(self.view["amount"], 10.5)
+        self.assertEqual(self.view.get("category", "none"), "none")
+        self.assertIn("guid", self.view)
+
+    def testMissingAttribute(self):
+        with pytest.raises(AttributeError):
+            self.view.category
+
+    def testNoCopy(self):
+        self.assertIs(self.view.toDict(), self.data)
+
+    def testCopyOnWrite(self):
+        self.view.category = "Gas"
+        self.view.amount = 11
+
+        self.assertEqual(self.view.category, "Gas")
+        self.assertEqual(self.data, {"guid": "TRN-1", "amount": 10.5})
+        self.assertEqual(self.view.toDict(), {"guid": "TRN-1", "amount": 11, "category": "Gas"})
+
+    def testEquality(self):
+        self.assertEqual(self.view, RecordView(dict(self.data)))
+        self.assertEqual(self.view, self.data)
+
+    def testPickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.view)), self.view)
+
+
+class TestLazyList(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [{"guid": "TRN-{}".format(i)} for i in range(10)]
+        self.records = LazyList(self.items)
+
+    def testIndexing(self):
+        self.assertEqual(len(self.records), 10)
+        self.assertEqual(self.records[0].guid, "TRN-0")
+        self.assertEqual(self.records[-1].guid, "TRN-9")
+        self.assertIs(self.records[3].toDict(), self.items[3])
+
+        with pytest.raises(IndexError):
+            self.records[10]
+
+    def testSlicing(self):
+        evens = self.records[::2]
+
+        self.assertIsInstance(evens, LazyList)
+        self.assertIs(evens._items, self.items)
+        self.assertEqual([r.guid for r in evens[1:3]], ["TRN-2", "TRN-4"])
+        self.assertEqual(len(self.records[8:20]), 2)
+
+    def testIteration(self):
+        self.assertEqual(
+            [r.guid for r in reversed(self.records[:3])],
+            ["TRN-2", "TRN-1", "TRN-0"]
+        )
+
+    def testEquality(self):
+        self.assertEqual(self.records[:2], self.items[:2])
+        self.assertNotEqual(self.records, self.items[:2])
+
+    def testUnpack(self):
+        records = unpack({"transactions": self.items}, "transactions", RecordView)
+
+        self.assertIsInstance(records, LazyList)
+        self.assertIsInstance(
+            unpack({"transaction": self.items[0]}, "transaction", RecordView),
+            RecordView
+        )